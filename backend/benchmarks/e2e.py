@@ -0,0 +1,281 @@
+"""
+End-to-end calculate-trip latency against a local stand-in for LocationIQ, Nominatim and ORS.
+
+Each scenario (short, regional, cross-country and multi-week trips) is planned
+stage by stage - geocode, route, reverse geocode, HOS, log sheets, persist and
+render - and once more through the full POST /api/calculate-trip/ stack. For
+every stage it reports median/min wall time, upstream requests, geopy
+geodesic calls and (in a separate tracemalloc pass) peak allocated memory.
+
+Provider answers come from fixtures in the providers' response formats. By
+default they are synthesized (great-circle routes with a little wiggle, the
+bundled gazetteer for reverse geocoding); --write-fixtures saves them and
+--fixtures serves a directory of saved or recorded ones instead. Caches are
+emptied before every iteration unless --warm is given.
+
+Usage (from backend/):
+    python -m benchmarks.e2e [--iterations 5] [--scenario cross_country] [--warm] [--json out.json]
+    python -m benchmarks.e2e --write-fixtures benchmarks/fixtures
+    python -m benchmarks.e2e --fixtures benchmarks/fixtures
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "eld_api.settings")
+django.setup()
+
+from django.db import connection  # noqa: E402
+from django.test import Client, override_settings  # noqa: E402
+from django.test.utils import setup_test_environment  # noqa: E402
+from geopy.distance import geodesic  # noqa: E402
+
+from trips.models import (  # noqa: E402
+    GeocodeCacheEntry, PlanResultCacheEntry, ReverseGeocodeCacheEntry, RouteLegCacheEntry
+)
+from trips.renderers import ORJSONRenderer  # noqa: E402
+from trips.serializers import TripRequestSerializer  # noqa: E402
+from trips.services.route_service import RouteService  # noqa: E402
+from trips.services.trip_planner import TripPlanner  # noqa: E402
+from trips.tests.fixtures import SCENARIOS, StandIn, request_payload, synthesize_fixtures  # noqa: E402
+
+from .stub_server import StubServer  # noqa: E402
+
+STAGES = ["geocode", "route", "reverse_geocode", "hos", "log_sheets", "persist", "render"]
+
+
+def point_route_service_at(url: str) -> None:
+    RouteService.LOCATIONIQ_GEOCODE_URL = f"{url}/v1/search.php"
+    RouteService.NOMINATIM_GEOCODE_URL = f"{url}/search"
+    RouteService.NOMINATIM_REVERSE_URL = f"{url}/reverse"
+    RouteService.OPENROUTE_ROUTE_URL = f"{url}/v2/directions/driving-car"
+
+
+class GeodesicCounter:
+    """Counts geopy geodesic constructions, however the module imported the class"""
+
+    def __init__(self):
+        self.calls = 0
+        original = geodesic.__init__
+
+        def counting_init(instance, *args, **kwargs):
+            self.calls += 1
+            original(instance, *args, **kwargs)
+
+        geodesic.__init__ = counting_init
+
+
+def clear_caches() -> None:
+    for model in (GeocodeCacheEntry, ReverseGeocodeCacheEntry, RouteLegCacheEntry, PlanResultCacheEntry):
+        model.objects.all().delete()
+
+
+def planner_stages(planner: TripPlanner) -> List[Tuple[str, Callable]]:
+    def reverse_geocode():
+        planner.label_route()
+        planner.label_log_cities()
+
+    return [
+        ("geocode", planner.geocode),
+        ("route", planner.plan_route),
+        ("reverse_geocode", reverse_geocode),
+        ("hos", planner.calculate_timeline),
+        ("log_sheets", planner.generate_log_sheets),
+        ("persist", planner.save_plan),
+        ("render", lambda: ORJSONRenderer().render(planner.to_response())),
+    ]
+
+
+def new_planner(scenario: str) -> TripPlanner:
+    serializer = TripRequestSerializer(data=request_payload(scenario))
+    serializer.is_valid(raise_exception=True)
+    return TripPlanner(serializer.validated_data)
+
+
+def run_stages(scenario: str, server: StubServer, counter: GeodesicCounter, warm: bool) -> Tuple[Dict, TripPlanner]:
+    if not warm:
+        clear_caches()
+    planner = new_planner(scenario)
+    measured = {}
+    for name, stage in planner_stages(planner):
+        requests_before, geodesic_before = server.requests, counter.calls
+        start = time.perf_counter()
+        stage()
+        measured[name] = {
+            "ms": (time.perf_counter() - start) * 1000,
+            "upstream_requests": server.requests - requests_before,
+            "geodesic_calls": counter.calls - geodesic_before
+        }
+    return measured, planner
+
+
+def run_end_to_end(scenario: str, server: StubServer, counter: GeodesicCounter, warm: bool) -> Dict:
+    if not warm:
+        clear_caches()
+    requests_before, geodesic_before = server.requests, counter.calls
+    start = time.perf_counter()
+    with override_settings(PLAN_CACHE_ENABLED=False):
+        response = Client().post(
+            "/api/calculate-trip/",
+            json.dumps(request_payload(scenario)),
+            content_type="application/json",
+            HTTP_ACCEPT_ENCODING="gzip"
+        )
+    elapsed = (time.perf_counter() - start) * 1000
+    if response.status_code != 200:
+        raise RuntimeError(f"{scenario}: calculate-trip returned {response.status_code}: {response.content[:200]!r}")
+    return {
+        "ms": elapsed,
+        "upstream_requests": server.requests - requests_before,
+        "geodesic_calls": counter.calls - geodesic_before,
+        "response_bytes": len(response.content)
+    }
+
+
+def measure_memory(scenario: str, warm: bool) -> Dict:
+    """Peak and retained traced memory per stage, in KiB (tracemalloc slows everything, so timings are taken separately)"""
+    if not warm:
+        clear_caches()
+    planner = new_planner(scenario)
+    memory = {}
+    tracemalloc.start()
+    try:
+        for name, stage in planner_stages(planner):
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            stage()
+            current, peak = tracemalloc.get_traced_memory()
+            memory[name] = {
+                "peak_kib": round((peak - before) / 1024, 1),
+                "retained_kib": round((current - before) / 1024, 1)
+            }
+    finally:
+        tracemalloc.stop()
+    return memory
+
+
+def summarize(samples: List[Dict]) -> Dict:
+    times = [sample["ms"] for sample in samples]
+    summary = {
+        "median_ms": round(statistics.median(times), 3),
+        "min_ms": round(min(times), 3),
+    }
+    for field in ("upstream_requests", "geodesic_calls", "response_bytes"):
+        if field in samples[-1]:
+            summary[field] = samples[-1][field]
+    return summary
+
+
+def run_scenario(scenario: str, server: StubServer, counter: GeodesicCounter, iterations: int, warm: bool) -> Dict:
+    if warm:
+        run_stages(scenario, server, counter, warm=False)
+
+    stage_samples = {name: [] for name in STAGES}
+    planner = None
+    for _ in range(iterations):
+        measured, planner = run_stages(scenario, server, counter, warm)
+        for name, sample in measured.items():
+            stage_samples[name].append(sample)
+
+    end_to_end = [run_end_to_end(scenario, server, counter, warm) for _ in range(iterations)]
+
+    return {
+        "distance_miles": round(planner.total_distance, 1),
+        "log_sheets": len(planner.log_sheets),
+        "timeline_events": len(planner.trip_result["timeline"]),
+        "geometry_vertices": len(planner.route_geometry),
+        "stages": {name: summarize(samples) for name, samples in stage_samples.items()},
+        "stages_total_median_ms": round(sum(statistics.median(s["ms"] for s in samples) for samples in stage_samples.values()), 3),
+        "end_to_end": summarize(end_to_end),
+        "memory": measure_memory(scenario, warm)
+    }
+
+
+def load_fixtures(directory: Optional[str], scenarios: List[str]) -> Dict:
+    fixtures = {"geocode": {}, "routes": {}}
+    for scenario in scenarios:
+        path = Path(directory) / f"{scenario}.json" if directory else None
+        if path is not None and path.exists():
+            with open(path) as handle:
+                loaded = json.load(handle)
+        else:
+            loaded = synthesize_fixtures(scenario)
+        fixtures["geocode"].update(loaded.get("geocode", {}))
+        fixtures["routes"].update(loaded.get("routes", {}))
+    return fixtures
+
+
+def write_fixtures(directory: str) -> None:
+    Path(directory).mkdir(parents=True, exist_ok=True)
+    for scenario in SCENARIOS:
+        with open(Path(directory) / f"{scenario}.json", "w") as handle:
+            json.dump(synthesize_fixtures(scenario), handle)
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run(scenarios: List[str], iterations: int, warm: bool, fixtures_dir: Optional[str]) -> Dict:
+    setup_test_environment()
+    test_database = connection.creation.create_test_db(verbosity=0)
+    counter = GeodesicCounter()
+    results = {
+        "meta": {
+            "revision": git_revision(),
+            "python": platform.python_version(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "iterations": iterations,
+            "caches": "warm" if warm else "cold",
+            "fixtures": fixtures_dir or "synthesized"
+        },
+        "scenarios": {}
+    }
+    try:
+        with StubServer(StandIn(load_fixtures(fixtures_dir, scenarios))) as server:
+            point_route_service_at(server.url)
+            for scenario in scenarios:
+                results["scenarios"][scenario] = run_scenario(scenario, server, counter, iterations, warm)
+    finally:
+        connection.creation.destroy_test_db(test_database, verbosity=0)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS), help="repeatable; default all")
+    parser.add_argument("--warm", action="store_true", help="keep geocode/route/reverse caches between iterations")
+    parser.add_argument("--fixtures", help="directory of <scenario>.json provider fixtures to serve")
+    parser.add_argument("--write-fixtures", metavar="DIR", help="write the synthesized fixtures and exit")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    if args.write_fixtures:
+        write_fixtures(args.write_fixtures)
+        return
+
+    results = run(args.scenario or list(SCENARIOS), args.iterations, args.warm, args.fixtures)
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Handshake cost of one-shot requests vs the pooled keep-alive sessions used by RouteService.
+
+Usage (from backend/):
+    python -m benchmarks.http_pool [--requests 200] [--no-tls] [--json out.json]
+"""
+import argparse
+import json
+import time
+
+import requests
+import urllib3
+
+from trips.services.http import build_session
+
+from .stub_server import StubServer
+
+urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
+
+
+def geocode_responder(request):
+    return 200, [{"lat": "32.7767", "lon": "-96.7970", "display_name": "Dallas, Texas"}]
+
+
+def time_calls(call, count: int) -> float:
+    start = time.perf_counter()
+    for i in range(count):
+        call(i)
+    return time.perf_counter() - start
+
+
+def run(count: int, tls: bool) -> dict:
+    results = {"requests": count, "tls": tls}
+    with StubServer(geocode_responder, tls=tls) as server:
+        url = f"{server.url}/v1/search.php"
+
+        def one_shot(i):
+            requests.get(url, params={"q": f"Dallas {i}", "format": "json"}, timeout=5, verify=False).json()
+
+        elapsed = time_calls(one_shot, count)
+        results["one_shot"] = {
+            "total_s": round(elapsed, 4),
+            "per_request_ms": round(elapsed / count * 1000, 3),
+            "connections": server.connections
+        }
+
+        session = build_session(pool_maxsize=10, retries=1, backoff_factor=0.2)
+        connections_before = server.connections
+
+        def pooled(i):
+            session.get(url, params={"q": f"Dallas {i}", "format": "json"}, timeout=5, verify=False).json()
+
+        elapsed = time_calls(pooled, count)
+        results["pooled"] = {
+            "total_s": round(elapsed, 4),
+            "per_request_ms": round(elapsed / count * 1000, 3),
+            "connections": server.connections - connections_before
+        }
+        session.close()
+
+    results["speedup"] = round(results["one_shot"]["total_s"] / results["pooled"]["total_s"], 2)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--no-tls", action="store_true", help="plain HTTP instead of a self-signed HTTPS stand-in")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.requests, tls=not args.no_tls)
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
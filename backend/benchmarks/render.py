@@ -0,0 +1,139 @@
+"""
+Serialization CPU time and bytes on the wire for calculate-trip responses.
+
+Builds multi-day trip responses offline (synthetic route geometry and city
+labels, real HOS timeline and log sheets) and renders them with DRF's
+default JSONRenderer, the orjson renderer and, when installed, MessagePack,
+each raw and gzip/brotli compressed.
+
+Usage (from backend/):
+    python -m benchmarks.render [--repeat 20] [--json out.json]
+"""
+import argparse
+import gzip
+import json
+import os
+import time
+from datetime import datetime
+from zoneinfo import ZoneInfo
+
+import django
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "eld_api.settings")
+django.setup()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from trips.renderers import ORJSONRenderer  # noqa: E402
+from trips.services.trip_planner import TripPlanner  # noqa: E402
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+try:
+    from trips.renderers import MessagePackRenderer
+except ImportError:
+    MessagePackRenderer = None
+
+# (name, total miles, pickup mile, geometry vertices)
+TRIPS = [
+    ("regional", 480.0, 60.0, 4000),
+    ("cross_country", 2800.0, 350.0, 25000),
+    ("multi_week", 7400.0, 120.0, 60000),
+]
+
+
+def build_response(total_miles: float, pickup_miles: float, vertices: int) -> dict:
+    data = {
+        "current_location": "Dallas, TX",
+        "pickup_location": "Amarillo, TX",
+        "dropoff_location": "Los Angeles, CA",
+        "current_cycle_used": 12.5,
+    }
+    planner = TripPlanner(data, route_service=object())
+    planner.start_coords = (32.7767, -96.7970)
+    planner.pickup_coords = (35.2220, -101.8313)
+    planner.dropoff_coords = (34.0522, -118.2437)
+    planner.total_distance = total_miles
+    planner.start_to_pickup_distance = pickup_miles
+    planner.route_geometry = [
+        [-96.7970 - 21.4467 * i / vertices, 32.7767 + 1.2755 * i / vertices + 0.0003 * (i % 7)]
+        for i in range(vertices)
+    ]
+    planner.fuel_stops = [
+        {"location": planner.route_geometry[0], "distance": float(mile), "type": "fuel"}
+        for mile in range(1000, int(total_miles), 1000)
+    ]
+    planner.route_intermediate_cities = [
+        {"name": f"Town {mile}, TX", "coordinates": [-97.0, 33.0], "distance_miles": float(mile),
+         "segment": "start_to_pickup" if mile < pickup_miles else "pickup_to_dropoff"}
+        for mile in range(100, int(total_miles), 100)
+    ]
+    planner.intermediate_cities = planner._log_cities([
+        {"name": f"Town {mile}, TX", "coordinates": [-97.0, 33.0], "distance_miles": float(mile)}
+        for mile in range(50, int(total_miles), 50)
+    ])
+    planner.calculate_timeline(datetime(2026, 3, 2, 6, 0, tzinfo=ZoneInfo("America/Chicago")))
+    planner.generate_log_sheets()
+    return planner.to_response()
+
+
+def cpu_ms(func, repeat: int) -> float:
+    start = time.process_time()
+    for _ in range(repeat):
+        func()
+    return (time.process_time() - start) / repeat * 1000
+
+
+def measure(response: dict, repeat: int) -> dict:
+    renderers = {"drf_json": JSONRenderer(), "orjson": ORJSONRenderer()}
+    if MessagePackRenderer is not None:
+        renderers["msgpack"] = MessagePackRenderer()
+
+    results = {}
+    for name, renderer in renderers.items():
+        body = renderer.render(response)
+        entry = {
+            "render_cpu_ms": round(cpu_ms(lambda: renderer.render(response), repeat), 3),
+            "bytes": len(body),
+            "gzip_bytes": len(gzip.compress(body, compresslevel=6)),
+            "gzip_cpu_ms": round(cpu_ms(lambda: gzip.compress(body, compresslevel=6), repeat), 3),
+        }
+        if brotli is not None:
+            entry["br_bytes"] = len(brotli.compress(body, quality=5))
+            entry["br_cpu_ms"] = round(cpu_ms(lambda: brotli.compress(body, quality=5), repeat), 3)
+        results[name] = entry
+    return results
+
+
+def run(repeat: int) -> dict:
+    results = {"repeat": repeat, "trips": {}}
+    for name, total_miles, pickup_miles, vertices in TRIPS:
+        response = build_response(total_miles, pickup_miles, vertices)
+        results["trips"][name] = {
+            "miles": total_miles,
+            "vertices": vertices,
+            "log_sheets": len(response["log_sheets"]),
+            "timeline_events": len(response["timeline"]),
+            "renderers": measure(response, repeat),
+        }
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args()
+
+    results = run(args.repeat)
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Local stand-in HTTP(S) server for benchmarking upstream provider calls without the network."""
+import json
+import os
+import socket
+import ssl
+import subprocess
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+
+class StubRequest:
+    def __init__(self, method: str, path: str, query: dict, body: Optional[dict]):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+
+
+Responder = Callable[[StubRequest], Tuple[int, object]]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        with self.server.lock:
+            self.server.connections += 1
+
+    def log_message(self, format, *args):
+        pass
+
+    def _respond(self, method: str):
+        parts = urlsplit(self.path)
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        body = None
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            body = json.loads(self.rfile.read(length) or b"null")
+
+        with self.server.lock:
+            self.server.requests += 1
+        status, payload = self.server.responder(StubRequest(method, parts.path, query, body))
+        data = json.dumps(payload).encode("utf-8")
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        self._respond("GET")
+
+    def do_POST(self):
+        self._respond("POST")
+
+
+def _self_signed_context(directory: str) -> ssl.SSLContext:
+    cert = os.path.join(directory, "cert.pem")
+    key = os.path.join(directory, "key.pem")
+    subprocess.run(
+        [
+            "openssl", "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1",
+            "-nodes", "-keyout", key, "-out", cert, "-days", "1", "-subj", "/CN=127.0.0.1"
+        ],
+        check=True,
+        capture_output=True
+    )
+    context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+    context.load_cert_chain(cert, key)
+    return context
+
+
+class StubServer:
+    """Threaded keep-alive server on 127.0.0.1 that answers every request through `responder`.
+
+    With tls=True a throwaway self-signed certificate is generated with the
+    openssl CLI so handshake costs resemble the real HTTPS providers.
+    """
+
+    def __init__(self, responder: Responder, tls: bool = False):
+        self.responder = responder
+        self.tls = tls
+        self._server = None
+        self._thread = None
+        self._tempdir = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"{'https' if self.tls else 'http'}://{host}:{port}"
+
+    @property
+    def connections(self) -> int:
+        return self._server.connections
+
+    @property
+    def requests(self) -> int:
+        return self._server.requests
+
+    def start(self) -> "StubServer":
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        server.daemon_threads = True
+        server.responder = self.responder
+        server.lock = threading.Lock()
+        server.connections = 0
+        server.requests = 0
+        if self.tls:
+            self._tempdir = tempfile.TemporaryDirectory()
+            server.socket = _self_signed_context(self._tempdir.name).wrap_socket(server.socket, server_side=True)
+        self._server = server
+        self._thread = threading.Thread(target=server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._tempdir:
+            self._tempdir.cleanup()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
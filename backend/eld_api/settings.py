@@ -45,6 +45,8 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'trips.middleware.ServerTimingMiddleware',
+    'trips.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -142,3 +144,88 @@ STATIC_URL = 'static/'
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+
+# Upstream lookup caches (stored in the default database)
+
+GEOCODE_CACHE_ENABLED = config('GEOCODE_CACHE_ENABLED', default=True, cast=bool)
+GEOCODE_CACHE_TTL = config('GEOCODE_CACHE_TTL', default=30 * 24 * 3600, cast=int)
+GEOCODE_CACHE_NEGATIVE_TTL = config('GEOCODE_CACHE_NEGATIVE_TTL', default=24 * 3600, cast=int)
+GEOCODE_CACHE_MAX_ENTRIES = config('GEOCODE_CACHE_MAX_ENTRIES', default=10000, cast=int)
+
+REVERSE_GEOCODE_CACHE_ENABLED = config('REVERSE_GEOCODE_CACHE_ENABLED', default=True, cast=bool)
+REVERSE_GEOCODE_CACHE_PRECISION = config('REVERSE_GEOCODE_CACHE_PRECISION', default=5, cast=int)
+REVERSE_GEOCODE_CACHE_TTL = config('REVERSE_GEOCODE_CACHE_TTL', default=90 * 24 * 3600, cast=int)
+REVERSE_GEOCODE_CACHE_NEGATIVE_TTL = config('REVERSE_GEOCODE_CACHE_NEGATIVE_TTL', default=24 * 3600, cast=int)
+REVERSE_GEOCODE_CACHE_MAX_ENTRIES = config('REVERSE_GEOCODE_CACHE_MAX_ENTRIES', default=50000, cast=int)
+
+ROUTE_CACHE_ENABLED = config('ROUTE_CACHE_ENABLED', default=True, cast=bool)
+ROUTE_CACHE_COORD_PRECISION = config('ROUTE_CACHE_COORD_PRECISION', default=4, cast=int)
+ROUTE_CACHE_TTL = config('ROUTE_CACHE_TTL', default=7 * 24 * 3600, cast=int)
+ROUTE_CACHE_MAX_ENTRIES = config('ROUTE_CACHE_MAX_ENTRIES', default=5000, cast=int)
+
+# Reverse geocoding backend: 'offline' (bundled gazetteer) or 'nominatim'
+REVERSE_GEOCODER = config('REVERSE_GEOCODER', default='offline')
+REVERSE_GEOCODE_NETWORK_FALLBACK = config('REVERSE_GEOCODE_NETWORK_FALLBACK', default=True, cast=bool)
+OFFLINE_GEOCODER_MAX_MILES = config('OFFLINE_GEOCODER_MAX_MILES', default=25.0, cast=float)
+
+
+# Upstream provider concurrency
+
+PROVIDER_MIN_INTERVALS = {
+    'locationiq': config('LOCATIONIQ_MIN_INTERVAL', default=0.3, cast=float),
+    'nominatim': config('NOMINATIM_MIN_INTERVAL', default=0.3, cast=float),
+}
+GEOCODE_MAX_WORKERS = config('GEOCODE_MAX_WORKERS', default=3, cast=int)
+# Nominatim reverse lookups still go out one per NOMINATIM_MIN_INTERVAL, so extra
+# reverse-geocode workers only help when that interval is 0 (e.g. a self-hosted instance)
+REVERSE_GEOCODE_MAX_WORKERS = config('REVERSE_GEOCODE_MAX_WORKERS', default=4, cast=int)
+
+# LocationIQ is only used for geocoding when a key is configured; Nominatim needs none
+LOCATIONIQ_API_KEY = config('LOCATIONIQ_API_KEY', default='')
+
+# Provider chains: a provider is skipped for PROVIDER_BREAKER_RESET seconds after
+# PROVIDER_BREAKER_FAILURES consecutive failures, and the geocode backup (Nominatim) is
+# fired once LocationIQ has taken longer than its recent PROVIDER_HEDGE_PERCENTILE latency
+PROVIDER_BREAKER_FAILURES = config('PROVIDER_BREAKER_FAILURES', default=5, cast=int)
+PROVIDER_BREAKER_RESET = config('PROVIDER_BREAKER_RESET', default=30.0, cast=float)
+PROVIDER_HEDGING_ENABLED = config('PROVIDER_HEDGING_ENABLED', default=True, cast=bool)
+PROVIDER_HEDGE_PERCENTILE = config('PROVIDER_HEDGE_PERCENTILE', default=95.0, cast=float)
+PROVIDER_HEDGE_MIN_SAMPLES = config('PROVIDER_HEDGE_MIN_SAMPLES', default=20, cast=int)
+PROVIDER_HEDGE_DEFAULT_DELAY = config('PROVIDER_HEDGE_DEFAULT_DELAY', default=1.0, cast=float)
+PROVIDER_HEDGE_MIN_DELAY = config('PROVIDER_HEDGE_MIN_DELAY', default=0.2, cast=float)
+PROVIDER_HEDGE_MAX_DELAY = config('PROVIDER_HEDGE_MAX_DELAY', default=3.0, cast=float)
+PROVIDER_CALL_WORKERS = config('PROVIDER_CALL_WORKERS', default=64, cast=int)
+PROVIDER_HEDGE_WORKERS = config('PROVIDER_HEDGE_WORKERS', default=16, cast=int)
+PROVIDER_LATENCY_WINDOW = config('PROVIDER_LATENCY_WINDOW', default=200, cast=int)
+
+# Pooled upstream HTTP sessions (one per provider host)
+HTTP_POOL_MAXSIZE = config('HTTP_POOL_MAXSIZE', default=10, cast=int)
+HTTP_RETRIES = config('HTTP_RETRIES', default=1, cast=int)
+HTTP_BACKOFF_FACTOR = config('HTTP_BACKOFF_FACTOR', default=0.2, cast=float)
+
+# Route polyline distances: 'ellipsoidal' (WGS-84, matches geopy) or 'haversine'
+ROUTE_DISTANCE_MODE = config('ROUTE_DISTANCE_MODE', default='ellipsoidal')
+
+# Response compression (brotli is used when the package is installed and the client accepts it)
+BROTLI_QUALITY = config('BROTLI_QUALITY', default=5, cast=int)
+
+# Batch trip planning
+TRIP_BATCH_MAX_SIZE = config('TRIP_BATCH_MAX_SIZE', default=200, cast=int)
+TRIP_BATCH_WORKERS = config('TRIP_BATCH_WORKERS', default=4, cast=int)
+TRIP_BATCH_PROCESS_MIN_TRIPS = config('TRIP_BATCH_PROCESS_MIN_TRIPS', default=20, cast=int)
+
+# Calculate-trip result cache. Without an explicit start_time, trips start at now rounded down to
+# PLAN_CACHE_START_BUCKET seconds (60 = whole minutes, which HOS uses anyway)
+PLAN_CACHE_ENABLED = config('PLAN_CACHE_ENABLED', default=True, cast=bool)
+PLAN_CACHE_START_BUCKET = config('PLAN_CACHE_START_BUCKET', default=60, cast=int)
+PLAN_CACHE_TTL = config('PLAN_CACHE_TTL', default=24 * 3600, cast=int)
+PLAN_CACHE_MAX_ENTRIES = config('PLAN_CACHE_MAX_ENTRIES', default=2000, cast=int)
+
+# Saved plans (for replanning) expire TRIP_PLAN_TTL seconds after they were last planned or
+# replanned; `manage.py purge_trip_plans` deletes expired ones
+TRIP_PLAN_TTL = config('TRIP_PLAN_TTL', default=7 * 24 * 3600, cast=int)
+
+# Instrumentation: Server-Timing response headers and the Prometheus endpoint at /api/metrics
+SERVER_TIMING_ENABLED = config('SERVER_TIMING_ENABLED', default=True, cast=bool)
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
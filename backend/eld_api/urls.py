@@ -24,7 +24,12 @@ def root_view(request):
         "status": "running",
         "endpoints": {
             "health": "/api/health/",
-            "calculate_trip": "/api/calculate-trip/"
+            "calculate_trip": "/api/calculate-trip/",
+            "calculate_trip_async": "/api/calculate-trip/async/",
+            "calculate_trip_stream": "/api/calculate-trip/stream/",
+            "calculate_trip_batch": "/api/calculate-trip/batch/",
+            "replan_trip": "/api/plans/<plan_id>/replan/",
+            "metrics": "/api/metrics"
         }
     })
 
@@ -0,0 +1,25 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from trips.models import TripPlan
+
+
+class Command(BaseCommand):
+    help = (
+        "Delete saved trip plans that have not been planned or replanned for TRIP_PLAN_TTL seconds. "
+        "Expired plans can no longer be replanned, so this only reclaims space; run it from cron."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run", action="store_true",
+            help="Report how many plans would be deleted without deleting them"
+        )
+
+    def handle(self, *args, **options):
+        expired = TripPlan.objects.expired()
+        if options["dry_run"]:
+            self.stdout.write(f"{expired.count()} plans older than {settings.TRIP_PLAN_TTL}s would be deleted")
+            return
+        deleted, _ = expired.delete()
+        self.stdout.write(self.style.SUCCESS(f"Deleted {deleted} expired trip plans"))
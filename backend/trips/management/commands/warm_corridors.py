@@ -0,0 +1,118 @@
+import csv
+import json
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from trips.serializers import TripRequestSerializer
+from trips.services.cache import normalize_address
+from trips.services.concurrency import run_bounded
+from trips.services.metrics import UPSTREAM_REQUESTS
+from trips.services.route_service import RouteService
+from trips.services.trip_planner import TripPlanner, TripPlanningError
+
+LANE_FIELDS = ("current_location", "pickup_location", "dropoff_location")
+
+
+class Command(BaseCommand):
+    help = (
+        "Pre-populate the geocode and route-leg caches for known lanes. "
+        "Reads a CSV (with a current_location,pickup_location,dropoff_location header) "
+        "or JSONL file (one object per lane with those keys) and runs each lane's "
+        "lookups through RouteService, so provider rate limits and circuit breakers apply. "
+        "Route labels are only cached when they come from Nominatim: with the default "
+        "offline REVERSE_GEOCODER that is just the points the gazetteer cannot name."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Lane file (.csv, or .jsonl/.ndjson)")
+        parser.add_argument(
+            "--format", choices=["csv", "jsonl"],
+            help="File format; taken from the file extension by default"
+        )
+        parser.add_argument(
+            "--workers", type=int, default=2,
+            help="Lanes warmed at once (default 2); each lane's lookups also use "
+                 "GEOCODE_MAX_WORKERS/REVERSE_GEOCODE_MAX_WORKERS threads"
+        )
+
+    def handle(self, *args, **options):
+        lanes, invalid = self.read_lanes(Path(options["path"]), options["format"])
+        for line, errors in invalid:
+            self.stderr.write(f"line {line}: skipped, {errors}")
+        if not lanes:
+            raise CommandError("No valid lanes to warm")
+
+        if not (settings.GEOCODE_CACHE_ENABLED and settings.ROUTE_CACHE_ENABLED):
+            self.stderr.write(self.style.WARNING("Geocode or route caching is disabled; those lookups will not be kept"))
+
+        calls_before = UPSTREAM_REQUESTS.total()
+        start = time.perf_counter()
+        results = run_bounded(self.warm_lane, lanes, max(1, options["workers"]))
+        elapsed = time.perf_counter() - start
+
+        warmed = 0
+        for lane, error in zip(lanes, results):
+            label = " -> ".join(lane[field] for field in LANE_FIELDS)
+            if error is None:
+                warmed += 1
+                self.stdout.write(f"warmed  {label}")
+            else:
+                self.stdout.write(self.style.ERROR(f"failed  {label}: {error}"))
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{warmed}/{len(lanes)} lanes warmed in {elapsed:.1f}s "
+            f"with {int(UPSTREAM_REQUESTS.total() - calls_before)} upstream calls"
+        ))
+
+    def read_lanes(self, path: Path, file_format: str = None) -> Tuple[List[Dict], List[Tuple[int, Dict]]]:
+        """Validated, de-duplicated lanes plus (line number, errors) for rows that failed validation"""
+        if file_format is None:
+            file_format = "csv" if path.suffix.lower() == ".csv" else "jsonl"
+        try:
+            with path.open(newline="", encoding="utf-8") as lane_file:
+                if file_format == "csv":
+                    reader = csv.DictReader(lane_file)
+                    rows = [(reader.line_num, row) for row in reader]
+                else:
+                    rows = [(number, json.loads(line)) for number, line in enumerate(lane_file, 1) if line.strip()]
+        except OSError as e:
+            raise CommandError(f"Cannot read {path}: {e}")
+        except ValueError as e:
+            raise CommandError(f"{path} is not valid JSONL: {e}")
+
+        lanes, invalid, seen = [], [], set()
+        for line, row in rows:
+            if not isinstance(row, dict):
+                invalid.append((line, {"non_field_errors": ["Expected an object with the lane fields"]}))
+                continue
+            serializer = TripRequestSerializer(data=dict(row, current_cycle_used=0))
+            if not serializer.is_valid():
+                invalid.append((line, serializer.errors))
+                continue
+            lane = serializer.validated_data
+            key = tuple(normalize_address(lane[field]) for field in LANE_FIELDS)
+            if key not in seen:
+                seen.add(key)
+                lanes.append(lane)
+        return lanes, invalid
+
+    def warm_lane(self, lane: Dict):
+        """Run the planner's lookup stages for one lane; returns None, or the error that stopped it"""
+        planner = TripPlanner(lane, RouteService())
+        try:
+            planner.geocode()
+            planner.plan_route()
+            if planner.route_result is None:
+                return "no route from OpenRouteService, only the straight-line estimate"
+            if planner.route_service.route_cache:
+                # Label the route as later trips will see it: reassembled from the cached legs
+                planner.plan_route()
+            planner.label_route()
+            planner.label_log_cities()
+        except TripPlanningError as e:
+            return str(e)
+        return None
@@ -0,0 +1,125 @@
+import time
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+from .services.metrics import HTTP_REQUEST_SECONDS, start_request_timings, stop_request_timings
+
+
+def accepted_encodings(header: str) -> dict:
+    """{coding: q} from an Accept-Encoding header; codings with q=0 are refused"""
+    encodings = {}
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        encodings[coding] = q
+    return encodings
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """Negotiated response compression: brotli when the client accepts it and the
+    brotli package is installed, gzip otherwise. A coding refused with q=0 is
+    never used; the response is then sent as is.
+
+    Streaming responses are sent uncompressed: gzip's compress_sequence holds
+    back output until its buffer fills, which turns the progressive NDJSON and
+    event-stream responses into a single chunk at the end.
+    """
+
+    def process_response(self, request, response):
+        if response.streaming or response.has_header("Content-Encoding") or len(response.content) < 200:
+            return response
+
+        patch_vary_headers(response, ("Accept-Encoding",))
+
+        encodings = accepted_encodings(request.META.get("HTTP_ACCEPT_ENCODING", ""))
+        br_q = encodings.get("br", 0.0) if brotli is not None else 0.0
+        gzip_q = encodings.get("gzip", 0.0)
+        if br_q > 0 and br_q >= gzip_q:
+            return self.compress_brotli(response)
+        if gzip_q > 0:
+            return super().process_response(request, response)
+        return response
+
+    def compress_brotli(self, response):
+        compressed_content = brotli.compress(response.content, quality=settings.BROTLI_QUALITY)
+        if len(compressed_content) >= len(response.content):
+            return response
+        response.content = compressed_content
+        response.headers["Content-Length"] = str(len(response.content))
+
+        etag = response.get("ETag")
+        if etag and etag.startswith('"'):
+            response.headers["ETag"] = "W/" + etag
+        response.headers["Content-Encoding"] = "br"
+
+        return response
+
+
+class ServerTimingMiddleware:
+    """Records request latency per view and reports the request's spans in a Server-Timing header.
+
+    Stages and upstream calls add their spans through services.metrics; the
+    header lists each one (summed when it ran more than once) plus "total".
+    For streaming responses only the work done before the first chunk counts.
+    It runs natively in both sync and async stacks, so under ASGI the async
+    views are not pushed back onto a thread on its account.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        timings, token = start_request_timings()
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            stop_request_timings(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        timings, token = start_request_timings()
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            stop_request_timings(token)
+        return self.finish(request, response, timings, time.perf_counter() - start)
+
+    def finish(self, request, response, timings, elapsed: float):
+        match = request.resolver_match
+        HTTP_REQUEST_SECONDS.observe(
+            elapsed,
+            view=match.url_name if match else "unmatched",
+            method=request.method,
+            status=response.status_code
+        )
+        if settings.SERVER_TIMING_ENABLED:
+            timings.add("total", elapsed)
+            response.headers["Server-Timing"] = timings.header()
+        return response
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.9 on 2026-10-18 01:32
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0002_reversegeocodecacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RouteLegCacheEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_used_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('start_latitude', models.FloatField()),
+                ('start_longitude', models.FloatField()),
+                ('end_latitude', models.FloatField()),
+                ('end_longitude', models.FloatField()),
+                ('geometry', models.TextField()),
+                ('distance', models.FloatField()),
+                ('duration', models.FloatField()),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+    ]
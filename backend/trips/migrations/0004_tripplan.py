@@ -0,0 +1,37 @@
+# Generated by Django 5.2.9 on 2026-10-18 02:02
+
+import django.utils.timezone
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('trips', '0003_routelegcacheentry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TripPlan',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('updated_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('request', models.JSONField()),
+                ('start_coords', models.JSONField()),
+                ('pickup_coords', models.JSONField()),
+                ('dropoff_coords', models.JSONField()),
+                ('route_polyline', models.TextField()),
+                ('route_properties', models.JSONField(default=dict)),
+                ('total_distance', models.FloatField()),
+                ('start_to_pickup_distance', models.FloatField()),
+                ('fuel_stops', models.JSONField(default=list)),
+                ('route_intermediate_cities', models.JSONField(default=list)),
+                ('intermediate_cities', models.JSONField(default=list)),
+                ('start_time', models.DateTimeField()),
+                ('completed_miles', models.FloatField(default=0.0)),
+                ('log_sheets', models.JSONField(default=list)),
+            ],
+        ),
+    ]
@@ -1,3 +1,111 @@
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
+from django.utils import timezone
+
+
+class CacheEntry(models.Model):
+    key = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(default=timezone.now)
+    last_used_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        abstract = True
+
+
+class GeocodeCacheEntry(CacheEntry):
+    query = models.TextField()
+    latitude = models.FloatField(null=True, blank=True)
+    longitude = models.FloatField(null=True, blank=True)
+
+    @property
+    def is_negative(self) -> bool:
+        return self.latitude is None or self.longitude is None
+
+    def __str__(self):
+        return self.query
+
+
+class ReverseGeocodeCacheEntry(CacheEntry):
+    cell = models.CharField(max_length=12)
+    label = models.CharField(max_length=255, null=True, blank=True)
+    zoom = models.PositiveSmallIntegerField(null=True, blank=True)
+
+    @property
+    def is_negative(self) -> bool:
+        return self.label is None
+
+    def __str__(self):
+        return f"{self.cell}: {self.label}"
+
+
+class RouteLegCacheEntry(CacheEntry):
+    start_latitude = models.FloatField()
+    start_longitude = models.FloatField()
+    end_latitude = models.FloatField()
+    end_longitude = models.FloatField()
+    geometry = models.TextField()
+    distance = models.FloatField()
+    duration = models.FloatField()
+
+    def __str__(self):
+        return (
+            f"({self.start_latitude}, {self.start_longitude}) -> "
+            f"({self.end_latitude}, {self.end_longitude})"
+        )
+
+
+class PlanResultCacheEntry(CacheEntry):
+    """A calculate-trip response keyed on the canonical request and its start time"""
+    etag = models.CharField(max_length=64)
+    response = models.JSONField()
+
+    def __str__(self):
+        return self.etag
+
+
+class TripPlanQuerySet(models.QuerySet):
+    def expiry_cutoff(self):
+        return timezone.now() - timedelta(seconds=settings.TRIP_PLAN_TTL)
+
+    def live(self):
+        return self.filter(updated_at__gt=self.expiry_cutoff())
+
+    def expired(self):
+        return self.filter(updated_at__lte=self.expiry_cutoff())
+
+
+class TripPlan(models.Model):
+    """A planned trip, kept so it can be re-planned without geocoding or routing again.
+
+    Distances are miles from the original start; the route and city labels
+    never change, while the schedule fields are replaced on every re-plan.
+    The route is stored once, as an encoded polyline of its full-resolution
+    coordinates plus the ORS properties (segments, way_points, summary).
+    Plans expire TRIP_PLAN_TTL seconds after they were last (re)planned.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    created_at = models.DateTimeField(default=timezone.now)
+    updated_at = models.DateTimeField(default=timezone.now, db_index=True)
+    request = models.JSONField(encoder=DjangoJSONEncoder)
+    start_coords = models.JSONField()
+    pickup_coords = models.JSONField()
+    dropoff_coords = models.JSONField()
+    route_polyline = models.TextField()
+    route_properties = models.JSONField(default=dict)
+    total_distance = models.FloatField()
+    start_to_pickup_distance = models.FloatField()
+    fuel_stops = models.JSONField(default=list)
+    route_intermediate_cities = models.JSONField(default=list)
+    intermediate_cities = models.JSONField(default=list)
+    start_time = models.DateTimeField()
+    completed_miles = models.FloatField(default=0.0)
+    log_sheets = models.JSONField(default=list)
+
+    objects = TripPlanQuerySet.as_manager()
 
-# Create your models here.
+    def __str__(self):
+        return f"{self.request.get('current_location')} -> {self.request.get('dropoff_location')}"
@@ -0,0 +1,47 @@
+import orjson
+from rest_framework.renderers import BaseRenderer, BrowsableAPIRenderer
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+
+class ORJSONRenderer(BaseRenderer):
+    """Compact UTF-8 JSON, like DRF's default JSONRenderer, serialized with orjson"""
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        return orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY)
+
+
+def ndjson_event(event: str, data) -> bytes:
+    """One newline-delimited JSON line: {"event": ..., "data": ...}"""
+    return orjson.dumps({"event": event, "data": data}, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n"
+
+
+def sse_event(event: str, data) -> bytes:
+    """One server-sent event with a JSON data line"""
+    return b"event: " + event.encode("utf-8") + b"\ndata: " + orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n\n"
+
+
+if msgpack is not None:
+    class MessagePackRenderer(BaseRenderer):
+        """MessagePack for internal clients that send `Accept: application/x-msgpack`"""
+        media_type = "application/x-msgpack"
+        format = "msgpack"
+        charset = None
+        render_style = "binary"
+
+        def render(self, data, accepted_media_type=None, renderer_context=None):
+            if data is None:
+                return b""
+            return msgpack.packb(data, use_bin_type=True)
+
+    TRIP_RENDERERS = [ORJSONRenderer, BrowsableAPIRenderer, MessagePackRenderer]
+else:
+    TRIP_RENDERERS = [ORJSONRenderer, BrowsableAPIRenderer]
@@ -17,4 +17,25 @@ class TripRequestSerializer(serializers.Serializer):
     dvl_manifest_no = serializers.CharField(required=False, allow_blank=True, default="")
     shipper_commodity = serializers.CharField(required=False, allow_blank=True, default="")
     timezone = serializers.CharField(required=False, default="UTC")
+    start_time = serializers.DateTimeField(required=False)
+    
+    geometry_format = serializers.ChoiceField(
+        choices=["coordinates", "encoded"], required=False, default="coordinates"
+    )
+    geometry_tolerance = serializers.FloatField(required=False, default=0.0, min_value=0, max_value=10000)
+
 
+class TripReplanSerializer(serializers.Serializer):
+    """Progress report for a saved plan: a position on the route or the miles completed since the start"""
+    current_latitude = serializers.FloatField(required=False, min_value=-90, max_value=90)
+    current_longitude = serializers.FloatField(required=False, min_value=-180, max_value=180)
+    completed_miles = serializers.FloatField(required=False, min_value=0)
+    current_cycle_used = serializers.FloatField(required=True, min_value=0, max_value=70)
+    
+    def validate(self, attrs):
+        has_position = "current_latitude" in attrs and "current_longitude" in attrs
+        if not has_position and "completed_miles" not in attrs:
+            raise serializers.ValidationError(
+                "Provide either current_latitude and current_longitude, or completed_miles."
+            )
+        return attrs
@@ -0,0 +1,113 @@
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from ..models import TripPlan
+from ..serializers import TripRequestSerializer
+from .cache import normalize_address
+from .concurrency import run_in_processes
+from .route_service import RouteService
+from .schedule import build_schedule
+from .trip_planner import TripPlanner, TripPlanningError
+
+
+class BatchPlanner:
+    """Plans many trips in one pass.
+
+    Every distinct address is geocoded once and every distinct
+    (start, pickup, dropoff) route is requested once for the whole batch;
+    legs shared between different routes are served by the route leg cache.
+    The CPU-bound HOS and log-sheet stage runs across a process pool for large
+    batches, falling back to in-process execution when a pool cannot be used.
+    """
+
+    def __init__(self, payloads: List[Dict], route_service: Optional[RouteService] = None):
+        self.payloads = payloads
+        self.route_service = route_service or RouteService()
+
+    def plan(self) -> List[Dict]:
+        """One entry per payload, in input order: {"index", "result"} or {"index", "error"/"errors"}"""
+        results: List[Optional[Dict]] = [None] * len(self.payloads)
+        planners: Dict[int, TripPlanner] = {}
+
+        for index, payload in enumerate(self.payloads):
+            serializer = TripRequestSerializer(data=payload)
+            if serializer.is_valid():
+                planners[index] = TripPlanner(serializer.validated_data, self.route_service)
+            else:
+                results[index] = {"index": index, "errors": serializer.errors}
+
+        for index, error in self._plan_routes(planners).items():
+            results[index] = {"index": index, "error": error}
+            del planners[index]
+
+        for planner in planners.values():
+            planner.label_route()
+            planner.label_log_cities()
+            planner.start_time = planner.requested_start_time()
+
+        jobs = [
+            (
+                planner.data["current_cycle_used"],
+                planner.start_time,
+                planner.total_distance,
+                planner.intermediate_cities,
+                planner.carrier_info(),
+                planner.vehicle_info()
+            )
+            for planner in planners.values()
+        ]
+        for planner, (trip_result, log_sheets) in zip(planners.values(), self._run_schedules(jobs)):
+            planner.trip_result = trip_result
+            planner.log_sheets = log_sheets
+
+        try:
+            trip_plans = TripPlan.objects.bulk_create([planner.to_plan() for planner in planners.values()])
+            plan_ids = [trip_plan.id for trip_plan in trip_plans]
+        except DatabaseError:
+            plan_ids = [None] * len(planners)
+        for (index, planner), plan_id in zip(planners.items(), plan_ids):
+            planner.plan_id = plan_id
+            results[index] = {"index": index, "result": planner.to_response()}
+
+        return results
+
+    def _plan_routes(self, planners: Dict[int, TripPlanner]) -> Dict[int, str]:
+        """Geocode and route every planner, sharing lookups; returns {index: error message} for failures"""
+        addresses: Dict[str, str] = {}
+        for planner in planners.values():
+            for field in ("current_location", "pickup_location", "dropoff_location"):
+                addresses.setdefault(normalize_address(planner.data[field]), planner.data[field])
+
+        keys = list(addresses)
+        located = dict(zip(keys, self.route_service.geocode_each([addresses[key] for key in keys])))
+
+        failures: Dict[int, str] = {}
+        routes: Dict[Tuple, Optional[Dict]] = {}
+        for index, planner in planners.items():
+            lookups = [
+                located[normalize_address(planner.data[field])]
+                for field in ("current_location", "pickup_location", "dropoff_location")
+            ]
+            try:
+                planner.geocode(
+                    locations=[coords for coords, _ in lookups],
+                    errors=[error for _, errors in lookups for error in errors]
+                )
+                stops = (planner.start_coords, planner.pickup_coords, planner.dropoff_coords)
+                if stops not in routes:
+                    routes[stops] = self.route_service.get_route(stops[0], [stops[1]], stops[2])
+                if routes[stops] is None:
+                    raise TripPlanningError("Could not calculate route")
+                planner.plan_route(routes[stops])
+            except TripPlanningError as e:
+                failures[index] = str(e)
+
+        return failures
+
+    def _run_schedules(self, jobs: List[Tuple]) -> List[Tuple[Dict, List[Dict]]]:
+        """Small batches stay in-process: a few milliseconds per trip is less than the pool round trip"""
+        if len(jobs) < settings.TRIP_BATCH_PROCESS_MIN_TRIPS:
+            return [build_schedule(*job) for job in jobs]
+        return run_in_processes(build_schedule, jobs, settings.TRIP_BATCH_WORKERS)
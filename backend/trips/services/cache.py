@@ -0,0 +1,286 @@
+import hashlib
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+
+import orjson
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+
+from ..models import GeocodeCacheEntry, PlanResultCacheEntry, ReverseGeocodeCacheEntry, RouteLegCacheEntry
+from . import polyline
+from .metrics import CACHE_LOOKUPS
+
+
+def make_cache_key(*parts) -> str:
+    raw = "|".join(str(part) for part in parts)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+
+def geohash(lat: float, lon: float, precision: int) -> str:
+    """Standard base-32 geohash; precision 5 is a ~4.9 km cell, 6 is ~1.2 x 0.6 km"""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        value_range, value = (lon_range, lon) if even else (lat_range, lat)
+        mid = (value_range[0] + value_range[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            value_range[0] = mid
+        else:
+            value_range[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(GEOHASH_ALPHABET[bits])
+            bits = 0
+            bit_count = 0
+    return "".join(chars)
+
+
+def normalize_address(address: str) -> str:
+    """Lowercase an address and collapse punctuation/whitespace so equivalent spellings share a key"""
+    address = re.sub(r"[^\w\s,#-]", " ", address.lower())
+    parts = (" ".join(part.split()) for part in address.split(","))
+    return ", ".join(part for part in parts if part)
+
+
+class ModelCache:
+    """Size-bounded LRU cache persisted in a CacheEntry model.
+
+    Entries live in the configured database so they survive restarts and are
+    shared by every worker. Database errors are swallowed: a broken cache
+    behaves like an empty one.
+    """
+    model = None
+    name = None
+    TOUCH_INTERVAL = timedelta(minutes=1)
+
+    def __init__(self, ttl: int, negative_ttl: int, max_entries: int):
+        self.ttl = timedelta(seconds=ttl)
+        self.negative_ttl = timedelta(seconds=negative_ttl)
+        self.max_entries = max_entries
+
+    def _is_negative(self, entry) -> bool:
+        return False
+
+    def _lookup(self, key: str):
+        entry = self._fetch(key)
+        CACHE_LOOKUPS.inc(cache=self.name, result="miss" if entry is None else "hit")
+        return entry
+
+    def _fetch(self, key: str):
+        try:
+            entry = self.model.objects.filter(key=key).first()
+            if entry is None:
+                return None
+
+            now = timezone.now()
+            ttl = self.negative_ttl if self._is_negative(entry) else self.ttl
+            if entry.created_at + ttl <= now:
+                entry.delete()
+                return None
+
+            if now - entry.last_used_at >= self.TOUCH_INTERVAL:
+                self.model.objects.filter(pk=entry.pk).update(last_used_at=now)
+            return entry
+        except DatabaseError:
+            return None
+
+    def _store(self, key: str, **fields) -> None:
+        now = timezone.now()
+        try:
+            self.model.objects.update_or_create(
+                key=key,
+                defaults=dict(fields, created_at=now, last_used_at=now)
+            )
+            self._evict()
+        except DatabaseError:
+            pass
+
+    def _evict(self) -> None:
+        overflow = self.model.objects.count() - self.max_entries
+        if overflow <= 0:
+            return
+        stale = list(
+            self.model.objects.order_by("last_used_at").values_list("pk", flat=True)[:overflow]
+        )
+        self.model.objects.filter(pk__in=stale).delete()
+
+
+class GeocodeCache(ModelCache):
+    model = GeocodeCacheEntry
+    name = "geocode"
+
+    def __init__(self, ttl: int = None, negative_ttl: int = None, max_entries: int = None):
+        super().__init__(
+            ttl=settings.GEOCODE_CACHE_TTL if ttl is None else ttl,
+            negative_ttl=settings.GEOCODE_CACHE_NEGATIVE_TTL if negative_ttl is None else negative_ttl,
+            max_entries=settings.GEOCODE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+
+    def _is_negative(self, entry) -> bool:
+        return entry.is_negative
+
+    def get(self, address: str) -> Tuple[bool, Optional[Tuple[float, float]]]:
+        """Return (hit, coords); a hit with coords None is a cached "no such place" answer"""
+        entry = self._lookup(make_cache_key(normalize_address(address)))
+        if entry is None:
+            return False, None
+        if entry.is_negative:
+            return True, None
+        return True, (entry.latitude, entry.longitude)
+
+    def set(self, address: str, coords: Optional[Tuple[float, float]]) -> None:
+        query = normalize_address(address)
+        self._store(
+            make_cache_key(query),
+            query=query,
+            latitude=coords[0] if coords else None,
+            longitude=coords[1] if coords else None
+        )
+
+
+class ReverseGeocodeCache(ModelCache):
+    """Reverse-geocode labels keyed on the geohash cell containing the point"""
+    model = ReverseGeocodeCacheEntry
+    name = "reverse_geocode"
+
+    def __init__(self, precision: int = None, ttl: int = None, negative_ttl: int = None, max_entries: int = None):
+        super().__init__(
+            ttl=settings.REVERSE_GEOCODE_CACHE_TTL if ttl is None else ttl,
+            negative_ttl=settings.REVERSE_GEOCODE_CACHE_NEGATIVE_TTL if negative_ttl is None else negative_ttl,
+            max_entries=settings.REVERSE_GEOCODE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+        self.precision = settings.REVERSE_GEOCODE_CACHE_PRECISION if precision is None else precision
+
+    def _is_negative(self, entry) -> bool:
+        return entry.is_negative
+
+    def cell(self, lat: float, lon: float) -> str:
+        return geohash(lat, lon, self.precision)
+
+    def get(self, lat: float, lon: float) -> Tuple[bool, Optional[str]]:
+        entry = self._lookup(make_cache_key("reverse", self.cell(lat, lon)))
+        if entry is None:
+            return False, None
+        return True, entry.label
+
+    def set(self, lat: float, lon: float, label: Optional[str], zoom: Optional[int] = None) -> None:
+        cell = self.cell(lat, lon)
+        self._store(make_cache_key("reverse", cell), cell=cell, label=label, zoom=zoom)
+
+
+class RouteLegCache(ModelCache):
+    """Routed legs keyed on endpoints rounded to `precision` decimal places.
+
+    Geometry is stored as an encoded polyline; distance (m) and duration (s)
+    are the ORS segment figures for the leg.
+    """
+    model = RouteLegCacheEntry
+    name = "route_leg"
+    POLYLINE_PRECISION = 6
+
+    def __init__(self, precision: int = None, ttl: int = None, max_entries: int = None):
+        ttl = settings.ROUTE_CACHE_TTL if ttl is None else ttl
+        super().__init__(
+            ttl=ttl,
+            negative_ttl=ttl,
+            max_entries=settings.ROUTE_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+        self.precision = settings.ROUTE_CACHE_COORD_PRECISION if precision is None else precision
+
+    def _endpoints(self, start: Tuple[float, float], end: Tuple[float, float]) -> Tuple[float, float, float, float]:
+        return (
+            round(start[0], self.precision), round(start[1], self.precision),
+            round(end[0], self.precision), round(end[1], self.precision)
+        )
+
+    def get(self, start: Tuple[float, float], end: Tuple[float, float]) -> Optional[Dict]:
+        entry = self._lookup(make_cache_key("leg", *self._endpoints(start, end)))
+        if entry is None:
+            return None
+        return {
+            "coordinates": polyline.decode(entry.geometry, self.POLYLINE_PRECISION),
+            "distance": entry.distance,
+            "duration": entry.duration
+        }
+
+    def normalize(self, leg: Dict) -> Dict:
+        """The leg as `get` will return it once stored, i.e. with geometry at POLYLINE_PRECISION"""
+        encoded = polyline.encode(leg["coordinates"], self.POLYLINE_PRECISION)
+        return dict(leg, coordinates=polyline.decode(encoded, self.POLYLINE_PRECISION))
+
+    def set(self, start: Tuple[float, float], end: Tuple[float, float], leg: Dict) -> None:
+        endpoints = self._endpoints(start, end)
+        self._store(
+            make_cache_key("leg", *endpoints),
+            start_latitude=endpoints[0],
+            start_longitude=endpoints[1],
+            end_latitude=endpoints[2],
+            end_longitude=endpoints[3],
+            geometry=polyline.encode(leg["coordinates"], self.POLYLINE_PRECISION),
+            distance=leg["distance"],
+            duration=leg["duration"]
+        )
+
+
+class PlanResultCache(ModelCache):
+    """Whole calculate-trip responses keyed on the canonical validated request and start time.
+
+    A response is a function of the request and its start time (given that
+    the upstream caches do not change under it), so byte-identical requests
+    in the same start-time bucket are answered from here. The ETag is a hash
+    of the stored response.
+    """
+    model = PlanResultCacheEntry
+    name = "plan_result"
+
+    def __init__(self, ttl: int = None, max_entries: int = None):
+        ttl = settings.PLAN_CACHE_TTL if ttl is None else ttl
+        super().__init__(
+            ttl=ttl,
+            negative_ttl=ttl,
+            max_entries=settings.PLAN_CACHE_MAX_ENTRIES if max_entries is None else max_entries
+        )
+
+    @staticmethod
+    def key(data: Dict, start_time: datetime) -> str:
+        canonical = orjson.dumps(
+            {name: value for name, value in data.items() if name != "start_time"},
+            option=orjson.OPT_SORT_KEYS
+        )
+        return make_cache_key("plan", canonical.decode("utf-8"), start_time.isoformat())
+
+    @staticmethod
+    def etag(response: Dict) -> str:
+        body = orjson.dumps(response, option=orjson.OPT_SORT_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+        return hashlib.sha256(body).hexdigest()
+
+    def get(self, key: str) -> Optional[Tuple[Dict, str]]:
+        """(response, etag) or None"""
+        entry = self._lookup(key)
+        if entry is None:
+            return None
+        return entry.response, entry.etag
+
+    def set(self, key: str, response: Dict) -> str:
+        etag = self.etag(response)
+        self._store(key, etag=etag, response=response)
+        return etag
+
+    def invalidate_plan(self, plan_id) -> None:
+        """Drop cached responses for a saved plan, e.g. once it has been replanned"""
+        try:
+            self.model.objects.filter(response__plan_id=str(plan_id)).delete()
+        except DatabaseError:
+            pass
@@ -0,0 +1,81 @@
+import contextvars
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import wraps
+from typing import Callable, Iterable, List, Optional, Tuple
+
+from django.db import connections
+
+
+def run_bounded(func: Callable, items: Iterable, max_workers: int) -> List:
+    """Apply func to every item on a bounded thread pool, returning results in input order.
+
+    Each call runs in a copy of the caller's context, so request-scoped
+    context variables (see metrics.ServerTimings) reach the worker threads.
+    """
+    items = list(items)
+    if len(items) <= 1 or max_workers <= 1:
+        return [func(item) for item in items]
+
+    def call(item, context):
+        try:
+            return context.run(func, item)
+        finally:
+            connections.close_all()
+
+    contexts = [contextvars.copy_context() for _ in items]
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(items))) as executor:
+        return list(executor.map(call, items, contexts))
+
+
+def closing_connections(func: Callable) -> Callable:
+    """Wrap func for a worker thread so the database connections it opened are closed afterwards"""
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            connections.close_all()
+    return wrapper
+
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+_process_pool_lock = threading.Lock()
+
+
+def _get_process_pool(max_workers: int) -> Optional[ProcessPoolExecutor]:
+    """Process-wide pool, started on first use so its spawn cost is paid once per server process"""
+    global _process_pool
+    with _process_pool_lock:
+        if _process_pool is None:
+            try:
+                _process_pool = ProcessPoolExecutor(
+                    max_workers=max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            except (OSError, NotImplementedError):
+                return None
+        return _process_pool
+
+
+def run_in_processes(func: Callable, jobs: List[Tuple], max_workers: int) -> List:
+    """func(*job) for every job on a process pool, results in input order.
+
+    `func` must be importable without Django (workers are spawned, not
+    forked). Runs in-process when there is one CPU or one job, or when the
+    pool cannot be started or breaks.
+    """
+    global _process_pool
+    max_workers = min(max_workers, os.cpu_count() or 1)
+    if len(jobs) > 1 and max_workers > 1:
+        pool = _get_process_pool(max_workers)
+        if pool is not None:
+            try:
+                return list(pool.map(func, *zip(*jobs), chunksize=max(1, len(jobs) // (max_workers * 4))))
+            except (BrokenProcessPool, OSError):
+                with _process_pool_lock:
+                    _process_pool = None
+    return [func(*job) for job in jobs]
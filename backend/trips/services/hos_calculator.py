@@ -1,7 +1,9 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
+from datetime import datetime
+from typing import List, Dict
 from enum import Enum
 
+from .timeline import TimelineEvent, to_minutes
+
 
 class DutyStatus(Enum):
     OFF_DUTY = "off_duty"
@@ -25,145 +27,147 @@ class HOSCalculator:
         self.start_time = start_time
         self.available_70_hour_hours = self.MAX_70_HOUR_LIMIT - current_cycle_used
     
+    @staticmethod
+    def _minutes(hours: float) -> int:
+        return int(round(hours * 60))
+    
     def calculate_trip_timeline(
         self,
         total_distance_miles: float,
         pickup_duration: float = 1.0,
         dropoff_duration: float = 1.0
     ) -> Dict:
-        timeline = []
-        current_time = self.start_time
-        total_driving_hours = total_distance_miles / self.AVERAGE_SPEED_MPH
+        """Timeline of TimelineEvents (whole minutes, wall clock of start_time's zone) plus hour totals.
         
-        timeline.append({
-            "time": current_time,
-            "status": DutyStatus.ON_DUTY_NOT_DRIVING.value,
-            "description": "Pickup",
-            "duration": pickup_duration,
-            "location": None
-        })
-        current_time += timedelta(hours=pickup_duration)
+        A pickup_duration of 0 (pickup already done, see TripPlanner.replan) leaves the pickup out.
+        """
+        timeline = []
+        current_time = to_minutes(self.start_time)
+        total_driving_minutes = self._minutes(total_distance_miles / self.AVERAGE_SPEED_MPH)
         
-        driving_segments = self._calculate_driving_segments(
-            total_driving_hours,
-            current_time
-        )
+        if pickup_duration > 0:
+            timeline.append(TimelineEvent(
+                current_time,
+                self._minutes(pickup_duration),
+                DutyStatus.ON_DUTY_NOT_DRIVING.value,
+                "Pickup"
+            ))
+            current_time = timeline[-1].end
         
+        driving_segments = self._calculate_driving_segments(total_driving_minutes, current_time)
         timeline.extend(driving_segments)
+        if driving_segments:
+            current_time = timeline[-1].end
         
-        if timeline:
-            last_event = timeline[-1]
-            current_time = last_event["time"] + timedelta(hours=last_event.get("duration", 0))
-        
-        timeline.append({
-            "time": current_time,
-            "status": DutyStatus.ON_DUTY_NOT_DRIVING.value,
-            "description": "Dropoff",
-            "duration": dropoff_duration,
-            "location": None
-        })
+        timeline.append(TimelineEvent(
+            current_time,
+            self._minutes(dropoff_duration),
+            DutyStatus.ON_DUTY_NOT_DRIVING.value,
+            "Dropoff"
+        ))
         
         return {
             "timeline": timeline,
-            "total_driving_hours": total_driving_hours,
+            "total_driving_hours": total_driving_minutes / 60.0,
             "total_on_duty_hours": self._calculate_total_on_duty(timeline),
             "compliance": self._check_compliance(timeline)
         }
     
     def _calculate_driving_segments(
         self,
-        total_driving_hours: float,
-        start_time: datetime
-    ) -> List[Dict]:
+        total_driving_minutes: int,
+        start_time: int
+    ) -> List[TimelineEvent]:
+        window_limit = self._minutes(self.MAX_14_HOUR_WINDOW)
+        driving_limit = self._minutes(self.MAX_11_HOUR_DRIVING)
+        break_after = self._minutes(self.BREAK_AFTER_HOURS)
+        rest_minutes = self._minutes(self.MIN_10_HOUR_REST)
+        break_minutes = self._minutes(self.MIN_30_MIN_BREAK)
+        
         segments = []
         current_time = start_time
-        remaining_driving = total_driving_hours
-        cumulative_driving_since_break = 0.0
+        remaining_driving = total_driving_minutes
+        cumulative_driving_since_break = 0
         window_start = start_time
-        window_driving_hours = 0.0
+        window_driving = 0
         
         while remaining_driving > 0:
-            window_elapsed = (current_time - window_start).total_seconds() / 3600.0
-            window_remaining = self.MAX_14_HOUR_WINDOW - window_elapsed
+            window_remaining = window_limit - (current_time - window_start)
             
             driving_available_in_window = min(
-                self.MAX_11_HOUR_DRIVING - window_driving_hours,
+                driving_limit - window_driving,
                 remaining_driving
             )
             
-            if window_remaining <= 0.01 or driving_available_in_window <= 0.01:
-                segments.append({
-                    "time": current_time,
-                    "status": DutyStatus.SLEEPER_BERTH.value,
-                    "description": "10-hour rest break (sleeper berth)",
-                    "duration": self.MIN_10_HOUR_REST,
-                    "location": None
-                })
-                current_time += timedelta(hours=self.MIN_10_HOUR_REST)
+            if window_remaining <= 0 or driving_available_in_window <= 0:
+                segments.append(TimelineEvent(
+                    current_time,
+                    rest_minutes,
+                    DutyStatus.SLEEPER_BERTH.value,
+                    "10-hour rest break (sleeper berth)"
+                ))
+                current_time += rest_minutes
                 window_start = current_time
-                window_driving_hours = 0.0
-                cumulative_driving_since_break = 0.0
+                window_driving = 0
+                cumulative_driving_since_break = 0
                 continue
             
-            driving_before_break_needed = self.BREAK_AFTER_HOURS - cumulative_driving_since_break
+            driving_before_break_needed = break_after - cumulative_driving_since_break
             segment_driving = min(
                 driving_available_in_window,
                 window_remaining,
                 remaining_driving,
-                driving_before_break_needed if driving_before_break_needed > 0 else float('inf')
+                driving_before_break_needed if driving_before_break_needed > 0 else remaining_driving
             )
             
             if segment_driving <= 0:
                 break
             
-            if cumulative_driving_since_break + segment_driving >= self.BREAK_AFTER_HOURS:
-                driving_to_break = self.BREAK_AFTER_HOURS - cumulative_driving_since_break
+            if cumulative_driving_since_break + segment_driving >= break_after:
+                driving_to_break = break_after - cumulative_driving_since_break
                 
-                if driving_to_break > 0.01:
-                    segments.append({
-                        "time": current_time,
-                        "status": DutyStatus.DRIVING.value,
-                        "description": "Driving",
-                        "duration": driving_to_break,
-                        "location": None
-                    })
-                    current_time += timedelta(hours=driving_to_break)
+                if driving_to_break > 0:
+                    segments.append(TimelineEvent(
+                        current_time,
+                        driving_to_break,
+                        DutyStatus.DRIVING.value,
+                        "Driving"
+                    ))
+                    current_time += driving_to_break
                     cumulative_driving_since_break += driving_to_break
-                    window_driving_hours += driving_to_break
+                    window_driving += driving_to_break
                     remaining_driving -= driving_to_break
                 
-                segments.append({
-                    "time": current_time,
-                    "status": DutyStatus.OFF_DUTY.value,
-                    "description": "30-minute break",
-                    "duration": self.MIN_30_MIN_BREAK,
-                    "location": None
-                })
-                current_time += timedelta(hours=self.MIN_30_MIN_BREAK)
-                cumulative_driving_since_break = 0.0
+                segments.append(TimelineEvent(
+                    current_time,
+                    break_minutes,
+                    DutyStatus.OFF_DUTY.value,
+                    "30-minute break"
+                ))
+                current_time += break_minutes
+                cumulative_driving_since_break = 0
             else:
-                segments.append({
-                    "time": current_time,
-                    "status": DutyStatus.DRIVING.value,
-                    "description": "Driving",
-                    "duration": segment_driving,
-                    "location": None
-                })
-                current_time += timedelta(hours=segment_driving)
+                segments.append(TimelineEvent(
+                    current_time,
+                    segment_driving,
+                    DutyStatus.DRIVING.value,
+                    "Driving"
+                ))
+                current_time += segment_driving
                 cumulative_driving_since_break += segment_driving
-                window_driving_hours += segment_driving
+                window_driving += segment_driving
                 remaining_driving -= segment_driving
         
         return segments
     
-    def _calculate_total_on_duty(self, timeline: List[Dict]) -> float:
-        total = 0.0
+    def _calculate_total_on_duty(self, timeline: List[TimelineEvent]) -> float:
+        total = 0
         for event in timeline:
-            if event["status"] in [DutyStatus.DRIVING.value, DutyStatus.ON_DUTY_NOT_DRIVING.value]:
-                total += event.get("duration", 0.0)
-        return total
+            if event.status in [DutyStatus.DRIVING.value, DutyStatus.ON_DUTY_NOT_DRIVING.value]:
+                total += event.duration
+        return total / 60.0
     
-    def _check_compliance(self, timeline: List[Dict]) -> Dict:
+    def _check_compliance(self, timeline: List[TimelineEvent]) -> Dict:
         total_on_duty = self._calculate_total_on_duty(timeline)
         required_70_hour_hours = self.current_cycle_used + total_on_duty
         
@@ -174,4 +178,3 @@ class HOSCalculator:
             "available_hours": self.available_70_hour_hours,
             "exceeds_by": max(0, required_70_hour_hours - self.MAX_70_HOUR_LIMIT)
         }
-
@@ -0,0 +1,51 @@
+import threading
+from typing import Dict
+from urllib.parse import urlsplit
+
+import requests
+from django.conf import settings
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+def build_session(pool_maxsize: int = None, retries: int = None, backoff_factor: float = None) -> requests.Session:
+    """Keep-alive session with a sized connection pool and retry/backoff for transient upstream errors.
+
+    Only connection failures and 502/503/504 are retried here; read timeouts
+    and 429s are still handled by the callers, which know what to fall back to.
+    """
+    pool_maxsize = settings.HTTP_POOL_MAXSIZE if pool_maxsize is None else pool_maxsize
+    retries = settings.HTTP_RETRIES if retries is None else retries
+    backoff_factor = settings.HTTP_BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+    
+    retry = Retry(
+        total=retries,
+        connect=retries,
+        read=0,
+        status=retries,
+        backoff_factor=backoff_factor,
+        status_forcelist=(502, 503, 504),
+        allowed_methods=frozenset(["GET", "POST"]),
+        raise_on_status=False
+    )
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_maxsize, max_retries=retry)
+    
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(url: str) -> requests.Session:
+    """Process-wide pooled session for the host serving `url`"""
+    host = urlsplit(url).netloc
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = build_session()
+            _sessions[host] = session
+        return session
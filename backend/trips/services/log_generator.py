@@ -1,343 +1,243 @@
-from datetime import datetime, timedelta
-from typing import List, Dict, Optional
-from decimal import Decimal, ROUND_HALF_UP
+from bisect import bisect_left, bisect_right
+from datetime import datetime
+from typing import Iterator, List, Dict, Optional
+
+from .timeline import MINUTES_PER_DAY, TimelineEvent, day_start as day_start_of, format_clock, to_datetime, to_minutes
+
+
+def clock_hours(minutes: float) -> float:
+    """Hour of day plus minute/60 (seconds dropped) for a wall-clock minute"""
+    hour, minute = divmod(int(minutes) % MINUTES_PER_DAY, 60)
+    return hour + minute / 60.0
+
+
+class DrivingProgress:
+    """Piecewise-linear map from miles driven to the wall-clock minute they are reached.
+    
+    Driving event j covers the miles (mile_from[j], mile_to[j]] at a constant
+    speed between its start and end, so a lookup is one bisect over mile_to.
+    """
+    __slots__ = ("events", "speed_mph", "mile_from", "mile_to", "starts", "total_miles")
+    
+    def __init__(self, driving_events: List[TimelineEvent], speed_mph: float):
+        self.events = driving_events
+        self.speed_mph = speed_mph
+        self.mile_from = []
+        self.mile_to = []
+        driven = 0.0
+        for event in driving_events:
+            self.mile_from.append(driven)
+            driven += event.hours * speed_mph
+            self.mile_to.append(driven)
+        self.starts = [event.start for event in driving_events]
+        self.total_miles = sum(event.hours * speed_mph for event in driving_events)
+    
+    def minute_at(self, miles: float) -> Optional[float]:
+        """Minute the given miles of driving are reached, or None when they are never driven"""
+        index = bisect_left(self.mile_to, miles)
+        if index < len(self.events):
+            event = self.events[index]
+            if self.mile_from[index] < miles:
+                reached = event.start + (miles - self.mile_from[index]) / self.speed_mph * 60.0
+                if event.start <= reached <= event.end:
+                    return reached
+            return None
+        
+        # sum() can land a rounding error past the last mile_to; spread those miles over the driving span
+        if miles <= self.total_miles:
+            first_start = self.events[0].start
+            reached = first_start + (miles / self.total_miles) * (self.events[-1].end - first_start)
+            index = bisect_right(self.starts, reached) - 1
+            return min(reached, self.events[index].end) if index >= 0 else self.events[-1].end
+        return None
+
+
+class CityIndex:
+    """One sheet's cities sorted by hours_into_day for nearest-city lookups, plus name -> type"""
+    __slots__ = ("cities", "order", "hours", "types", "dropoff")
+    
+    def __init__(self, cities: List[Dict]):
+        self.cities = cities
+        self.order = sorted(range(len(cities)), key=lambda i: cities[i].get("hours_into_day", 0))
+        self.hours = [cities[i].get("hours_into_day", 0) for i in self.order]
+        self.types = {}
+        for city in cities:
+            self.types.setdefault(city.get("name"), city.get("type", "intermediate"))
+        self.dropoff = next((c for c in cities if c.get("type") == "dropoff"), None)
+    
+    def nearest(self, hours: float, within: float) -> Optional[Dict]:
+        """Closest city strictly within `within` hours; ties go to the one listed first"""
+        position = bisect_left(self.hours, hours)
+        best = None
+        best_diff = within
+        if position > 0:
+            left = bisect_left(self.hours, self.hours[position - 1])
+            diff = abs(self.hours[left] - hours)
+            if diff < best_diff:
+                best, best_diff = left, diff
+        if position < len(self.hours):
+            diff = abs(self.hours[position] - hours)
+            if diff < best_diff or (diff == best_diff and best is not None and self.order[position] < self.order[best]):
+                best = position
+        return self.cities[self.order[best]] if best is not None else None
 
 
 class LogGenerator:
-    MINUTES_PER_DAY = 24 * 60
+    MINUTES_PER_DAY = MINUTES_PER_DAY
     AVERAGE_SPEED_MPH = 60.0
     
-    def _calculate_city_times(self, timeline: List[Dict], intermediate_cities: List[Dict]) -> List[Dict]:
-        """Calculate actual times when each city distance is reached based on timeline driving segments"""
+    def _minutes_for_miles(self, miles: float) -> float:
+        return miles / self.AVERAGE_SPEED_MPH * 60.0
+    
+    def _calculate_city_times(self, timeline: List[TimelineEvent], intermediate_cities: List[Dict]) -> List[Dict]:
+        """Calculate the wall-clock minute (reached_minute) at which each city distance is reached from the driving segments"""
         cities_with_times = []
         
-        if not intermediate_cities:
+        driving = DrivingProgress(
+            [event for event in timeline if event.status == "driving"],
+            self.AVERAGE_SPEED_MPH
+        )
+        if not intermediate_cities or not driving.events:
             return cities_with_times
         
         sorted_cities = sorted(intermediate_cities, key=lambda x: x["distance_miles"])
         
-        first_driving_event = next((e for e in timeline if e["status"] == "driving"), None)
-        first_event = timeline[0] if timeline else None
+        first_driving_event = driving.events[0]
         pickup_city = next((c for c in sorted_cities if c.get("type") == "pickup"), None)
         start_to_pickup_distance = pickup_city["distance_miles"] if pickup_city else 0.0
         
-        total_driving_miles = sum(
-            event.get("duration", 0) * self.AVERAGE_SPEED_MPH 
-            for event in timeline 
-            if event.get("status") == "driving"
-        )
-        
-        if start_to_pickup_distance > 0 and first_driving_event and first_event:
-            hours_to_pickup = start_to_pickup_distance / self.AVERAGE_SPEED_MPH
-            trip_start_time = first_event["time"]
+        if start_to_pickup_distance > 0:
+            trip_start_time = timeline[0].start
         else:
-            hours_to_pickup = 0
-            trip_start_time = first_driving_event["time"] if first_driving_event else None
-        
-        cumulative_driving_miles = 0.0
-        city_index = 0
-        last_driving_end_time = None
-        
-        for event in timeline:
-            if event["status"] != "driving":
-                continue
-            
-            driving_hours = event.get("duration", 0)
-            driving_miles = driving_hours * self.AVERAGE_SPEED_MPH
-            event_start_time = event["time"]
-            last_driving_end_time = event_start_time + timedelta(hours=driving_hours)
-            
-            while city_index < len(sorted_cities):
-                city = sorted_cities[city_index]
-                city_distance_from_start = city["distance_miles"]
-                
-                if city_distance_from_start == 0 and city.get("type") == "start":
-                    if trip_start_time:
-                        cities_with_times.append({
-                            "name": city["name"],
-                            "distance_miles": 0,
-                            "reached_time": trip_start_time,
-                            "type": "start"
-                        })
-                    city_index += 1
-                    continue
-                
-                if city.get("type") == "pickup" and first_driving_event:
-                    cities_with_times.append({
-                        "name": city["name"],
-                        "distance_miles": city_distance_from_start,
-                        "reached_time": first_driving_event["time"],
-                        "type": "pickup"
-                    })
-                    city_index += 1
-                    continue
-                
-                if city_distance_from_start < start_to_pickup_distance:
-                    if trip_start_time and start_to_pickup_distance > 0:
-                        hours_from_start = city_distance_from_start / self.AVERAGE_SPEED_MPH
-                        city_reached_time = trip_start_time + timedelta(hours=hours_from_start)
-                        
-                        cities_with_times.append({
-                            "name": city["name"],
-                            "distance_miles": city_distance_from_start,
-                            "reached_time": city_reached_time,
-                            "type": city.get("type", "intermediate")
-                        })
-                    else:
-                        if trip_start_time:
-                            cities_with_times.append({
-                                "name": city["name"],
-                                "distance_miles": city_distance_from_start,
-                                "reached_time": trip_start_time,
-                                "type": city.get("type", "intermediate")
-                            })
-                    city_index += 1
-                    continue
-                
-                distance_from_pickup = city_distance_from_start - start_to_pickup_distance
-                
-                if cumulative_driving_miles < distance_from_pickup <= cumulative_driving_miles + driving_miles:
-                    miles_into_segment = distance_from_pickup - cumulative_driving_miles
-                    hours_into_segment = miles_into_segment / self.AVERAGE_SPEED_MPH
-                    city_reached_time = event_start_time + timedelta(hours=hours_into_segment)
-                    
-                    event_end = event_start_time + timedelta(hours=driving_hours)
-                    if event_start_time <= city_reached_time <= event_end:
-                        cities_with_times.append({
-                            "name": city["name"],
-                            "distance_miles": city_distance_from_start,
-                            "reached_time": city_reached_time,
-                            "type": city.get("type", "intermediate")
-                        })
-                    city_index += 1
-                elif distance_from_pickup > cumulative_driving_miles + driving_miles:
-                    break
-                else:
-                    city_index += 1
-            
-            cumulative_driving_miles += driving_miles
-            
-            if city_index >= len(sorted_cities):
-                break
+            trip_start_time = first_driving_event.start
         
-        while city_index < len(sorted_cities):
-            city = sorted_cities[city_index]
+        for city in sorted_cities:
             city_distance_from_start = city["distance_miles"]
+            city_type = city.get("type", "intermediate")
             
-            if city_distance_from_start >= start_to_pickup_distance:
-                distance_from_pickup = city_distance_from_start - start_to_pickup_distance
-                
-                temp_cumulative = 0.0
-                found = False
-                for event in timeline:
-                    if event["status"] == "driving":
-                        driving_miles = event.get("duration", 0) * self.AVERAGE_SPEED_MPH
-                        if temp_cumulative + driving_miles >= distance_from_pickup:
-                            miles_into_segment = distance_from_pickup - temp_cumulative
-                            hours_into_segment = miles_into_segment / self.AVERAGE_SPEED_MPH
-                            city_reached_time = event["time"] + timedelta(hours=hours_into_segment)
-                            
-                            event_end = event["time"] + timedelta(hours=event.get("duration", 0))
-                            if event["time"] <= city_reached_time <= event_end:
-                                cities_with_times.append({
-                                    "name": city["name"],
-                                    "distance_miles": city_distance_from_start,
-                                    "reached_time": city_reached_time,
-                                    "type": city.get("type", "intermediate")
-                                })
-                                found = True
-                                break
-                        temp_cumulative += driving_miles
-                
-                if not found:
-                    temp_cumulative = 0.0
-                    for event in timeline:
-                        if event["status"] == "driving":
-                            driving_miles = event.get("duration", 0) * self.AVERAGE_SPEED_MPH
-                            
-                            if temp_cumulative < distance_from_pickup <= temp_cumulative + driving_miles:
-                                miles_into_segment = distance_from_pickup - temp_cumulative
-                                hours_into_segment = miles_into_segment / self.AVERAGE_SPEED_MPH
-                                city_reached_time = event["time"] + timedelta(hours=hours_into_segment)
-                                
-                                event_end = event["time"] + timedelta(hours=event.get("duration", 0))
-                                if event["time"] <= city_reached_time <= event_end:
-                                    cities_with_times.append({
-                                        "name": city["name"],
-                                        "distance_miles": city_distance_from_start,
-                                        "reached_time": city_reached_time,
-                                        "type": city.get("type", "intermediate")
-                                    })
-                                    found = True
-                                    break
-                            
-                            temp_cumulative += driving_miles
-                    
-                    if not found and distance_from_pickup <= total_driving_miles and first_driving_event and last_driving_end_time:
-                        distance_ratio = distance_from_pickup / total_driving_miles if total_driving_miles > 0 else 0
-                        timeline_start = first_driving_event["time"]
-                        timeline_end = last_driving_end_time
-                        timeline_duration = (timeline_end - timeline_start).total_seconds() / 3600.0
-                        
-                        estimated_hours = distance_ratio * timeline_duration
-                        city_reached_time = timeline_start + timedelta(hours=estimated_hours)
-                        
-                        closest_segment = None
-                        min_time_diff = float('inf')
-                        for event in timeline:
-                            if event["status"] == "driving":
-                                event_start = event["time"]
-                                event_end = event["time"] + timedelta(hours=event.get("duration", 0))
-                                if event_start <= city_reached_time <= event_end:
-                                    closest_segment = event
-                                    break
-                                if event_start <= city_reached_time:
-                                    time_diff = (city_reached_time - event_start).total_seconds()
-                                    if time_diff < min_time_diff:
-                                        min_time_diff = time_diff
-                                        closest_segment = event
-                        
-                        if closest_segment:
-                            event_start = closest_segment["time"]
-                            event_end = event_start + timedelta(hours=closest_segment.get("duration", 0))
-                            if city_reached_time < event_start:
-                                city_reached_time = event_start
-                            elif city_reached_time > event_end:
-                                city_reached_time = event_end
-                            
-                            cities_with_times.append({
-                                "name": city["name"],
-                                "distance_miles": city_distance_from_start,
-                                "reached_time": city_reached_time,
-                                "type": city.get("type", "intermediate")
-                            })
-                            found = True
-                        elif last_driving_end_time:
-                            cities_with_times.append({
-                                "name": city["name"],
-                                "distance_miles": city_distance_from_start,
-                                "reached_time": last_driving_end_time,
-                                "type": city.get("type", "intermediate")
-                            })
-                            found = True
+            if city_distance_from_start == 0 and city_type == "start":
+                city_distance_from_start = 0
+                city_reached_time = trip_start_time
+            elif city_type == "pickup":
+                city_reached_time = first_driving_event.start
+            elif city_distance_from_start < start_to_pickup_distance:
+                city_reached_time = trip_start_time + self._minutes_for_miles(city_distance_from_start)
+            else:
+                city_reached_time = driving.minute_at(city_distance_from_start - start_to_pickup_distance)
             
-            city_index += 1
+            if city_reached_time is not None:
+                cities_with_times.append({
+                    "name": city["name"],
+                    "distance_miles": city_distance_from_start,
+                    "reached_minute": city_reached_time,
+                    "type": city_type
+                })
         
         return cities_with_times
     
     def generate_log_sheets(
         self,
-        timeline: List[Dict],
+        timeline: List[TimelineEvent],
         start_time: datetime,
         total_miles: float,
         carrier_info: Dict,
         vehicle_info: Dict,
         intermediate_cities: List[Dict] = None
     ) -> List[Dict]:
-        log_sheets = []
-        end_time = timeline[-1]["time"] + timedelta(hours=timeline[-1].get("duration", 0))
-        
-        cities_with_times = self._calculate_city_times(timeline, intermediate_cities or [])
+        return list(self.iter_log_sheets(
+            timeline, start_time, total_miles, carrier_info, vehicle_info, intermediate_cities
+        ))
+    
+    def iter_log_sheets(
+        self,
+        timeline: List[TimelineEvent],
+        start_time: datetime,
+        total_miles: float,
+        carrier_info: Dict,
+        vehicle_info: Dict,
+        intermediate_cities: List[Dict] = None
+    ) -> Iterator[Dict]:
+        """One sheet per calendar day, yielded as each day is finished and built in a single sweep.
         
-        all_cities_for_remarks = []
-        for city_with_time in cities_with_times:
-            all_cities_for_remarks.append({
-                "name": city_with_time["name"],
-                "hours_into_day": 0,
-                "distance": city_with_time["distance_miles"],
-                "type": city_with_time.get("type", "intermediate")
-            })
+        Events (sorted by start) and cities (sorted by the minute they are reached)
+        are each walked once with pointers that only move forward; a day's sheet
+        sees the events overlapping it and the cities reached from an hour before
+        its midnight to an hour after the next one.
+        """
+        tz = start_time.tzinfo
+        end_time = timeline[-1].end
+        events = sorted(timeline, key=lambda e: e.start)
         
-        total_days = (end_time.date() - start_time.replace(hour=0, minute=0, second=0, microsecond=0).date()).days + 1
+        cities_with_times = self._calculate_city_times(timeline, intermediate_cities or [])
+        city_minutes = [int(city["reached_minute"]) for city in cities_with_times]
+        city_days = [int(city["reached_minute"] // self.MINUTES_PER_DAY) for city in cities_with_times]
+        city_entries = [
+            {
+                "name": city["name"],
+                "hours_into_day": clock_hours(city["reached_minute"]),
+                "distance": city["distance_miles"],
+                "type": city.get("type", "intermediate")
+            }
+            for city in cities_with_times
+        ]
+        off_day_entries = [dict(entry, hours_into_day=12.0) for entry in city_entries]
+        city_order = sorted(range(len(cities_with_times)), key=lambda i: city_minutes[i])
+        dropoff_city = next((c for c in cities_with_times if c.get("type") == "dropoff"), None)
         
-        current_day_start = start_time.replace(hour=0, minute=0, second=0, microsecond=0)
+        current_day_start = day_start_of(to_minutes(start_time))
+        total_days = (end_time // self.MINUTES_PER_DAY - current_day_start // self.MINUTES_PER_DAY) + 1
         day_index = 0
         last_city_from_previous_day = None
+        first_event = 0
+        window_start = 0
+        window_end = 0
         
         while current_day_start < end_time:
-            next_day_start = current_day_start + timedelta(days=1)
+            next_day_start = current_day_start + self.MINUTES_PER_DAY
             is_last_day = (day_index == total_days - 1) or (next_day_start >= end_time)
+            day_date = current_day_start // self.MINUTES_PER_DAY
+            
+            while first_event < len(events) and events[first_event].end <= current_day_start:
+                first_event += 1
             
             sheet_timeline = []
-            for event in timeline:
-                event_start = event["time"]
-                event_end = event_start + timedelta(hours=event.get("duration", 0))
-                if event_start < next_day_start and event_end > current_day_start:
-                    day_event = event.copy()
-                    if event_start < current_day_start:
-                        day_event["time"] = current_day_start
-                        original_duration = event.get("duration", 0)
-                        elapsed_before_day = (current_day_start - event_start).total_seconds() / 3600.0
-                        day_event["duration"] = max(0, original_duration - elapsed_before_day)
-                    else:
-                        day_event["time"] = event_start
-                    if event_end > next_day_start:
-                        day_event["duration"] = min(day_event.get("duration", 0), (next_day_start - day_event["time"]).total_seconds() / 3600.0)
-                    if day_event.get("duration", 0) > 0:
+            index = first_event
+            while index < len(events) and events[index].start < next_day_start:
+                event = events[index]
+                if event.end > current_day_start:
+                    day_event = event.clipped(current_day_start, next_day_start)
+                    if day_event.duration > 0:
                         sheet_timeline.append(day_event)
+                index += 1
             
             if not sheet_timeline and current_day_start < end_time:
-                sheet_timeline = [{
-                    "time": current_day_start,
-                    "status": "off_duty",
-                    "description": "Off duty",
-                    "duration": 24.0,
-                    "location": None
-                }]
+                sheet_timeline = [TimelineEvent(current_day_start, self.MINUTES_PER_DAY, "off_duty", "Off duty")]
             
-            next_day_start = current_day_start + timedelta(days=1)
-            is_last_day = (day_index == total_days - 1) or (next_day_start >= end_time)
+            while window_start < len(city_order) and city_minutes[city_order[window_start]] < current_day_start - 60:
+                window_start += 1
+            while window_end < len(city_order) and city_minutes[city_order[window_end]] < next_day_start + 60:
+                window_end += 1
             
-            day_cities = []
+            # Cities reached today, in the last hour of yesterday or the first hour of tomorrow,
+            # in their original order so the stable sort below breaks ties as before
+            window = sorted(city_order[window_start:window_end])
+            day_cities = [dict(city_entries[i]) for i in window]
             
-            for city_with_time in cities_with_times:
-                city_reached_time = city_with_time["reached_time"]
-                city_date = city_reached_time.date()
-                day_date = current_day_start.date()
-                next_day_date = next_day_start.date()
-                
-                if day_date <= city_date < next_day_date:
-                    if city_date == day_date:
-                        hours_into_day = city_reached_time.hour + city_reached_time.minute / 60.0
-                    else:
-                        hours_into_day = city_reached_time.hour + city_reached_time.minute / 60.0
-                    
-                    day_cities.append({
-                        "name": city_with_time["name"],
-                        "hours_into_day": hours_into_day,
-                        "distance": city_with_time["distance_miles"],
-                        "type": city_with_time.get("type", "intermediate")
-                    })
-                elif abs((city_date - day_date).days) == 1:
-                    if city_date > day_date and city_reached_time.hour < 1:
-                        hours_into_day = city_reached_time.hour + city_reached_time.minute / 60.0
-                        day_cities.append({
-                            "name": city_with_time["name"],
-                            "hours_into_day": hours_into_day,
-                            "distance": city_with_time["distance_miles"],
-                            "type": city_with_time.get("type", "intermediate")
-                        })
-                    elif city_date < day_date and city_reached_time.hour >= 23:
-                        hours_into_day = city_reached_time.hour + city_reached_time.minute / 60.0
-                        day_cities.append({
-                            "name": city_with_time["name"],
-                            "hours_into_day": hours_into_day,
-                            "distance": city_with_time["distance_miles"],
-                            "type": city_with_time.get("type", "intermediate")
-                        })
+            all_cities_for_remarks_context = list(off_day_entries)
+            for i in window:
+                if city_days[i] == day_date:
+                    all_cities_for_remarks_context[i] = city_entries[i]
             
             if not day_cities and sheet_timeline:
-                dropoff_event = next((e for e in sheet_timeline if e.get("description", "").lower() == "dropoff"), None)
+                dropoff_event = next((e for e in sheet_timeline if e.description.lower() == "dropoff"), None)
                 if dropoff_event:
-                    dropoff_time = dropoff_event["time"]
-                    hours_into_day = (dropoff_time - current_day_start).total_seconds() / 3600.0
+                    hours_into_day = (dropoff_event.start - current_day_start) / 60.0
                     if 0 <= hours_into_day < 24:
                         dropoff_location = carrier_info.get("to", "")
                         if dropoff_location:
                             location_parts = dropoff_location.split(",")
                             city_name = location_parts[0].strip() if location_parts else dropoff_location
                             
-                            dropoff_city = next((c for c in cities_with_times if c.get("type") == "dropoff"), None)
                             if dropoff_city:
                                 city_name = dropoff_city.get("name", city_name)
                             
@@ -368,66 +268,10 @@ class LogGenerator:
             day_carrier_info["from"] = day_from_location
             day_carrier_info["to"] = day_to_location
             
-            all_cities_for_day = []
-            for city_with_time in cities_with_times:
-                city_reached_time = city_with_time["reached_time"]
-                city_date = city_reached_time.date()
-                day_date = current_day_start.date()
-                next_day_date = next_day_start.date()
-                
-                if day_date <= city_date < next_day_date:
-                    if city_date == day_date:
-                        hours_into_day = city_reached_time.hour + city_reached_time.minute / 60.0
-                    else:
-                        hours_into_day = city_reached_time.hour + city_reached_time.minute / 60.0
-                    
-                    all_cities_for_day.append({
-                        "name": city_with_time["name"],
-                        "hours_into_day": hours_into_day,
-                        "distance": city_with_time["distance_miles"],
-                        "type": city_with_time.get("type", "intermediate")
-                    })
-                elif abs((city_date - day_date).days) == 1:
-                    if city_date > day_date and city_reached_time.hour < 1:
-                        hours_into_day = city_reached_time.hour + city_reached_time.minute / 60.0
-                        all_cities_for_day.append({
-                            "name": city_with_time["name"],
-                            "hours_into_day": hours_into_day,
-                            "distance": city_with_time["distance_miles"],
-                            "type": city_with_time.get("type", "intermediate")
-                        })
-                    elif city_date < day_date and city_reached_time.hour >= 23:
-                        hours_into_day = city_reached_time.hour + city_reached_time.minute / 60.0
-                        all_cities_for_day.append({
-                            "name": city_with_time["name"],
-                            "hours_into_day": hours_into_day,
-                            "distance": city_with_time["distance_miles"],
-                            "type": city_with_time.get("type", "intermediate")
-                        })
-            
-            all_cities_for_remarks_context = []
-            for city_with_time in cities_with_times:
-                city_reached_time = city_with_time["reached_time"]
-                city_date = city_reached_time.date()
-                day_date = current_day_start.date()
-                next_day_date = next_day_start.date()
-                
-                if day_date <= city_date < next_day_date:
-                    hours_into_day = city_reached_time.hour + city_reached_time.minute / 60.0
-                else:
-                    hours_into_day = 12.0
-                
-                all_cities_for_remarks_context.append({
-                    "name": city_with_time["name"],
-                    "hours_into_day": hours_into_day,
-                    "distance": city_with_time["distance_miles"],
-                    "type": city_with_time.get("type", "intermediate")
-                })
-            
             log_sheet = self._generate_single_log_sheet(
                 sheet_timeline,
                 current_day_start,
-                next_day_start,
+                tz,
                 total_miles if day_index == 0 else 0.0,
                 day_carrier_info,
                 vehicle_info,
@@ -436,7 +280,7 @@ class LogGenerator:
                 all_cities_for_remarks_context
             )
             
-            log_sheets.append(log_sheet)
+            yield log_sheet
             
             if day_cities:
                 sorted_day_cities = sorted(day_cities, key=lambda x: x["hours_into_day"])
@@ -446,14 +290,12 @@ class LogGenerator:
             
             current_day_start = next_day_start
             day_index += 1
-        
-        return log_sheets
     
     def _generate_single_log_sheet(
         self,
-        timeline: List[Dict],
-        start_time: datetime,
-        end_time: datetime,
+        timeline: List[TimelineEvent],
+        start_time: int,
+        tz,
         total_miles: float,
         carrier_info: Dict,
         vehicle_info: Dict,
@@ -468,7 +310,7 @@ class LogGenerator:
         miles_today = totals.get("driving", 0.0) * 60.0
         
         return {
-            "date": start_time.strftime("%m/%d/%Y"),
+            "date": to_datetime(start_time, tz).strftime("%m/%d/%Y"),
             "from": carrier_info.get("from", ""),
             "to": carrier_info.get("to", ""),
             "total_miles_driving": round(miles_today, 1),
@@ -491,9 +333,10 @@ class LogGenerator:
     
     def _generate_grid(
         self,
-        timeline: List[Dict],
-        day_start: datetime
+        timeline: List[TimelineEvent],
+        day_start: int
     ) -> Dict:
+        """Per-status minute ranges for one day; `timeline` is in start order (see iter_log_sheets)"""
         grid = {
             "off_duty": [],
             "sleeper_berth": [],
@@ -501,24 +344,18 @@ class LogGenerator:
             "on_duty_not_driving": []
         }
         
-        day_end = day_start + timedelta(days=1)
-        sorted_timeline = sorted(timeline, key=lambda x: x["time"])
+        day_end = day_start + self.MINUTES_PER_DAY
         last_end_minute = 0
         
-        for event in sorted_timeline:
-            event_start = event["time"]
-            event_duration_hours = event.get("duration", 0)
-            event_end = event_start + timedelta(hours=event_duration_hours)
-            
-            actual_start = max(event_start, day_start)
-            actual_end = min(event_end, day_end)
+        for event in timeline:
+            actual_start = max(event.start, day_start)
+            actual_end = min(event.end, day_end)
             
             if actual_start >= actual_end:
                 continue
             
-            start_minute = int((actual_start - day_start).total_seconds() / 60)
-            end_minute = int((actual_end - day_start).total_seconds() / 60)
-            end_minute = min(end_minute, self.MINUTES_PER_DAY)
+            start_minute = actual_start - day_start
+            end_minute = actual_end - day_start
             
             if start_minute < last_end_minute:
                 start_minute = last_end_minute
@@ -528,7 +365,7 @@ class LogGenerator:
                 
             last_end_minute = end_minute
             
-            status = event["status"]
+            status = event.status
             if status == "off_duty":
                 grid["off_duty"].append({"start": start_minute, "end": end_minute})
             elif status == "sleeper_berth":
@@ -540,59 +377,52 @@ class LogGenerator:
         
         return grid
     
-    def _calculate_totals(self, timeline: List[Dict]) -> Dict:
-        totals = {
-            "off_duty": 0.0,
-            "sleeper_berth": 0.0,
-            "driving": 0.0,
-            "on_duty_not_driving": 0.0
+    def _calculate_totals(self, timeline: List[TimelineEvent]) -> Dict:
+        minutes = {
+            "off_duty": 0,
+            "sleeper_berth": 0,
+            "driving": 0,
+            "on_duty_not_driving": 0
         }
         
         for event in timeline:
-            status = event["status"]
-            duration = event.get("duration", 0.0)
-            if status in totals:
-                totals[status] += duration
+            if event.status in minutes:
+                minutes[event.status] += event.duration
         
-        for key in totals:
-            totals[key] = round(totals[key], 2)
+        totals = {}
+        for key in minutes:
+            totals[key] = round(minutes[key] / 60.0, 2)
         
         return totals
     
-    def _generate_remarks(self, timeline: List[Dict], intermediate_cities: List[Dict] = None, day_start: datetime = None, all_intermediate_cities: List[Dict] = None, carrier_info: Dict = None) -> List[str]:
+    def _generate_remarks(self, timeline: List[TimelineEvent], intermediate_cities: List[Dict] = None, day_start: int = None, all_intermediate_cities: List[Dict] = None, carrier_info: Dict = None) -> List[str]:
         remarks = []
         all_events_and_cities = []
+        city_index = CityIndex(all_intermediate_cities) if all_intermediate_cities else None
         
         for event in timeline:
-            event_time = event["time"]
-            event_duration = event.get("duration", 0)
-            event_end = event_time + timedelta(hours=event_duration)
-            
-            if day_start:
-                day_end = day_start + timedelta(days=1)
+            if day_start is not None:
+                day_end = day_start + self.MINUTES_PER_DAY
                 
-                if event_time >= day_end or event_end <= day_start:
+                if event.start >= day_end or event.end <= day_start:
                     continue
                 
-                actual_start = max(event_time, day_start)
-                actual_end = min(event_end, day_end)
-                
-                time_diff = actual_start - day_start
-                hours_into_day = time_diff.total_seconds() / 3600.0
+                actual_start = max(event.start, day_start)
+                hours_into_day = (actual_start - day_start) / 60.0
                 
                 if hours_into_day < 0 or hours_into_day >= 24:
                     continue
                 
                 event_time_for_remarks = actual_start
             else:
-                hours_into_day = event_time.hour + event_time.minute / 60.0
-                event_time_for_remarks = event_time
+                hours_into_day = clock_hours(event.start)
+                event_time_for_remarks = event.start
             
             all_events_and_cities.append({
                 "time": event_time_for_remarks,
                 "hours_into_day": hours_into_day,
-                "description": event.get("description", ""),
-                "location": event.get("location"),
+                "description": event.description,
+                "location": event.location,
                 "type": "event"
             })
         
@@ -600,10 +430,7 @@ class LogGenerator:
             for city in intermediate_cities:
                 hours_into_day = city.get("hours_into_day", 0)
                 if hours_into_day >= 0 and hours_into_day < 24:
-                    if day_start:
-                        city_time = day_start + timedelta(hours=hours_into_day)
-                    else:
-                        city_time = datetime.now().replace(hour=int(hours_into_day), minute=int((hours_into_day - int(hours_into_day)) * 60))
+                    city_time = (day_start or 0) + round(hours_into_day * 60)
                     
                     all_events_and_cities.append({
                         "time": city_time,
@@ -616,7 +443,7 @@ class LogGenerator:
         all_events_and_cities.sort(key=lambda x: x["time"])
         
         for item in all_events_and_cities:
-            time_str = item["time"].strftime("%I:%M %p")
+            time_str = format_clock(item["time"])
             if item["type"] == "event":
                 if item.get("location"):
                     remarks.append(f"{time_str} - {item['description']} - {item['location']}")
@@ -624,16 +451,8 @@ class LogGenerator:
                     description = item['description']
                     if description.lower() in ['pickup', 'dropoff']:
                         location_context = ""
-                        if all_intermediate_cities:
-                            event_hours = item.get("hours_into_day", 0)
-                            closest_city = None
-                            min_diff = float('inf')
-                            for city in all_intermediate_cities:
-                                city_hours = city.get("hours_into_day", 0)
-                                diff = abs(city_hours - event_hours)
-                                if diff < min_diff and diff < 1.0:
-                                    min_diff = diff
-                                    closest_city = city
+                        if city_index:
+                            closest_city = city_index.nearest(item.get("hours_into_day", 0), 1.0)
                             if closest_city:
                                 city_name = closest_city.get("name", "")
                                 city_type = closest_city.get("type", "")
@@ -645,10 +464,8 @@ class LogGenerator:
                                     location_context = f" - {city_name} area"
                         
                         if not location_context and description.lower() == "dropoff":
-                            if all_intermediate_cities:
-                                dropoff_city = next((c for c in all_intermediate_cities if c.get("type") == "dropoff"), None)
-                                if dropoff_city:
-                                    location_context = f" - {dropoff_city.get('name', '')} area"
+                            if city_index and city_index.dropoff:
+                                location_context = f" - {city_index.dropoff.get('name', '')} area"
                             
                             if not location_context and carrier_info:
                                 dropoff_location = carrier_info.get("to", "")
@@ -664,22 +481,14 @@ class LogGenerator:
                         remarks.append(f"{time_str} - {description}{location_context}")
                     elif "driving" in description.lower():
                         location_context = ""
-                        if all_intermediate_cities:
-                            event_hours = item.get("hours_into_day", 0)
-                            closest_city = None
-                            min_diff = float('inf')
-                            for city in all_intermediate_cities:
-                                city_hours = city.get("hours_into_day", 0)
-                                diff = abs(city_hours - event_hours)
-                                if diff < min_diff and diff < 2.0:
-                                    min_diff = diff
-                                    closest_city = city
+                        if city_index:
+                            closest_city = city_index.nearest(item.get("hours_into_day", 0), 2.0)
                             if closest_city:
                                 city_name = closest_city.get("name", "")
                                 location_context = f" - {city_name} area"
                         
                         if not location_context and carrier_info:
-                            dropoff_city = next((c for c in (all_intermediate_cities or []) if c.get("type") == "dropoff"), None)
+                            dropoff_city = city_index.dropoff if city_index else None
                             if dropoff_city:
                                 dropoff_hours = dropoff_city.get("hours_into_day", 0)
                                 event_hours = item.get("hours_into_day", 0)
@@ -701,12 +510,7 @@ class LogGenerator:
                         remarks.append(f"{time_str} - {description}")
             else:
                 city_name = item['description']
-                city_type = None
-                if all_intermediate_cities:
-                    for city in all_intermediate_cities:
-                        if city.get("name") == city_name:
-                            city_type = city.get("type", "intermediate")
-                            break
+                city_type = city_index.types.get(city_name) if city_index else None
                 
                 if city_type == "pickup":
                     remarks.append(f"{time_str} - {city_name} - pickup area")
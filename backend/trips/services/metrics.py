@@ -0,0 +1,233 @@
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from functools import wraps
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import requests
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict) -> LabelKey:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(key) + ([extra] if extra else [])
+    if not pairs:
+        return ""
+    escaped = (
+        f'{name}="' + value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") + '"'
+        for name, value in pairs
+    )
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[LabelKey, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(_label_key(labels), 0.0)
+
+    def total(self) -> float:
+        """Sum over every label set"""
+        with self._lock:
+            return sum(self._values.values())
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        for key, value in values:
+            yield f"{self.name}{_format_labels(key)} {_format_value(value)}"
+
+
+class Histogram:
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[LabelKey, List] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            index = bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def count(self, **labels) -> int:
+        series = self._series.get(_label_key(labels))
+        return series[2] if series else 0
+
+    def samples(self) -> Iterator[str]:
+        with self._lock:
+            series = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._series.items())
+        for key, (counts, total, count) in series:
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket{_format_labels(key, ('le', _format_value(bound)))} {cumulative}"
+            yield f"{self.name}_bucket{_format_labels(key, ('le', '+Inf'))} {count}"
+            yield f"{self.name}_sum{_format_labels(key)} {_format_value(total)}"
+            yield f"{self.name}_count{_format_labels(key)} {count}"
+
+
+class MetricsRegistry:
+    """Process-wide metrics rendered in the Prometheus text exposition format.
+
+    Each worker process keeps its own registry, so a multi-process server
+    exposes one set of series per worker that answers the scrape.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, documentation: str, **kwargs):
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, **kwargs)
+            return metric
+
+    def counter(self, name: str, documentation: str) -> Counter:
+        return self._get_or_create(Counter, name, documentation)
+
+    def histogram(self, name: str, documentation: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, buckets=buckets)
+
+    def render(self) -> str:
+        lines = []
+        with self._lock:
+            metrics = sorted(self._metrics.items())
+        for name, metric in metrics:
+            lines.append(f"# HELP {name} {metric.documentation}")
+            lines.append(f"# TYPE {name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = registry.histogram("http_request_seconds", "API request latency by view")
+STAGE_SECONDS = registry.histogram("trip_stage_seconds", "Time spent in each trip planning stage")
+UPSTREAM_REQUEST_SECONDS = registry.histogram("upstream_request_seconds", "Upstream provider call latency")
+UPSTREAM_REQUESTS = registry.counter("upstream_requests_total", "Upstream provider calls by outcome")
+UPSTREAM_TIMEOUTS = registry.counter("upstream_timeouts_total", "Upstream provider calls that timed out")
+CACHE_LOOKUPS = registry.counter("cache_lookups_total", "Provider cache lookups by result (hit or miss)")
+
+
+class ServerTimings:
+    """Span durations for one request, summed by name, for the Server-Timing header"""
+
+    def __init__(self):
+        self._spans: Dict[str, List] = {}
+        self._lock = threading.Lock()
+
+    def add(self, name: str, seconds: float) -> None:
+        with self._lock:
+            span = self._spans.setdefault(name, [0.0, 0])
+            span[0] += seconds
+            span[1] += 1
+
+    def header(self) -> str:
+        with self._lock:
+            spans = list(self._spans.items())
+        return ", ".join(
+            f'{name};dur={seconds * 1000:.1f}' + (f';desc="{count} calls"' if count > 1 else "")
+            for name, (seconds, count) in spans
+        )
+
+
+_request_timings: ContextVar[Optional[ServerTimings]] = ContextVar("request_timings", default=None)
+
+
+def start_request_timings() -> Tuple[ServerTimings, Token]:
+    timings = ServerTimings()
+    return timings, _request_timings.set(timings)
+
+
+def stop_request_timings(token: Token) -> None:
+    _request_timings.reset(token)
+
+
+def record_span(name: str, seconds: float) -> None:
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(name, seconds)
+
+
+@contextmanager
+def span(name: str):
+    """Time a planning stage into trip_stage_seconds and the current request's Server-Timing"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        STAGE_SECONDS.observe(elapsed, stage=name)
+        record_span(name, elapsed)
+
+
+def timed_stage(name: str):
+    """Decorator form of span() for planner stage methods"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class UpstreamCall:
+    def __init__(self):
+        self.status: Optional[int] = None
+
+
+@contextmanager
+def upstream_call(provider: str, operation: str):
+    """Time and count one upstream HTTP call; set `.status` on the yielded object once a response arrives"""
+    call = UpstreamCall()
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        yield call
+        outcome = "ok" if call.status is not None and call.status < 400 else str(call.status)
+    except requests.exceptions.Timeout:
+        outcome = "timeout"
+        UPSTREAM_TIMEOUTS.inc(provider=provider, operation=operation)
+        raise
+    finally:
+        elapsed = time.perf_counter() - start
+        UPSTREAM_REQUEST_SECONDS.observe(elapsed, provider=provider, operation=operation)
+        UPSTREAM_REQUESTS.inc(provider=provider, operation=operation, outcome=outcome)
+        record_span(provider, elapsed)
@@ -0,0 +1,106 @@
+import csv
+import gzip
+import threading
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from .distance import EARTH_RADIUS_MILES, to_unit_vectors
+
+GAZETTEER_PATH = Path(__file__).resolve().parent.parent / "data" / "us_places.csv.gz"
+
+
+class KDTree:
+    """Static KD-tree for nearest-neighbour queries over 3-d points.
+
+    Places are stored as unit vectors, so the Euclidean (chord) distance
+    ranks them exactly like great-circle distance does.
+    """
+    LEAF_SIZE = 16
+
+    def __init__(self, points: np.ndarray):
+        self.points = points
+        self.root = self._build(np.arange(len(points)))
+
+    def _build(self, indices: np.ndarray):
+        if len(indices) <= self.LEAF_SIZE:
+            return indices
+
+        subset = self.points[indices]
+        axis = int(np.argmax(subset.max(axis=0) - subset.min(axis=0)))
+        order = indices[np.argsort(subset[:, axis], kind="stable")]
+        middle = len(order) // 2
+        split = float(self.points[order[middle], axis])
+        return (axis, split, self._build(order[:middle]), self._build(order[middle:]))
+
+    def query(self, point: np.ndarray) -> Tuple[float, int]:
+        """(chord distance, point index) of the nearest stored point"""
+        best = [float("inf"), -1]
+
+        def search(node):
+            if isinstance(node, np.ndarray):
+                distances = ((self.points[node] - point) ** 2).sum(axis=1)
+                nearest = int(distances.argmin())
+                if distances[nearest] < best[0]:
+                    best[0] = float(distances[nearest])
+                    best[1] = int(node[nearest])
+                return
+
+            axis, split, left, right = node
+            diff = point[axis] - split
+            near, far = (left, right) if diff < 0 else (right, left)
+            search(near)
+            if diff * diff < best[0]:
+                search(far)
+
+        search(self.root)
+        return float(np.sqrt(best[0])), best[1]
+
+
+class OfflineReverseGeocoder:
+    """Nearest populated place from the bundled US gazetteer (GeoNames, population >= 1000)"""
+
+    def __init__(self, path: Path = GAZETTEER_PATH):
+        names: List[str] = []
+        states: List[str] = []
+        lats: List[float] = []
+        lons: List[float] = []
+        with gzip.open(path, "rt", encoding="utf-8", newline="") as handle:
+            for row in csv.DictReader(handle):
+                names.append(row["name"])
+                states.append(row["state"])
+                lats.append(float(row["lat"]))
+                lons.append(float(row["lon"]))
+
+        self.names = names
+        self.states = states
+        self.tree = KDTree(to_unit_vectors(lats, lons))
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def nearest(self, lat: float, lon: float) -> Tuple[str, str, float]:
+        """(place name, state name, distance in miles) of the closest gazetteer entry"""
+        chord, index = self.tree.query(to_unit_vectors(lat, lon))
+        miles = 2 * EARTH_RADIUS_MILES * float(np.arcsin(min(chord / 2, 1.0)))
+        return self.names[index], self.states[index], miles
+
+    def lookup(self, lat: float, lon: float, max_miles: float) -> Optional[Tuple[str, str]]:
+        name, state, miles = self.nearest(lat, lon)
+        if miles > max_miles:
+            return None
+        return name, state
+
+
+_geocoder: Optional[OfflineReverseGeocoder] = None
+_geocoder_lock = threading.Lock()
+
+
+def get_offline_geocoder() -> OfflineReverseGeocoder:
+    """Process-wide geocoder; the gazetteer is loaded and indexed on first use"""
+    global _geocoder
+    with _geocoder_lock:
+        if _geocoder is None:
+            _geocoder = OfflineReverseGeocoder()
+        return _geocoder
@@ -0,0 +1,47 @@
+from typing import List
+
+
+def _encode_value(value: int, chunks: List[str]) -> None:
+    value = ~(value << 1) if value < 0 else value << 1
+    while value >= 0x20:
+        chunks.append(chr((0x20 | (value & 0x1f)) + 63))
+        value >>= 5
+    chunks.append(chr(value + 63))
+
+
+def encode(coordinates: List[List[float]], precision: int = 5) -> str:
+    """Google encoded-polyline string for [lon, lat] coordinates (the format itself is lat/lng ordered)"""
+    factor = 10 ** precision
+    chunks: List[str] = []
+    prev_lat = prev_lon = 0
+    for coord in coordinates:
+        lat = int(round(coord[1] * factor))
+        lon = int(round(coord[0] * factor))
+        _encode_value(lat - prev_lat, chunks)
+        _encode_value(lon - prev_lon, chunks)
+        prev_lat, prev_lon = lat, lon
+    return "".join(chunks)
+
+
+def decode(encoded: str, precision: int = 5) -> List[List[float]]:
+    """Inverse of encode(); returns [lon, lat] coordinates"""
+    factor = 10 ** precision
+    coordinates = []
+    index = lat = lon = 0
+    length = len(encoded)
+    while index < length:
+        deltas = []
+        for _ in range(2):
+            shift = result = 0
+            while True:
+                byte = ord(encoded[index]) - 63
+                index += 1
+                result |= (byte & 0x1f) << shift
+                shift += 5
+                if byte < 0x20:
+                    break
+            deltas.append(~(result >> 1) if result & 1 else result >> 1)
+        lat += deltas[0]
+        lon += deltas[1]
+        coordinates.append([lon / factor, lat / factor])
+    return coordinates
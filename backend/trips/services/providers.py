@@ -0,0 +1,301 @@
+import contextvars
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, List, Optional, Tuple
+
+from django.conf import settings
+
+from .metrics import registry
+
+PROVIDER_HEDGES = registry.counter("provider_hedges_total", "Backup provider calls fired because the primary was slow")
+BREAKER_OPENED = registry.counter("provider_breaker_opened_total", "Times a provider circuit breaker opened")
+BREAKER_SKIPS = registry.counter("provider_breaker_skips_total", "Provider calls skipped while its circuit breaker was open")
+
+
+class UpstreamCancelled(Exception):
+    """Raised instead of starting an upstream call once the request that needed it has gone away"""
+
+
+class ProviderError(Exception):
+    """An upstream answer that cannot be used (bad status, malformed body)"""
+
+
+class ProviderRejected(ProviderError):
+    """The provider answered but refused this request (a 4xx other than 429): bad input or our
+    own configuration, not a sign the provider is unhealthy
+    """
+
+
+def check_status(response, no_match_status: Optional[int] = None) -> bool:
+    """True for a 200; False for `no_match_status`. Raises ProviderRejected for other 4xx
+    responses and ProviderError for 429, 5xx and anything else
+    """
+    status = response.status_code
+    if status == 200:
+        return True
+    if status == no_match_status:
+        return False
+    if 400 <= status < 500 and status != 429:
+        raise ProviderRejected(f"HTTP {status}")
+    raise ProviderError(f"HTTP {status}")
+
+
+class ProviderUnavailable(Exception):
+    """The provider's circuit breaker is open, so it was not called"""
+
+
+class CircuitBreaker:
+    """Opens after `failure_threshold` consecutive failures; after `reset_timeout`
+    seconds one trial call is let through (half-open) and its outcome closes or
+    re-opens the breaker.
+    """
+
+    def __init__(self, failure_threshold: int, reset_timeout: float):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial_running = False
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self._opened_at is None:
+                return "closed"
+            if self._trial_running or time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if self._trial_running or time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            self._trial_running = True
+            return True
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._trial_running = False
+
+    def release(self) -> None:
+        """End a half-open trial that never reached the provider, without counting it either way"""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self) -> bool:
+        """Count a failure; True when this failure opened (or re-opened) the breaker"""
+        with self._lock:
+            self._failures += 1
+            reopened = self._trial_running
+            self._trial_running = False
+            if reopened or (self._opened_at is None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+                return True
+            return False
+
+
+class LatencyWindow:
+    """The most recent successful call latencies, for percentile estimates"""
+
+    def __init__(self, size: int):
+        self._samples = deque(maxlen=size)
+        self._lock = threading.Lock()
+
+    def add(self, seconds: float) -> None:
+        with self._lock:
+            self._samples.append(seconds)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples)
+        if not samples:
+            return None
+        index = min(len(samples) - 1, max(0, int(round(percent / 100.0 * len(samples))) - 1))
+        return samples[index]
+
+
+class Provider:
+    """One upstream provider's circuit breaker and latency window, shared by every request in the process"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.breaker = CircuitBreaker(settings.PROVIDER_BREAKER_FAILURES, settings.PROVIDER_BREAKER_RESET)
+        self.latencies = LatencyWindow(settings.PROVIDER_LATENCY_WINDOW)
+
+    def call(self, func: Callable, *args):
+        """func(*args) unless the breaker is open. Exceptions count as failures, except a
+        cancellation (not counted) and ProviderRejected (the provider did answer)
+        """
+        if not self.breaker.allow():
+            BREAKER_SKIPS.inc(provider=self.name)
+            raise ProviderUnavailable(self.name)
+        start = time.perf_counter()
+        try:
+            result = func(*args)
+        except UpstreamCancelled:
+            self.breaker.release()
+            raise
+        except ProviderRejected:
+            self.breaker.record_success()
+            raise
+        except BaseException:
+            if self.breaker.record_failure():
+                BREAKER_OPENED.inc(provider=self.name)
+            raise
+        self.latencies.add(time.perf_counter() - start)
+        self.breaker.record_success()
+        return result
+
+    def hedge_delay(self) -> float:
+        """Seconds to wait on this provider before firing a backup: its recent
+        PROVIDER_HEDGE_PERCENTILE latency, clamped to the configured bounds
+        """
+        if len(self.latencies) < settings.PROVIDER_HEDGE_MIN_SAMPLES:
+            return settings.PROVIDER_HEDGE_DEFAULT_DELAY
+        delay = self.latencies.percentile(settings.PROVIDER_HEDGE_PERCENTILE)
+        return min(max(delay, settings.PROVIDER_HEDGE_MIN_DELAY), settings.PROVIDER_HEDGE_MAX_DELAY)
+
+
+_providers: Dict[str, Provider] = {}
+_providers_lock = threading.Lock()
+
+
+def get_provider(name: str) -> Provider:
+    """Return the process-wide state for a provider, created on first use"""
+    with _providers_lock:
+        provider = _providers.get(name)
+        if provider is None:
+            provider = Provider(name)
+            _providers[name] = provider
+        return provider
+
+
+_pools: Dict[str, ThreadPoolExecutor] = {}
+_pools_lock = threading.Lock()
+
+
+def _get_pool(kind: str) -> ThreadPoolExecutor:
+    """Process-wide pool for hedged chains: "primary" runs first attempts, "hedge" only backups.
+
+    Keeping them apart means a backup never queues behind the slow primaries
+    it is meant to race.
+    """
+    with _pools_lock:
+        pool = _pools.get(kind)
+        if pool is None:
+            workers = settings.PROVIDER_HEDGE_WORKERS if kind == "hedge" else settings.PROVIDER_CALL_WORKERS
+            pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"provider-{kind}")
+            _pools[kind] = pool
+        return pool
+
+
+class ChainResult:
+    """Outcome of ProviderChain.call: the winning value and provider, plus who answered, failed or was skipped"""
+
+    def __init__(self):
+        self.value = None
+        self.provider: Optional[str] = None
+        self.answered: List[str] = []
+        self.errors: List[Tuple[str, BaseException]] = []
+        self.rejected: List[str] = []
+        self.skipped: List[str] = []
+
+    @property
+    def complete(self) -> bool:
+        """True when no provider failed or was skipped, so an empty value is a real answer:
+        every usable provider was asked and found nothing (providers that rejected the
+        request are not going to answer it on a retry either)
+        """
+        return not self.errors and not self.skipped
+
+
+class ProviderChain:
+    """Providers tried in order until one returns a non-None answer.
+
+    Each attempt is `(provider name, func)`; func returns an answer, None for
+    "no match", or raises on failure. Providers whose circuit breaker is open
+    are skipped. With `hedge`, the next provider is also fired once the
+    current one has run longer than its hedge_delay(), and the first good
+    answer wins; a slower call left behind finishes in the background and
+    still updates its provider's breaker and latencies.
+    """
+
+    def __init__(self, attempts: List[Tuple[str, Callable]], hedge: bool = True):
+        self.attempts = attempts
+        self.hedge = hedge
+
+    def call(self, *args) -> ChainResult:
+        if self.hedge and len(self.attempts) > 1:
+            return self._call_hedged(args)
+        return self._call_in_order(args)
+
+    def _call_in_order(self, args: Tuple) -> ChainResult:
+        result = ChainResult()
+        for name, func in self.attempts:
+            if self._settle(result, name, lambda: get_provider(name).call(func, *args)):
+                break
+        return result
+
+    def _call_hedged(self, args: Tuple) -> ChainResult:
+        result = ChainResult()
+        queued = list(self.attempts)
+        pending = {}
+
+        def launch() -> Optional[Provider]:
+            pool = _get_pool("hedge" if pending else "primary")
+            name, func = queued.pop(0)
+            provider = get_provider(name)
+            context = contextvars.copy_context()
+            pending[pool.submit(context.run, provider.call, func, *args)] = name
+            return provider
+
+        current = launch()
+        while pending:
+            timeout = current.hedge_delay() if queued else None
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                PROVIDER_HEDGES.inc(provider=queued[0][0])
+                current = launch()
+                continue
+            for future in done:
+                name = pending.pop(future)
+                if self._settle(result, name, future.result):
+                    return result
+            if not pending and queued:
+                current = launch()
+        return result
+
+    @staticmethod
+    def _settle(result: ChainResult, name: str, get_value: Callable) -> bool:
+        """Record one attempt's outcome on `result`; True when it produced the answer.
+        UpstreamCancelled propagates: nobody is waiting for the answer any more
+        """
+        try:
+            value = get_value()
+        except UpstreamCancelled:
+            raise
+        except ProviderUnavailable:
+            result.skipped.append(name)
+            return False
+        except ProviderRejected:
+            result.rejected.append(name)
+            return False
+        except Exception as e:
+            result.errors.append((name, e))
+            return False
+        result.answered.append(name)
+        if value is None:
+            return False
+        result.value = value
+        result.provider = name
+        return True
@@ -0,0 +1,37 @@
+import threading
+import time
+from typing import Dict
+
+from django.conf import settings
+
+
+class RateLimiter:
+    """Spaces calls to one provider at least `min_interval` seconds apart across all threads"""
+    
+    def __init__(self, min_interval: float):
+        self.min_interval = min_interval
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
+    
+    def wait(self) -> None:
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot)
+            self._next_slot = slot + self.min_interval
+        
+        if slot > now:
+            time.sleep(slot - now)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str) -> RateLimiter:
+    """Return the process-wide limiter for a provider, created from PROVIDER_MIN_INTERVALS"""
+    with _limiters_lock:
+        limiter = _limiters.get(provider)
+        if limiter is None:
+            limiter = RateLimiter(settings.PROVIDER_MIN_INTERVALS.get(provider, 0.0))
+            _limiters[provider] = limiter
+        return limiter
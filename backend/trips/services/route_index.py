@@ -0,0 +1,68 @@
+from bisect import bisect_left
+from typing import List, Optional, Tuple
+
+from .distance import ELLIPSOIDAL, cumulative_miles, miles_to_point
+
+
+class RouteIndex:
+    """Odometer index over a route polyline ([lon, lat] vertices).
+
+    Built once per route; every "where is mile X" question afterwards is a
+    bisect over the cumulative odometer instead of a walk over the geometry.
+    """
+    
+    def __init__(self, coordinates: List[List[float]], mode: str = ELLIPSOIDAL):
+        self.coordinates = coordinates
+        self.mode = mode
+        self.odometer = cumulative_miles(coordinates, mode).tolist()
+        self.total_miles = self.odometer[-1] if self.odometer else 0.0
+    
+    def __len__(self) -> int:
+        return len(self.coordinates)
+    
+    def mile_at_vertex(self, index: int) -> float:
+        return self.odometer[index]
+    
+    def vertex_at_mile(self, mile: float) -> Optional[int]:
+        """Index of the first vertex at or beyond `mile`"""
+        index = bisect_left(self.odometer, mile)
+        return index if index < len(self.odometer) else None
+    
+    def point_at_mile(self, mile: float) -> Optional[List[float]]:
+        """[lon, lat] at `mile`, interpolated along the segment that contains it"""
+        if not self.coordinates or mile > self.total_miles:
+            return None
+        
+        index = self.vertex_at_mile(mile)
+        if index == 0:
+            return list(self.coordinates[0][:2])
+        
+        start_mile = self.odometer[index - 1]
+        segment_length = self.odometer[index] - start_mile
+        fraction = (mile - start_mile) / segment_length if segment_length > 0 else 1.0
+        lon1, lat1 = self.coordinates[index - 1][:2]
+        lon2, lat2 = self.coordinates[index][:2]
+        return [lon1 + (lon2 - lon1) * fraction, lat1 + (lat2 - lat1) * fraction]
+    
+    def nearest_vertex(self, lat: float, lon: float) -> Tuple[int, float]:
+        """(vertex index, route mile) of the vertex closest to a point"""
+        if not self.coordinates:
+            return 0, 0.0
+        index = int(miles_to_point(self.coordinates, lat, lon, self.mode).argmin())
+        return index, self.odometer[index]
+    
+    def mile_of_nearest_vertex(self, lat: float, lon: float) -> float:
+        return self.nearest_vertex(lat, lon)[1]
+    
+    def sample_every(self, interval_miles: float) -> List[Tuple[float, List[float]]]:
+        """(mile, [lon, lat]) at every multiple of `interval_miles` along the route"""
+        samples = []
+        if interval_miles <= 0:
+            return samples
+        
+        step = 1
+        while step * interval_miles <= self.total_miles:
+            mile = step * interval_miles
+            samples.append((mile, self.point_at_mile(mile)))
+            step += 1
+        return samples
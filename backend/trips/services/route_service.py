@@ -1,13 +1,49 @@
 import os
+import threading
 import time
 import requests
+from dataclasses import dataclass
 from typing import List, Dict, Tuple, Optional
 from geopy.distance import geodesic
+from django.conf import settings
+
+from .cache import GeocodeCache, ReverseGeocodeCache, RouteLegCache
+from .concurrency import run_bounded
+from .http import get_session
+from .metrics import upstream_call
+from .offline_geocoder import get_offline_geocoder
+from .providers import ProviderChain, ProviderError, ProviderUnavailable, UpstreamCancelled, check_status, get_provider
+from .route_index import RouteIndex
+from .rate_limit import get_rate_limiter
 
 import urllib3
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 
+@dataclass(frozen=True)
+class RouteLeg:
+    """One waypoint-to-waypoint leg of a routed trip; indices address the route geometry"""
+    distance_miles: float
+    duration_hours: float
+    start_index: int
+    end_index: int
+    start_mile: float
+    end_mile: float
+
+
+@dataclass(frozen=True)
+class RouteResult:
+    legs: List[RouteLeg]
+    
+    @property
+    def distance_miles(self) -> float:
+        return sum(leg.distance_miles for leg in self.legs)
+    
+    @property
+    def duration_hours(self) -> float:
+        return sum(leg.duration_hours for leg in self.legs)
+
+
 class RouteService:
     OPENROUTE_SERVICE_BASE = "https://api.openrouteservice.org"
     OPENROUTE_GEOCODE_URL = f"{OPENROUTE_SERVICE_BASE}/geocode/search"
@@ -18,9 +54,50 @@ class RouteService:
     
     NOMINATIM_REVERSE_URL = "https://nominatim.openstreetmap.org/reverse"
     
-    def __init__(self):
+    def __init__(
+        self,
+        geocode_cache: Optional[GeocodeCache] = None,
+        reverse_geocode_cache: Optional[ReverseGeocodeCache] = None,
+        route_cache: Optional[RouteLegCache] = None,
+        session: Optional[requests.Session] = None,
+        cancel_event: Optional[threading.Event] = None
+    ):
         self.api_key = os.getenv("OPENROUTE_SERVICE_API_KEY", "")
+        self.session = session
+        self.cancel_event = cancel_event
         self.geocode_errors = []
+        if geocode_cache is None and settings.GEOCODE_CACHE_ENABLED:
+            geocode_cache = GeocodeCache()
+        self.geocode_cache = geocode_cache
+        if reverse_geocode_cache is None and settings.REVERSE_GEOCODE_CACHE_ENABLED:
+            reverse_geocode_cache = ReverseGeocodeCache()
+        self.reverse_geocode_cache = reverse_geocode_cache
+        if route_cache is None and settings.ROUTE_CACHE_ENABLED:
+            route_cache = RouteLegCache()
+        self.route_cache = route_cache
+        self.distance_mode = settings.ROUTE_DISTANCE_MODE
+        self._route_index = None
+        self._intermediate_cities = {}
+        self.locationiq_key = settings.LOCATIONIQ_API_KEY
+        geocoders = [("nominatim", self._nominatim_geocode)]
+        if self.locationiq_key:
+            geocoders.insert(0, ("locationiq", self._locationiq_geocode))
+        self.geocode_chain = ProviderChain(geocoders, hedge=settings.PROVIDER_HEDGING_ENABLED)
+        self.route_chain = ProviderChain([("openrouteservice", self._openroute_route)])
+    
+    def _session(self, url: str) -> requests.Session:
+        """Injected session if one was given, otherwise the pooled keep-alive session for the provider host"""
+        if self.cancel_event is not None and self.cancel_event.is_set():
+            raise UpstreamCancelled(url)
+        return self.session or get_session(url)
+    
+    def _request(self, provider: str, operation: str, method: str, url: str, **kwargs) -> requests.Response:
+        """One upstream HTTP call, timed and counted per provider (see metrics.upstream_call)"""
+        session = self._session(url)
+        with upstream_call(provider, operation) as call:
+            response = session.request(method, url, **kwargs)
+            call.status = response.status_code
+        return response
     
     STATE_ABBR = {
         "Alabama": "AL", "Alaska": "AK", "Arizona": "AZ", "Arkansas": "AR", "California": "CA",
@@ -38,29 +115,44 @@ class RouteService:
     
     def reverse_geocode(self, lat: float, lon: float) -> Optional[str]:
         """Get area/city/county name from coordinates"""
+        if settings.REVERSE_GEOCODER == "offline":
+            label = self._reverse_geocode_offline(lat, lon)
+            if label or not settings.REVERSE_GEOCODE_NETWORK_FALLBACK:
+                return label
+        
+        if self.reverse_geocode_cache:
+            hit, label = self.reverse_geocode_cache.get(lat, lon)
+            if hit:
+                return label
+        
+        label, zoom, not_found = self._reverse_geocode_upstream(lat, lon)
+        
+        if self.reverse_geocode_cache and (label or not_found):
+            self.reverse_geocode_cache.set(lat, lon, label, zoom)
+        
+        return label
+    
+    def _reverse_geocode_offline(self, lat: float, lon: float) -> Optional[str]:
+        try:
+            place = get_offline_geocoder().lookup(lat, lon, settings.OFFLINE_GEOCODER_MAX_MILES)
+        except Exception:
+            return None
+        if not place:
+            return None
+        name, state = place
+        return f"{name}, {self.STATE_ABBR.get(state, state[:2].upper())}"
+    
+    def _reverse_geocode_upstream(self, lat: float, lon: float) -> Tuple[Optional[str], Optional[int], bool]:
+        """Return (label, zoom that produced it, True if every zoom level answered without a usable name)"""
         zoom_levels = [12, 10, 14, 8]
+        answered = 0
+        nominatim = get_provider("nominatim")
         
         for zoom in zoom_levels:
             try:
-                params = {
-                    "lat": lat,
-                    "lon": lon,
-                    "format": "json",
-                    "zoom": zoom
-                }
-                headers = {
-                    "User-Agent": "ELD-Trip-Planner/1.0",
-                    "Accept": "application/json"
-                }
-                response = requests.get(
-                    self.NOMINATIM_REVERSE_URL,
-                    params=params,
-                    headers=headers,
-                    timeout=1.0,
-                    verify=False
-                )
-                if response.status_code == 200:
-                    data = response.json()
+                data = nominatim.call(self._nominatim_reverse, lat, lon, zoom)
+                if data is not None:
+                    answered += 1
                     address = data.get("address", {})
                     
                     area = (address.get("city") or 
@@ -84,69 +176,88 @@ class RouteService:
                     
                     if area and state:
                         state_abbr = self.STATE_ABBR.get(state, state[:2].upper())
-                        return f"{area}, {state_abbr}"
+                        return f"{area}, {state_abbr}", zoom, False
                     elif area:
-                        return area
+                        return area, zoom, False
                     elif state:
-                        return state
+                        return state, zoom, False
                     
                     if zoom < 14:
                         continue
-            except requests.exceptions.Timeout:
-                continue
-            except:
+            except ProviderUnavailable:
+                break
+            except UpstreamCancelled:
+                raise
+            except Exception:
                 continue
         
-        return None
+        return None, None, answered == len(zoom_levels)
+    
+    def _nominatim_reverse(self, lat: float, lon: float, zoom: int) -> Dict:
+        get_rate_limiter("nominatim").wait()
+        response = self._request(
+            "nominatim", "reverse_geocode", "GET", self.NOMINATIM_REVERSE_URL,
+            params={"lat": lat, "lon": lon, "format": "json", "zoom": zoom},
+            headers={"User-Agent": "ELD-Trip-Planner/1.0", "Accept": "application/json"},
+            timeout=1.0,
+            verify=False
+        )
+        check_status(response)
+        return response.json()
     
     def get_intermediate_cities_with_distance(self, route: Dict, interval_miles: float = 75.0) -> List[Dict]:
-        """Get intermediate area names along the route at regular mile intervals with reverse geocoding"""
+        """Get intermediate area names along the route at regular mile intervals with reverse geocoding.
+        
+        Results are memoized per route object and interval for the life of the service, so trips
+        sharing a route (e.g. in a batch) reverse-geocode it once. Callers get their own copies.
+        """
+        key = (id(route), interval_miles)
+        memo = self._intermediate_cities.get(key)
+        if memo is None or memo[0] is not route:
+            memo = (route, self._find_intermediate_cities(route, interval_miles))
+            self._intermediate_cities[key] = memo
+        return [dict(area) for area in memo[1]]
+    
+    def _find_intermediate_cities(self, route: Dict, interval_miles: float) -> List[Dict]:
         areas = []
         if "geometry" not in route or "coordinates" not in route["geometry"]:
             return areas
         
-        coordinates = route["geometry"]["coordinates"]
+        route_index = self.get_route_index(route)
         total_distance = self.calculate_distance(route)
         
-        if total_distance == 0 or len(coordinates) < 2:
+        if total_distance == 0 or len(route_index) < 2:
             return areas
         
-        accumulated = 0
-        current_target = interval_miles
         max_points = 50
         last_area_name = None
         
-        for i in range(len(coordinates) - 1):
-            coord1 = coordinates[i]
-            coord2 = coordinates[i + 1]
-            segment_dist = geodesic((coord1[1], coord1[0]), (coord2[1], coord2[0])).miles
-            accumulated += segment_dist
+        def resolve(sample):
+            mile, (lon, lat) = sample
+            try:
+                return self.reverse_geocode(lat, lon)
+            except:
+                return None
+        
+        samples = route_index.sample_every(interval_miles)
+        position = 0
+        
+        while position < len(samples) and len(areas) < max_points:
+            batch = samples[position:position + max_points - len(areas)]
+            position += len(batch)
+            area_names = run_bounded(resolve, batch, settings.REVERSE_GEOCODE_MAX_WORKERS)
             
-            if accumulated >= current_target:
-                lat = coord2[1]
-                lon = coord2[0]
-                
-                area_name = None
-                try:
-                    area_name = self.reverse_geocode(lat, lon)
-                except:
-                    pass
-                
+            for (mile, (lon, lat)), area_name in zip(batch, area_names):
                 if not area_name:
                     area_name = f"Route Point {len(areas) + 1} ({round(lat, 2)}, {round(lon, 2)})"
                 
                 if area_name != last_area_name:
                     areas.append({
                         "name": area_name,
-                        "distance_miles": round(current_target, 1),
+                        "distance_miles": round(mile, 1),
                         "coordinates": [lat, lon]
                     })
                     last_area_name = area_name
-                
-                current_target += interval_miles
-                
-                if len(areas) >= max_points:
-                    break
         
         return areas
     
@@ -182,132 +293,219 @@ class RouteService:
         return areas
     
     def geocode(self, address: str, retries: int = 2) -> Optional[Tuple[float, float]]:
+        return self._geocode(address, retries, self.geocode_errors)
+    
+    def geocode_many(self, addresses: List[str], retries: int = 2) -> List[Optional[Tuple[float, float]]]:
+        """Geocode several addresses concurrently; results and errors keep the input order"""
+        results = self.geocode_each(addresses, retries)
+        for _, errors in results:
+            self.geocode_errors.extend(errors)
+        return [coords for coords, _ in results]
+    
+    def geocode_each(self, addresses: List[str], retries: int = 2) -> List[Tuple[Optional[Tuple[float, float]], List[str]]]:
+        """Like geocode_many, but returns (coords, errors) per address instead of collecting errors on the service"""
+        errors_per_address = [[] for _ in addresses]
+        results = run_bounded(
+            lambda i: self._geocode(addresses[i], retries, errors_per_address[i]),
+            range(len(addresses)),
+            settings.GEOCODE_MAX_WORKERS
+        )
+        return list(zip(results, errors_per_address))
+    
+    def _geocode(self, address: str, retries: int, errors: List[str]) -> Optional[Tuple[float, float]]:
         if not address or not address.strip():
             return None
             
         address = address.strip()
         
-        for attempt in range(retries):
-            try:
-                if attempt > 0:
-                    time.sleep(0.2)
-                
-                params = {
-                    "q": address,
-                    "format": "json",
-                    "limit": 1
-                }
-                
-                response = requests.get(
-                    self.LOCATIONIQ_GEOCODE_URL,
-                    params=params,
-                    headers={"Accept": "application/json"},
-                    timeout=8,
-                    verify=False
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if len(data) > 0 and "lat" in data[0] and "lon" in data[0]:
-                        return (float(data[0]["lat"]), float(data[0]["lon"]))
-            except:
-                pass
+        if self.geocode_cache:
+            hit, coords = self.geocode_cache.get(address)
+            if hit:
+                return coords
         
-        for attempt in range(retries):
-            try:
-                if attempt > 0:
-                    time.sleep(0.2)
-                
-                params = {
-                    "q": address,
-                    "format": "json",
-                    "limit": 1
-                }
-                
-                headers = {
-                    "User-Agent": "ELD-Trip-Planner/1.0",
-                    "Accept": "application/json"
-                }
-                
-                response = requests.get(
-                    self.NOMINATIM_GEOCODE_URL,
-                    params=params,
-                    headers=headers,
-                    timeout=8,
-                    verify=False
-                )
-                
-                if response.status_code == 200:
-                    data = response.json()
-                    if len(data) > 0 and "lat" in data[0] and "lon" in data[0]:
-                        return (float(data[0]["lat"]), float(data[0]["lon"]))
-                elif response.status_code == 429:
-                    if attempt < retries - 1:
-                        time.sleep(0.5)
-                        continue
-            except requests.exceptions.Timeout:
-                if attempt == retries - 1:
-                    self.geocode_errors.append(f"{address}: Request timeout")
-                continue
-            except Exception as e:
-                if attempt == retries - 1:
-                    self.geocode_errors.append(f"{address}: {str(e)}")
-                continue
+        coords, not_found = self._geocode_upstream(address, retries, errors)
+        
+        if self.geocode_cache and (coords or not_found):
+            self.geocode_cache.set(address, coords)
         
+        return coords
+    
+    def _geocode_upstream(self, address: str, retries: int, errors: List[str]) -> Tuple[Optional[Tuple[float, float]], bool]:
+        """Ask the geocode chain (LocationIQ when LOCATIONIQ_API_KEY is set, hedged by Nominatim) up to
+        `retries` times while providers fail; the flag is True when every usable provider answered with no match
+        """
+        result = None
+        for attempt in range(max(retries, 1)):
+            if attempt > 0:
+                time.sleep(0.2)
+            result = self.geocode_chain.call(address)
+            if result.value is not None or result.complete:
+                break
+        
+        failures = [error for _, error in result.errors if not isinstance(error, ProviderError)]
+        if result.value is None and failures:
+            message = "Request timeout" if isinstance(failures[-1], requests.exceptions.Timeout) else str(failures[-1])
+            errors.append(f"{address}: {message}")
+        return result.value, result.value is None and result.complete
+    
+    @staticmethod
+    def _search_answer(response: requests.Response, no_match_status: Optional[int] = None) -> Optional[Tuple[float, float]]:
+        """Coordinates of the first hit of a LocationIQ/Nominatim search response, None for no match"""
+        if not check_status(response, no_match_status):
+            return None
+        data = response.json()
+        if len(data) > 0 and "lat" in data[0] and "lon" in data[0]:
+            return float(data[0]["lat"]), float(data[0]["lon"])
         return None
     
+    def _locationiq_geocode(self, address: str) -> Optional[Tuple[float, float]]:
+        get_rate_limiter("locationiq").wait()
+        response = self._request(
+            "locationiq", "geocode", "GET", self.LOCATIONIQ_GEOCODE_URL,
+            params={"key": self.locationiq_key, "q": address, "format": "json", "limit": 1},
+            headers={"Accept": "application/json"},
+            timeout=8,
+            verify=False
+        )
+        return self._search_answer(response, no_match_status=404)
+    
+    def _nominatim_geocode(self, address: str) -> Optional[Tuple[float, float]]:
+        get_rate_limiter("nominatim").wait()
+        response = self._request(
+            "nominatim", "geocode", "GET", self.NOMINATIM_GEOCODE_URL,
+            params={"q": address, "format": "json", "limit": 1},
+            headers={"User-Agent": "ELD-Trip-Planner/1.0", "Accept": "application/json"},
+            timeout=8,
+            verify=False
+        )
+        return self._search_answer(response)
+    
     def get_route(self, start: Tuple[float, float], via: List[Tuple[float, float]], end: Tuple[float, float]) -> Optional[Dict]:
+        waypoints = [start] + list(via) + [end]
+        
+        if self.route_cache:
+            legs = [self.route_cache.get(a, b) for a, b in zip(waypoints, waypoints[1:])]
+            if any(legs) and self._fill_missing_legs(waypoints, legs):
+                return self._assemble_route(legs)
+        
+        route = self._request_route(start, via, end)
+        
+        legs = self._split_legs(route, len(waypoints) - 1) if route and self.route_cache else None
+        if legs:
+            # Answer from the legs as they were stored so a cold request matches a warm one
+            legs = [self.route_cache.normalize(leg) for leg in legs]
+            for (a, b), leg in zip(zip(waypoints, waypoints[1:]), legs):
+                self.route_cache.set(a, b, leg)
+            return self._assemble_route(legs)
+        
+        return route
+    
+    def _fill_missing_legs(self, waypoints: List[Tuple[float, float]], legs: List[Optional[Dict]]) -> bool:
+        """Route each uncached leg on its own; False if any of them could not be routed by ORS"""
+        for i, leg in enumerate(legs):
+            if leg is not None:
+                continue
+            route = self._request_route(waypoints[i], [], waypoints[i + 1])
+            fetched = self._split_legs(route, 1) if route else None
+            if not fetched:
+                return False
+            legs[i] = self.route_cache.normalize(fetched[0])
+            self.route_cache.set(waypoints[i], waypoints[i + 1], legs[i])
+        return True
+    
+    def _split_legs(self, route: Dict, leg_count: int) -> Optional[List[Dict]]:
+        """Cut an ORS route into per-leg geometry/distance/duration using its way_points; None for fallback routes"""
+        properties = route.get("properties", {})
+        way_points = properties.get("way_points")
+        segments = properties.get("segments", [])
+        coordinates = self.get_route_geometry(route)
+        if not way_points or len(way_points) != leg_count + 1 or len(segments) != leg_count:
+            return None
+        
+        return [
+            {
+                "coordinates": coordinates[way_points[i]:way_points[i + 1] + 1],
+                "distance": segments[i].get("distance", 0.0),
+                "duration": segments[i].get("duration", 0.0)
+            }
+            for i in range(leg_count)
+        ]
+    
+    def _assemble_route(self, legs: List[Dict]) -> Dict:
+        """Join cached legs into the same feature shape ORS returns"""
+        coordinates = []
+        way_points = [0]
+        for leg in legs:
+            coordinates.extend(leg["coordinates"][1:] if coordinates else leg["coordinates"])
+            way_points.append(len(coordinates) - 1)
+        
+        segments = [{"distance": leg["distance"], "duration": leg["duration"]} for leg in legs]
+        return {
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                "coordinates": coordinates
+            },
+            "properties": {
+                "segments": segments,
+                "way_points": way_points,
+                "summary": {
+                    "distance": sum(segment["distance"] for segment in segments),
+                    "duration": sum(segment["duration"] for segment in segments)
+                }
+            }
+        }
+    
+    def _request_route(self, start: Tuple[float, float], via: List[Tuple[float, float]], end: Tuple[float, float]) -> Optional[Dict]:
+        """ORS route feature; the straight-line estimate when ORS fails, rejects the request
+        (e.g. no API key, or no routable point nearby) or its circuit breaker is open
+        """
+        result = self.route_chain.call(start, via, end)
+        if result.value is None and not result.answered:
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                raise UpstreamCancelled("route")
+            return self._calculate_simple_route(start, via, end)
+        return result.value
+    
+    def _openroute_route(self, start: Tuple[float, float], via: List[Tuple[float, float]], end: Tuple[float, float]) -> Optional[Dict]:
         coordinates = [[start[1], start[0]]]
         coordinates.extend([[v[1], v[0]] for v in via])
         coordinates.append([end[1], end[0]])
         
-        try:
-            headers = {
-                "Content-Type": "application/json",
-                "Accept": "application/json"
-            }
-            
-            if self.api_key:
-                headers["Authorization"] = self.api_key
-            
-            response = requests.post(
-                self.OPENROUTE_ROUTE_URL,
-                json={
-                    "coordinates": coordinates,
-                    "instructions": False,
-                    "geometry": True
-                },
+        headers = {
+            "Content-Type": "application/json",
+            "Accept": "application/json"
+        }
+        
+        if self.api_key:
+            headers["Authorization"] = self.api_key
+        
+        response = self._request(
+            "openrouteservice", "route", "POST", self.OPENROUTE_ROUTE_URL,
+            json={
+                "coordinates": coordinates,
+                "instructions": False,
+                "geometry": True
+            },
+            headers=headers,
+            timeout=15,
+            verify=False
+        )
+        
+        if response.status_code == 429:
+            time.sleep(0.5)
+            response = self._request(
+                "openrouteservice", "route", "POST", self.OPENROUTE_ROUTE_URL,
+                json={"coordinates": coordinates},
                 headers=headers,
                 timeout=15,
                 verify=False
             )
-            
-            if response.status_code == 200:
-                data = response.json()
-                if "features" in data and len(data["features"]) > 0:
-                    return data["features"][0]
-            elif response.status_code == 401 or response.status_code == 403:
-                return self._calculate_simple_route(start, via, end)
-            elif response.status_code == 429:
-                time.sleep(0.5)
-                response = requests.post(
-                    self.OPENROUTE_ROUTE_URL,
-                    json={"coordinates": coordinates},
-                    headers=headers,
-                    timeout=15,
-                    verify=False
-                )
-                if response.status_code == 200:
-                    data = response.json()
-                if "features" in data and len(data["features"]) > 0:
-                    return data["features"][0]
-            else:
-                return self._calculate_simple_route(start, via, end)
-        except requests.exceptions.Timeout:
-            return self._calculate_simple_route(start, via, end)
-        except Exception as e:
-            return self._calculate_simple_route(start, via, end)
         
+        check_status(response)
+        data = response.json()
+        if "features" in data and len(data["features"]) > 0:
+            return data["features"][0]
         return None
     
     def _calculate_simple_route(self, start: Tuple[float, float], via: List[Tuple[float, float]], end: Tuple[float, float]) -> Optional[Dict]:
@@ -375,54 +573,54 @@ class RouteService:
             return route["geometry"]["coordinates"]
         return []
     
+    def get_route_index(self, route: Dict) -> RouteIndex:
+        """Odometer index for a route, built once and reused by every consumer of the same route"""
+        if self._route_index is None or self._route_index[0] is not route:
+            self._route_index = (route, RouteIndex(self.get_route_geometry(route), self.distance_mode))
+        return self._route_index[1]
+    
+    def get_route_result(self, route: Dict) -> Optional[RouteResult]:
+        """Per-leg distance, duration and vertex range from the route's segments and way_points.
+        
+        Returns None for routes without way_points (the straight-line fallback).
+        """
+        properties = route.get("properties", {})
+        way_points = properties.get("way_points")
+        segments = properties.get("segments", [])
+        if not way_points or len(way_points) != len(segments) + 1:
+            return None
+        
+        route_index = self.get_route_index(route)
+        if way_points[-1] >= len(route_index):
+            return None
+        
+        return RouteResult(legs=[
+            RouteLeg(
+                distance_miles=segment.get("distance", 0.0) / 1609.34,
+                duration_hours=segment.get("duration", 0.0) / 3600.0,
+                start_index=way_points[i],
+                end_index=way_points[i + 1],
+                start_mile=route_index.mile_at_vertex(way_points[i]),
+                end_mile=route_index.mile_at_vertex(way_points[i + 1])
+            )
+            for i, segment in enumerate(segments)
+        ])
+    
     def find_fuel_stops(self, route: Dict, interval_miles: float = 1000.0) -> List[Dict]:
         fuel_stops = []
         if "geometry" not in route or "coordinates" not in route["geometry"]:
             return fuel_stops
         
-        coordinates = route["geometry"]["coordinates"]
         total_distance = self.calculate_distance(route)
         
         if total_distance == 0:
             return fuel_stops
         
-        if len(coordinates) < 10:
-            interpolated_coords = []
-            for i in range(len(coordinates) - 1):
-                coord1 = coordinates[i]
-                coord2 = coordinates[i + 1]
-                interpolated_coords.append(coord1)
-                segment_dist = geodesic((coord1[1], coord1[0]), (coord2[1], coord2[0])).miles
-                num_points = max(1, int(segment_dist / 50))
-                for j in range(1, num_points):
-                    ratio = j / num_points
-                    lat = coord1[1] + (coord2[1] - coord1[1]) * ratio
-                    lon = coord1[0] + (coord2[0] - coord1[0]) * ratio
-                    interpolated_coords.append([lon, lat])
-            interpolated_coords.append(coordinates[-1])
-            coordinates = interpolated_coords
-        
-        accumulated_distance = 0.0
-        current_interval = interval_miles
-        
-        for i in range(len(coordinates) - 1):
-            coord1 = coordinates[i]
-            coord2 = coordinates[i + 1]
-            
-            segment_distance = geodesic(
-                (coord1[1], coord1[0]),
-                (coord2[1], coord2[0])
-            ).miles
-            
-            accumulated_distance += segment_distance
-            
-            if accumulated_distance >= current_interval:
-                fuel_stops.append({
-                    "location": [coord2[0], coord2[1]],
-                    "distance": round(current_interval, 2),
-                    "type": "fuel"
-                })
-                current_interval += interval_miles
+        for mile, location in self.get_route_index(route).sample_every(interval_miles):
+            fuel_stops.append({
+                "location": location,
+                "distance": round(mile, 2),
+                "type": "fuel"
+            })
         
         return fuel_stops
-
@@ -0,0 +1,34 @@
+from datetime import datetime
+from typing import Dict, List, Tuple
+
+from .hos_calculator import HOSCalculator
+from .log_generator import LogGenerator
+
+
+def build_schedule(
+    current_cycle_used: float,
+    start_time: datetime,
+    total_distance: float,
+    intermediate_cities: List[Dict],
+    carrier_info: Dict,
+    vehicle_info: Dict
+) -> Tuple[Dict, List[Dict]]:
+    """HOS timeline and log sheets for one trip.
+
+    Pure CPU work with picklable inputs and outputs, and this module imports
+    nothing from Django, so it can run in a process-pool worker.
+    """
+    trip_result = HOSCalculator(
+        current_cycle_used=current_cycle_used,
+        start_time=start_time
+    ).calculate_trip_timeline(total_distance_miles=total_distance)
+
+    log_sheets = LogGenerator().generate_log_sheets(
+        timeline=trip_result["timeline"],
+        start_time=start_time,
+        total_miles=total_distance,
+        carrier_info=carrier_info,
+        vehicle_info=vehicle_info,
+        intermediate_cities=intermediate_cities
+    )
+    return trip_result, log_sheets
@@ -0,0 +1,59 @@
+from typing import List
+
+import numpy as np
+
+from .distance import METERS_PER_MILE, EARTH_RADIUS_MILES, to_unit_vectors
+
+EARTH_RADIUS_METERS = EARTH_RADIUS_MILES * METERS_PER_MILE
+
+
+def _angles(vectors: np.ndarray, point: np.ndarray) -> np.ndarray:
+    """Angular distance (radians) from each unit vector to `point`"""
+    return np.arctan2(np.linalg.norm(np.cross(vectors, point), axis=-1), vectors @ point)
+
+
+def simplify(coordinates: List[List[float]], tolerance_meters: float) -> List[List[float]]:
+    """Douglas-Peucker simplification of a [lon, lat] polyline.
+
+    A vertex is dropped when it lies within `tolerance_meters` of the
+    great-circle arc between the kept vertices on either side of it (its
+    nearer end when the vertex lies beyond the arc, so a route that doubles
+    back keeps its turnaround). The first and last vertices are always kept.
+    """
+    if tolerance_meters <= 0 or len(coordinates) < 3:
+        return coordinates
+
+    points = np.asarray(coordinates, dtype=float)[:, :2]
+    vectors = to_unit_vectors(points[:, 1], points[:, 0])
+    threshold = tolerance_meters / EARTH_RADIUS_METERS
+
+    keep = np.zeros(len(points), dtype=bool)
+    keep[0] = keep[-1] = True
+    stack = [(0, len(points) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+
+        inner = vectors[first + 1:last]
+        start, end = vectors[first], vectors[last]
+        normal = np.cross(start, end)
+        norm = np.linalg.norm(normal)
+        to_ends = np.minimum(_angles(inner, start), _angles(inner, end))
+        if norm > 1e-15:
+            normal /= norm
+            to_circle = np.arcsin(np.minimum(np.abs(inner @ normal), 1.0))
+            # The foot of the perpendicular is on the arc only when the vertex lies between its ends
+            on_arc = (np.cross(start, inner) @ normal >= 0) & (np.cross(inner, end) @ normal >= 0)
+            offsets = np.where(on_arc, to_circle, to_ends)
+        else:
+            offsets = to_ends
+
+        farthest = int(offsets.argmax())
+        if offsets[farthest] > threshold:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.append((first, split))
+            stack.append((split, last))
+
+    return [coordinates[i] for i in np.flatnonzero(keep)]
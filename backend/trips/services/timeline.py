@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, tzinfo
+from typing import Dict, Optional
+
+EPOCH = datetime(1970, 1, 1)
+MINUTES_PER_DAY = 24 * 60
+
+
+def to_minutes(value: datetime) -> int:
+    """Wall-clock minutes since EPOCH, ignoring the UTC offset and dropping seconds.
+
+    Wall-clock minutes add and subtract the way aware datetimes sharing one
+    tzinfo do, so HOS arithmetic and calendar-day boundaries line up with
+    what the driver's clock shows, DST changes included.
+    """
+    return (value.replace(tzinfo=None) - EPOCH) // timedelta(minutes=1)
+
+
+def to_datetime(minutes: float, tz: Optional[tzinfo] = None) -> datetime:
+    return (EPOCH + timedelta(minutes=minutes)).replace(tzinfo=tz)
+
+
+def day_start(minutes: float) -> int:
+    """Minute of the midnight that starts the calendar day containing `minutes`"""
+    return int(minutes // MINUTES_PER_DAY) * MINUTES_PER_DAY
+
+
+def format_clock(minutes: float) -> str:
+    """12-hour "%I:%M %p" clock label for a wall-clock minute"""
+    minute_of_day = int(minutes) % MINUTES_PER_DAY
+    hour, minute = divmod(minute_of_day, 60)
+    return f"{hour % 12 or 12:02d}:{minute:02d} {'AM' if hour < 12 else 'PM'}"
+
+
+class TimelineEvent:
+    """One duty-status interval; start and duration are whole minutes (see to_minutes)"""
+    __slots__ = ("start", "duration", "status", "description", "location")
+
+    def __init__(self, start: int, duration: int, status: str, description: str, location: Optional[str] = None):
+        self.start = start
+        self.duration = duration
+        self.status = status
+        self.description = description
+        self.location = location
+
+    @property
+    def end(self) -> int:
+        return self.start + self.duration
+
+    @property
+    def hours(self) -> float:
+        return self.duration / 60.0
+
+    def clipped(self, start: int, end: int) -> "TimelineEvent":
+        """The part of this event inside [start, end)"""
+        clipped_start = max(self.start, start)
+        return TimelineEvent(
+            clipped_start,
+            max(0, min(self.end, end) - clipped_start),
+            self.status,
+            self.description,
+            self.location
+        )
+
+    def to_dict(self, tz: Optional[tzinfo] = None) -> Dict:
+        """Public JSON shape: ISO start time and duration in hours"""
+        return {
+            "time": to_datetime(self.start, tz).isoformat(),
+            "status": self.status,
+            "description": self.description,
+            "duration": self.hours,
+            "location": self.location
+        }
+
+    def __eq__(self, other):
+        if not isinstance(other, TimelineEvent):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return f"TimelineEvent({self.start}, {self.duration}, {self.status!r}, {self.description!r})"
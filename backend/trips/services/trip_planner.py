@@ -0,0 +1,449 @@
+import uuid
+from datetime import datetime
+from typing import Dict, Iterator, List, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+from django.conf import settings
+from django.db import DatabaseError
+from django.utils import timezone
+from geopy.distance import geodesic
+
+from ..models import TripPlan
+from . import polyline
+from .route_service import RouteService
+from .simplify import simplify
+from .timeline import to_datetime
+from .hos_calculator import HOSCalculator
+from .log_generator import LogGenerator
+from .metrics import timed_stage
+
+
+class TripPlanningError(Exception):
+    """The trip cannot be planned; the message is returned to the client with a 400"""
+
+
+class TripPlanner:
+    """The calculate-trip pipeline, split into stages the sync and async endpoints both drive.
+
+    Each stage stores its output on the planner. The stage order is
+    geocode -> plan_route -> (label_route, label_log_cities, calculate_timeline)
+    -> generate_log_sheets; the three middle stages only depend on the route
+    and can run concurrently.
+    """
+    POLYLINE_PRECISION = 6
+
+    def __init__(self, data: Dict, route_service: Optional[RouteService] = None):
+        self.data = data
+        self.route_service = route_service or RouteService()
+
+        try:
+            self.tz = ZoneInfo(data.get("timezone", "UTC"))
+        except:
+            self.tz = ZoneInfo("UTC")
+
+        self.start_coords = None
+        self.pickup_coords = None
+        self.dropoff_coords = None
+        self.route = None
+        self.route_result = None
+        self.total_distance = 0.0
+        self.route_geometry = []
+        self.fuel_stops = []
+        self.start_to_pickup_distance = 0.0
+        self.route_intermediate_cities = []
+        self.intermediate_cities = []
+        self.start_time = None
+        self.trip_result = None
+        self.log_sheets = []
+        self.plan_id = None
+        self.completed_miles = 0.0
+
+    def plan(self, start_time: Optional[datetime] = None) -> Dict:
+        self.geocode()
+        self.plan_route()
+        self.label_route()
+        self.label_log_cities()
+        self.calculate_timeline(start_time)
+        self.generate_log_sheets()
+        self.save_plan()
+        return self.to_response()
+
+    @classmethod
+    def from_plan(cls, trip_plan: TripPlan, route_service: Optional[RouteService] = None) -> "TripPlanner":
+        """Planner restored from a saved plan with every route and labelling stage already done"""
+        planner = cls(trip_plan.request, route_service)
+        planner.plan_id = trip_plan.id
+        planner.start_coords = tuple(trip_plan.start_coords)
+        planner.pickup_coords = tuple(trip_plan.pickup_coords)
+        planner.dropoff_coords = tuple(trip_plan.dropoff_coords)
+        planner.route = {
+            "type": "Feature",
+            "geometry": {
+                "type": "LineString",
+                "coordinates": polyline.decode(trip_plan.route_polyline, cls.POLYLINE_PRECISION)
+            },
+            "properties": trip_plan.route_properties
+        }
+        planner.route_geometry = planner._format_geometry(planner.route["geometry"]["coordinates"])
+        planner.total_distance = trip_plan.total_distance
+        planner.start_to_pickup_distance = trip_plan.start_to_pickup_distance
+        planner.fuel_stops = trip_plan.fuel_stops
+        planner.route_intermediate_cities = trip_plan.route_intermediate_cities
+        planner.intermediate_cities = trip_plan.intermediate_cities
+        planner.start_time = trip_plan.start_time.astimezone(planner.tz)
+        planner.completed_miles = trip_plan.completed_miles
+        planner.log_sheets = trip_plan.log_sheets
+        return planner
+
+    def to_plan(self) -> TripPlan:
+        """Unsaved TripPlan for this planner's current state"""
+        return TripPlan(
+            id=self.plan_id or uuid.uuid4(),
+            request=dict(self.data),
+            start_coords=list(self.start_coords),
+            pickup_coords=list(self.pickup_coords),
+            dropoff_coords=list(self.dropoff_coords),
+            route_polyline=polyline.encode(
+                self.route_service.get_route_geometry(self.route), self.POLYLINE_PRECISION
+            ),
+            route_properties=self.route.get("properties", {}),
+            total_distance=self.total_distance,
+            start_to_pickup_distance=self.start_to_pickup_distance,
+            fuel_stops=self.fuel_stops,
+            route_intermediate_cities=self.route_intermediate_cities,
+            intermediate_cities=self.intermediate_cities,
+            start_time=self.start_time,
+            completed_miles=self.completed_miles,
+            log_sheets=self.log_sheets
+        )
+
+    @timed_stage("persist")
+    def save_plan(self) -> None:
+        """Save (or update) the plan for replanning. Best effort: when the database is
+        unusable (e.g. not migrated) the plan is still returned, with plan_id None
+        """
+        try:
+            if self.plan_id is None:
+                trip_plan = self.to_plan()
+                trip_plan.save(force_insert=True)
+                self.plan_id = trip_plan.id
+            else:
+                TripPlan.objects.filter(id=self.plan_id).update(
+                    request=dict(self.data),
+                    start_time=self.start_time,
+                    completed_miles=self.completed_miles,
+                    log_sheets=self.log_sheets,
+                    updated_at=timezone.now()
+                )
+        except DatabaseError:
+            pass
+
+    @timed_stage("geocode")
+    def geocode(self, locations: Optional[List] = None, errors: Optional[List[str]] = None) -> None:
+        """Geocode the three stops, or validate `locations` already resolved by the caller"""
+        data = self.data
+        route_service = self.route_service
+
+        if locations is None:
+            locations = route_service.geocode_many([
+                data["current_location"],
+                data["pickup_location"],
+                data["dropoff_location"]
+            ])
+            errors = route_service.geocode_errors
+        self.start_coords, self.pickup_coords, self.dropoff_coords = locations
+
+        if self.start_coords and self.pickup_coords:
+            distance = geodesic(self.start_coords, self.pickup_coords).miles
+            if distance < 0.1:  # Less than 0.1 miles apart
+                raise TripPlanningError(
+                    "Pickup location is too close to current location (less than 0.1 miles). "
+                    "Please ensure pickup is a different location."
+                )
+
+        failed_locations = []
+        if not self.start_coords:
+            failed_locations.append(f"Current Location: '{data['current_location']}'")
+        if not self.pickup_coords:
+            failed_locations.append(f"Pickup Location: '{data['pickup_location']}'")
+        if not self.dropoff_coords:
+            failed_locations.append(f"Dropoff Location: '{data['dropoff_location']}'")
+
+        if failed_locations:
+            error_msg = f"Could not geocode the following locations: {', '.join(failed_locations)}. "
+            error_msg += "Please try more specific addresses (e.g., 'City, State' or 'Street Address, City, State, ZIP')."
+            if errors:
+                error_msg += f" Errors: {'; '.join(errors[:3])}"
+            raise TripPlanningError(error_msg)
+
+    @timed_stage("route")
+    def plan_route(self, route: Optional[Dict] = None) -> None:
+        route_service = self.route_service
+        if route is None:
+            route = route_service.get_route(self.start_coords, [self.pickup_coords], self.dropoff_coords)
+
+        if not route:
+            raise TripPlanningError("Could not calculate route")
+
+        self.route = route
+        self.total_distance = route_service.calculate_distance(route)
+        self.route_geometry = self._format_geometry(route_service.get_route_geometry(route))
+        self.fuel_stops = route_service.find_fuel_stops(route)
+
+        self.route_result = route_service.get_route_result(route)
+        if self.route_result and len(self.route_result.legs) == 2:
+            self.start_to_pickup_distance = self.route_result.legs[0].end_mile
+        else:
+            route_index = route_service.get_route_index(route)
+            self.start_to_pickup_distance = route_index.mile_of_nearest_vertex(*self.pickup_coords)
+
+    def _format_geometry(self, coordinates: List[List[float]]):
+        """Response geometry: optionally simplified (tolerance in meters) and/or encoded-polyline.
+
+        Only the returned copy is reduced; distances and labels keep using the
+        full-resolution route.
+        """
+        coordinates = simplify(coordinates, self.data.get("geometry_tolerance", 0.0))
+        if self.data.get("geometry_format") == "encoded":
+            return polyline.encode(coordinates)
+        return coordinates
+
+    @timed_stage("label_route")
+    def label_route(self) -> None:
+        """Area names every 100 miles for the map"""
+        cities = self.route_service.get_intermediate_cities_with_distance(self.route, interval_miles=100.0)
+
+        for city in cities:
+            if city["distance_miles"] < self.start_to_pickup_distance:
+                city["segment"] = "start_to_pickup"
+            else:
+                city["segment"] = "pickup_to_dropoff"
+
+        self.route_intermediate_cities = cities
+
+    @timed_stage("label_log_cities")
+    def label_log_cities(self) -> None:
+        """Start, pickup and dropoff plus area names every 50 miles (30 on sparse long routes) for the log sheets"""
+        route_service = self.route_service
+        intermediate_areas = route_service.get_intermediate_cities_with_distance(self.route, interval_miles=50.0)
+
+        if len(intermediate_areas) < 10 and self.total_distance > 300:
+            intermediate_areas_dense = route_service.get_intermediate_cities_with_distance(self.route, interval_miles=30.0)
+            if len(intermediate_areas_dense) > len(intermediate_areas):
+                intermediate_areas = intermediate_areas_dense
+
+        self.intermediate_cities = self._log_cities(intermediate_areas)
+
+    def _log_cities(self, intermediate_areas: List[Dict]) -> List[Dict]:
+        data = self.data
+        start_to_pickup_distance = self.start_to_pickup_distance
+
+        start_name = data["current_location"].split(',')[0]
+        pickup_name = data["pickup_location"].split(',')[0]
+        dropoff_name = data["dropoff_location"].split(',')[0]
+
+        cities_before_pickup = [area for area in intermediate_areas if area["distance_miles"] < start_to_pickup_distance]
+        cities_after_pickup = [area for area in intermediate_areas if area["distance_miles"] >= start_to_pickup_distance]
+
+        return [
+            {"name": start_name, "distance_miles": 0.0, "type": "start"}
+        ] + [dict(area, type="intermediate") for area in cities_before_pickup] + [
+            {"name": pickup_name, "distance_miles": round(start_to_pickup_distance, 1), "type": "pickup"}
+        ] + [dict(area, type="intermediate") for area in cities_after_pickup] + [
+            {"name": dropoff_name, "distance_miles": round(self.total_distance, 1), "type": "dropoff"}
+        ]
+
+    def requested_start_time(self) -> datetime:
+        """The request's start_time, else now rounded down to PLAN_CACHE_START_BUCKET seconds"""
+        start_time = self.data.get("start_time")
+        if start_time:
+            return start_time.astimezone(self.tz)
+        bucket = max(settings.PLAN_CACHE_START_BUCKET, 1)
+        return datetime.fromtimestamp(datetime.now().timestamp() // bucket * bucket, self.tz)
+
+    @timed_stage("hos")
+    def calculate_timeline(self, start_time: Optional[datetime] = None) -> None:
+        self.start_time = start_time or self.requested_start_time()
+
+        hos_calculator = HOSCalculator(
+            current_cycle_used=self.data["current_cycle_used"],
+            start_time=self.start_time
+        )
+
+        self.trip_result = hos_calculator.calculate_trip_timeline(
+            total_distance_miles=self.total_distance
+        )
+
+    def locate(self, latitude: float, longitude: float) -> float:
+        """Miles from the start to the route vertex nearest a reported position"""
+        return self.route_service.get_route_index(self.route).mile_of_nearest_vertex(latitude, longitude)
+
+    @timed_stage("replan")
+    def replan(self, completed_miles: float, current_cycle_used: float, now: Optional[datetime] = None) -> None:
+        """Reschedule the rest of the trip from `now` after `completed_miles`.
+
+        Only the HOS timeline for the remaining miles and the log sheets from
+        today on are recomputed; sheets for earlier days are kept as they were,
+        and the remaining cities reuse the stored labels, so there are no
+        upstream calls.
+        """
+        self.completed_miles = min(max(completed_miles, 0.0), self.total_distance)
+        self.data = dict(self.data, current_cycle_used=current_cycle_used)
+        self.start_time = now or datetime.now(self.tz)
+        pickup_done = self.completed_miles > self.start_to_pickup_distance
+
+        hos_calculator = HOSCalculator(
+            current_cycle_used=current_cycle_used,
+            start_time=self.start_time
+        )
+        self.trip_result = hos_calculator.calculate_trip_timeline(
+            total_distance_miles=self.total_distance - self.completed_miles,
+            pickup_duration=0.0 if pickup_done else 1.0
+        )
+
+        remaining_cities = self._remaining_log_cities(pickup_done)
+        carrier_info = self.carrier_info()
+        carrier_info["from"] = remaining_cities[0]["name"]
+
+        today = self.start_time.date()
+        earlier_sheets = [
+            sheet for sheet in self.log_sheets
+            if datetime.strptime(sheet["date"], "%m/%d/%Y").date() < today
+        ]
+        self.log_sheets = earlier_sheets + LogGenerator().generate_log_sheets(
+            timeline=self.trip_result["timeline"],
+            start_time=self.start_time,
+            total_miles=self.total_distance - self.completed_miles,
+            carrier_info=carrier_info,
+            vehicle_info=self.vehicle_info(),
+            intermediate_cities=remaining_cities
+        )
+
+    def _remaining_log_cities(self, pickup_done: bool) -> List[Dict]:
+        """Log cities still ahead, with distances measured from the current position.
+
+        The last city passed becomes the start; the pickup stays ahead until
+        the driver is past it.
+        """
+        completed_miles = self.completed_miles
+        ahead = []
+        passed = []
+        for city in self.intermediate_cities:
+            if city["distance_miles"] > completed_miles or (city["type"] == "pickup" and not pickup_done):
+                ahead.append(dict(city, distance_miles=round(max(city["distance_miles"] - completed_miles, 0.0), 1)))
+            else:
+                passed.append(city)
+
+        last_passed = max(passed, key=lambda city: city["distance_miles"])["name"] if passed else self.data["current_location"].split(',')[0]
+        return [{"name": last_passed, "distance_miles": 0.0, "type": "start"}] + ahead
+
+    def carrier_info(self) -> Dict:
+        data = self.data
+        return {
+            "name": data.get("carrier_name", ""),
+            "main_office_address": data.get("main_office_address", ""),
+            "home_terminal_address": data.get("home_terminal_address", ""),
+            "driver_name": data.get("driver_name", ""),
+            "co_driver_name": data.get("co_driver_name", ""),
+            "dvl_manifest_no": data.get("dvl_manifest_no", ""),
+            "shipper_commodity": data.get("shipper_commodity", ""),
+            "from": data["current_location"],
+            "to": data["dropoff_location"],
+            "current_cycle_used": data["current_cycle_used"]
+        }
+
+    def vehicle_info(self) -> Dict:
+        data = self.data
+        return {
+            "truck_tractor": data.get("truck_tractor", ""),
+            "trailer": data.get("trailer", ""),
+            "total_mileage": ""
+        }
+
+    @timed_stage("log_sheets")
+    def generate_log_sheets(self) -> None:
+        log_generator = LogGenerator()
+        self.log_sheets = log_generator.generate_log_sheets(
+            timeline=self.trip_result["timeline"],
+            start_time=self.start_time,
+            total_miles=self.total_distance,
+            carrier_info=self.carrier_info(),
+            vehicle_info=self.vehicle_info(),
+            intermediate_cities=self.intermediate_cities
+        )
+
+    def iter_log_sheets(self) -> Iterator[Dict]:
+        """Log sheets one day at a time; each is also kept on self.log_sheets as it is yielded"""
+        self.log_sheets = []
+        for log_sheet in LogGenerator().iter_log_sheets(
+            timeline=self.trip_result["timeline"],
+            start_time=self.start_time,
+            total_miles=self.total_distance,
+            carrier_info=self.carrier_info(),
+            vehicle_info=self.vehicle_info(),
+            intermediate_cities=self.intermediate_cities
+        ):
+            self.log_sheets.append(log_sheet)
+            yield log_sheet
+
+    def iter_plan(self, start_time: Optional[datetime] = None) -> Iterator[Tuple[str, Dict]]:
+        """The plan as (event, data) pairs, each yielded as soon as its stage is done.
+
+        The HOS timeline only needs the route distance, so route, summary and
+        timeline come before the slow reverse-geocoding stages; then the route
+        and log city labels, then one event per log sheet, then the saved plan ID.
+        Geocoding and routing errors are raised by the first next().
+        """
+        self.geocode()
+        self.plan_route()
+        self.calculate_timeline(start_time)
+        yield "route", self.route_response()
+        yield "summary", self.summary_response()
+        yield "timeline", {"timeline": self.timeline_response(), "compliance": self.trip_result["compliance"]}
+
+        self.label_route()
+        yield "route_cities", {"intermediate_cities": self.route_intermediate_cities}
+        self.label_log_cities()
+        yield "log_cities", {"intermediate_cities": self.intermediate_cities}
+
+        for index, log_sheet in enumerate(self.iter_log_sheets()):
+            yield "log_sheet", {"index": index, "log_sheet": log_sheet}
+
+        self.save_plan()
+        yield "plan", {"plan_id": str(self.plan_id) if self.plan_id else None}
+
+    def route_response(self) -> Dict:
+        return {
+            "distance_miles": round(self.total_distance, 2),
+            "geometry": self.route_geometry,
+            "geometry_format": self.data.get("geometry_format", "coordinates"),
+            "fuel_stops": self.fuel_stops,
+            "start_coords": self.start_coords,
+            "pickup_coords": self.pickup_coords,
+            "dropoff_coords": self.dropoff_coords,
+            "intermediate_cities": self.route_intermediate_cities
+        }
+
+    def timeline_response(self) -> List[Dict]:
+        tz = self.start_time.tzinfo
+        return [event.to_dict(tz) for event in self.trip_result["timeline"]]
+
+    def summary_response(self) -> Dict:
+        trip_result = self.trip_result
+        return {
+            "total_driving_hours": round(trip_result["total_driving_hours"], 2),
+            "total_on_duty_hours": round(trip_result["total_on_duty_hours"], 2),
+            "estimated_arrival": to_datetime(
+                trip_result["timeline"][-1].end, self.start_time.tzinfo
+            ).isoformat() if trip_result["timeline"] else None
+        }
+
+    def to_response(self) -> Dict:
+        return {
+            "plan_id": str(self.plan_id) if self.plan_id else None,
+            "route": self.route_response(),
+            "timeline": self.timeline_response(),
+            "compliance": self.trip_result["compliance"],
+            "log_sheets": self.log_sheets,
+            "summary": self.summary_response()
+        }
@@ -0,0 +1,156 @@
+"""Trip scenarios and a stand-in for LocationIQ, Nominatim and ORS, shared by the tests and benchmarks.
+
+Geocode answers come from PLACES and routes are synthesized great circles
+with a little wiggle, in the providers' response formats; reverse geocoding
+is answered from the bundled gazetteer.
+"""
+import math
+from typing import Dict, List, Optional, Tuple
+
+from trips.services.cache import normalize_address
+from trips.services.offline_geocoder import get_offline_geocoder
+
+
+class StubRequest:
+    """An upstream request as StandIn sees it (benchmarks.stub_server passes its own, alike)"""
+
+    def __init__(self, method: str, path: str, query: dict, body: Optional[dict]):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.body = body
+
+
+PLACES = {
+    "Dallas, TX": (32.7767, -96.7970),
+    "Fort Worth, TX": (32.7555, -97.3308),
+    "Waco, TX": (31.5493, -97.1467),
+    "Oklahoma City, OK": (35.4676, -97.5164),
+    "Denver, CO": (39.7392, -104.9903),
+    "Los Angeles, CA": (34.0522, -118.2437),
+    "Phoenix, AZ": (33.4484, -112.0740),
+    "New York, NY": (40.7128, -74.0060),
+    "Seattle, WA": (47.6062, -122.3321),
+    "Miami, FL": (25.7617, -80.1918),
+    "San Diego, CA": (32.7157, -117.1611),
+}
+
+# name -> (current, pickup, dropoff, cycle hours used)
+SCENARIOS = {
+    "short": ("Dallas, TX", "Fort Worth, TX", "Waco, TX", 10.0),
+    "regional": ("Dallas, TX", "Oklahoma City, OK", "Denver, CO", 20.0),
+    "cross_country": ("Los Angeles, CA", "Phoenix, AZ", "New York, NY", 30.0),
+    "multi_week": ("Seattle, WA", "Miami, FL", "San Diego, CA", 5.0),
+}
+
+START_TIME = "2026-03-02T06:00:00-06:00"
+EARTH_RADIUS_METERS = 6371008.8
+VERTEX_SPACING_METERS = 400.0
+METERS_PER_SECOND = 26.8
+
+
+def route_key(coordinates: List[List[float]]) -> str:
+    return ";".join(f"{lon:.4f},{lat:.4f}" for lon, lat in coordinates)
+
+
+def _haversine_meters(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[1], a[0], b[1], b[0]))
+    h = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_METERS * math.asin(math.sqrt(h))
+
+
+def _great_circle(a: List[float], b: List[float]) -> List[List[float]]:
+    """[lon, lat] vertices from a to b every VERTEX_SPACING_METERS, wiggled like a road"""
+    lon1, lat1, lon2, lat2 = map(math.radians, (a[0], a[1], b[0], b[1]))
+    p1 = (math.cos(lat1) * math.cos(lon1), math.cos(lat1) * math.sin(lon1), math.sin(lat1))
+    p2 = (math.cos(lat2) * math.cos(lon2), math.cos(lat2) * math.sin(lon2), math.sin(lat2))
+    angle = math.acos(max(-1.0, min(1.0, sum(x * y for x, y in zip(p1, p2)))))
+    steps = max(1, int(angle * EARTH_RADIUS_METERS / VERTEX_SPACING_METERS))
+    points = []
+    for k in range(steps + 1):
+        t = k / steps
+        if angle == 0:
+            x, y, z = p1
+        else:
+            s1 = math.sin((1 - t) * angle) / math.sin(angle)
+            s2 = math.sin(t * angle) / math.sin(angle)
+            x, y, z = (s1 * u + s2 * v for u, v in zip(p1, p2))
+        wiggle = 0.01 * math.sin(k / 9.0) if 0 < k < steps else 0.0
+        points.append([
+            math.degrees(math.atan2(y, x)),
+            math.degrees(math.atan2(z, math.hypot(x, y))) + wiggle
+        ])
+    return points
+
+
+def synthesize_route(waypoints: List[List[float]]) -> Dict:
+    """ORS GeoJSON directions response for [lon, lat] waypoints"""
+    coordinates = [waypoints[0]]
+    way_points = [0]
+    segments = []
+    for a, b in zip(waypoints, waypoints[1:]):
+        leg = _great_circle(a, b)[1:]
+        distance = sum(_haversine_meters(p, q) for p, q in zip([coordinates[-1]] + leg, leg))
+        coordinates.extend(leg)
+        way_points.append(len(coordinates) - 1)
+        segments.append({"distance": distance, "duration": distance / METERS_PER_SECOND})
+    return {
+        "type": "FeatureCollection",
+        "features": [{
+            "type": "Feature",
+            "geometry": {"type": "LineString", "coordinates": coordinates},
+            "properties": {
+                "segments": segments,
+                "way_points": way_points,
+                "summary": {
+                    "distance": sum(s["distance"] for s in segments),
+                    "duration": sum(s["duration"] for s in segments)
+                }
+            }
+        }]
+    }
+
+
+def synthesize_fixtures(scenario: str) -> Dict:
+    """Geocode answers and the route for one scenario, keyed the way the stand-in looks them up"""
+    stops = SCENARIOS[scenario][:3]
+    geocode = {
+        normalize_address(place): [{"lat": str(PLACES[place][0]), "lon": str(PLACES[place][1]), "display_name": place}]
+        for place in stops
+    }
+    waypoints = [[PLACES[place][1], PLACES[place][0]] for place in stops]
+    return {"geocode": geocode, "routes": {route_key(waypoints): synthesize_route(waypoints)}}
+
+
+class StandIn:
+    """Responder (for FakeSession or benchmarks.stub_server.StubServer) that plays LocationIQ/Nominatim search, Nominatim reverse and ORS"""
+
+    def __init__(self, fixtures: Dict):
+        self.fixtures = fixtures
+        self.gazetteer = get_offline_geocoder()
+
+    def __call__(self, request: StubRequest) -> Tuple[int, object]:
+        if request.path.endswith("/reverse"):
+            name, state, _ = self.gazetteer.nearest(float(request.query["lat"]), float(request.query["lon"]))
+            return 200, {"address": {"city": name, "state": state}}
+        if request.path.endswith("/search") or request.path.endswith("/search.php"):
+            return 200, self.fixtures["geocode"].get(normalize_address(request.query.get("q", "")), [])
+        if "/directions/" in request.path:
+            coordinates = (request.body or {}).get("coordinates", [])
+            route = self.fixtures["routes"].get(route_key(coordinates))
+            if route is None:
+                route = synthesize_route(coordinates)
+            return 200, route
+        return 404, {"error": "not found"}
+
+
+def request_payload(scenario: str) -> Dict:
+    current, pickup, dropoff, cycle_used = SCENARIOS[scenario]
+    return {
+        "current_location": current,
+        "pickup_location": pickup,
+        "dropoff_location": dropoff,
+        "current_cycle_used": cycle_used,
+        "timezone": "America/Chicago",
+        "start_time": START_TIME
+    }
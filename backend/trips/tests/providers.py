@@ -0,0 +1,91 @@
+"""In-process stand-ins for LocationIQ, Nominatim and ORS, so tests never touch the network"""
+from typing import Callable, List, Optional, Tuple
+from unittest import mock
+from urllib.parse import urlsplit
+
+from django.test import TestCase, TransactionTestCase, override_settings
+
+from trips.services import providers, rate_limit
+
+from .fixtures import SCENARIOS, StandIn, StubRequest, request_payload, synthesize_fixtures
+
+__all__ = [
+    "FakeResponse", "FakeSession", "ProviderTestCase", "ProviderTransactionTestCase", "SCENARIOS", "request_payload"
+]
+
+
+class FakeResponse:
+    def __init__(self, status_code: int, payload):
+        self.status_code = status_code
+        self._payload = payload
+
+    def json(self):
+        return self._payload
+
+
+class FakeSession:
+    """requests.Session stand-in that answers through a responder and records each call.
+
+    `responder` takes a StubRequest and returns (status, payload), as StandIn
+    does; it may also raise (e.g. requests.Timeout).
+    """
+
+    def __init__(self, responder: Callable[[StubRequest], Tuple[int, object]]):
+        self.responder = responder
+        self.calls: List[StubRequest] = []
+
+    def request(self, method: str, url: str, params: Optional[dict] = None, json=None, **kwargs):
+        request = StubRequest(method, urlsplit(url).path, dict(params or {}), json)
+        self.calls.append(request)
+        status, payload = self.responder(request)
+        return FakeResponse(status, payload)
+
+    def count(self, path_suffix: str) -> int:
+        return sum(1 for call in self.calls if call.path.endswith(path_suffix))
+
+
+def scenario_responder(*scenarios: str) -> StandIn:
+    fixtures = {"geocode": {}, "routes": {}}
+    for scenario in scenarios:
+        for kind, answers in synthesize_fixtures(scenario).items():
+            fixtures[kind].update(answers)
+    return StandIn(fixtures)
+
+
+class ProviderStandIn:
+    """Routes every RouteService call through a FakeSession and starts each test
+    with fresh process-wide provider state (breakers, latency windows, rate limiters)
+    """
+
+    scenarios = ("short", "regional")
+
+    def setUp(self):
+        super().setUp()
+        providers._providers.clear()
+        rate_limit._limiters.clear()
+        self.upstream = FakeSession(lambda request: self.respond(request))
+        self.stand_in = scenario_responder(*self.scenarios)
+        patcher = mock.patch("trips.services.route_service.get_session", return_value=self.upstream)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(providers._providers.clear)
+        self.addCleanup(rate_limit._limiters.clear)
+
+    def respond(self, request: StubRequest) -> Tuple[int, object]:
+        return self.stand_in(request)
+
+
+# Lookups stay on the test thread (run_bounded runs inline with one worker), so
+# their cache writes are rolled back with the test's transaction
+@override_settings(
+    PROVIDER_MIN_INTERVALS={}, LOCATIONIQ_API_KEY="", GEOCODE_MAX_WORKERS=1, REVERSE_GEOCODE_MAX_WORKERS=1
+)
+class ProviderTestCase(ProviderStandIn, TestCase):
+    pass
+
+
+@override_settings(PROVIDER_MIN_INTERVALS={}, LOCATIONIQ_API_KEY="")
+class ProviderTransactionTestCase(ProviderStandIn, TransactionTestCase):
+    """For code that writes from worker threads (async views), which the
+    per-test transaction of ProviderTestCase would not roll back
+    """
@@ -0,0 +1,209 @@
+"""Reference implementations kept to check optimized code against the behaviour it replaced"""
+from typing import Dict, List
+
+from trips.services.log_generator import LogGenerator
+from trips.services.timeline import TimelineEvent
+
+
+class ReferenceLogGenerator(LogGenerator):
+    """LogGenerator with the city-time scan used before the single-pass merge (user-017)"""
+
+    def _calculate_city_times(self, timeline: List[TimelineEvent], intermediate_cities: List[Dict]) -> List[Dict]:
+        """Calculate the wall-clock minute (reached_minute) at which each city distance is reached from the driving segments"""
+        cities_with_times = []
+
+        if not intermediate_cities:
+            return cities_with_times
+
+        sorted_cities = sorted(intermediate_cities, key=lambda x: x["distance_miles"])
+
+        first_driving_event = next((e for e in timeline if e.status == "driving"), None)
+        first_event = timeline[0] if timeline else None
+        pickup_city = next((c for c in sorted_cities if c.get("type") == "pickup"), None)
+        start_to_pickup_distance = pickup_city["distance_miles"] if pickup_city else 0.0
+
+        total_driving_miles = sum(
+            event.hours * self.AVERAGE_SPEED_MPH
+            for event in timeline
+            if event.status == "driving"
+        )
+
+        if start_to_pickup_distance > 0 and first_driving_event and first_event:
+            trip_start_time = first_event.start
+        else:
+            trip_start_time = first_driving_event.start if first_driving_event else None
+
+        cumulative_driving_miles = 0.0
+        city_index = 0
+        last_driving_end_time = None
+
+        for event in timeline:
+            if event.status != "driving":
+                continue
+
+            driving_miles = event.hours * self.AVERAGE_SPEED_MPH
+            event_start_time = event.start
+            last_driving_end_time = event.end
+
+            while city_index < len(sorted_cities):
+                city = sorted_cities[city_index]
+                city_distance_from_start = city["distance_miles"]
+
+                if city_distance_from_start == 0 and city.get("type") == "start":
+                    if trip_start_time is not None:
+                        cities_with_times.append({
+                            "name": city["name"],
+                            "distance_miles": 0,
+                            "reached_minute": trip_start_time,
+                            "type": "start"
+                        })
+                    city_index += 1
+                    continue
+
+                if city.get("type") == "pickup" and first_driving_event:
+                    cities_with_times.append({
+                        "name": city["name"],
+                        "distance_miles": city_distance_from_start,
+                        "reached_minute": first_driving_event.start,
+                        "type": "pickup"
+                    })
+                    city_index += 1
+                    continue
+
+                if city_distance_from_start < start_to_pickup_distance:
+                    if trip_start_time is not None and start_to_pickup_distance > 0:
+                        city_reached_time = trip_start_time + self._minutes_for_miles(city_distance_from_start)
+
+                        cities_with_times.append({
+                            "name": city["name"],
+                            "distance_miles": city_distance_from_start,
+                            "reached_minute": city_reached_time,
+                            "type": city.get("type", "intermediate")
+                        })
+                    else:
+                        if trip_start_time is not None:
+                            cities_with_times.append({
+                                "name": city["name"],
+                                "distance_miles": city_distance_from_start,
+                                "reached_minute": trip_start_time,
+                                "type": city.get("type", "intermediate")
+                            })
+                    city_index += 1
+                    continue
+
+                distance_from_pickup = city_distance_from_start - start_to_pickup_distance
+
+                if cumulative_driving_miles < distance_from_pickup <= cumulative_driving_miles + driving_miles:
+                    miles_into_segment = distance_from_pickup - cumulative_driving_miles
+                    city_reached_time = event_start_time + self._minutes_for_miles(miles_into_segment)
+
+                    if event_start_time <= city_reached_time <= event.end:
+                        cities_with_times.append({
+                            "name": city["name"],
+                            "distance_miles": city_distance_from_start,
+                            "reached_minute": city_reached_time,
+                            "type": city.get("type", "intermediate")
+                        })
+                    city_index += 1
+                elif distance_from_pickup > cumulative_driving_miles + driving_miles:
+                    break
+                else:
+                    city_index += 1
+
+            cumulative_driving_miles += driving_miles
+
+            if city_index >= len(sorted_cities):
+                break
+
+        while city_index < len(sorted_cities):
+            city = sorted_cities[city_index]
+            city_distance_from_start = city["distance_miles"]
+
+            if city_distance_from_start >= start_to_pickup_distance:
+                distance_from_pickup = city_distance_from_start - start_to_pickup_distance
+
+                temp_cumulative = 0.0
+                found = False
+                for event in timeline:
+                    if event.status == "driving":
+                        driving_miles = event.hours * self.AVERAGE_SPEED_MPH
+                        if temp_cumulative + driving_miles >= distance_from_pickup:
+                            miles_into_segment = distance_from_pickup - temp_cumulative
+                            city_reached_time = event.start + self._minutes_for_miles(miles_into_segment)
+
+                            if event.start <= city_reached_time <= event.end:
+                                cities_with_times.append({
+                                    "name": city["name"],
+                                    "distance_miles": city_distance_from_start,
+                                    "reached_minute": city_reached_time,
+                                    "type": city.get("type", "intermediate")
+                                })
+                                found = True
+                                break
+                        temp_cumulative += driving_miles
+
+                if not found:
+                    temp_cumulative = 0.0
+                    for event in timeline:
+                        if event.status == "driving":
+                            driving_miles = event.hours * self.AVERAGE_SPEED_MPH
+
+                            if temp_cumulative < distance_from_pickup <= temp_cumulative + driving_miles:
+                                miles_into_segment = distance_from_pickup - temp_cumulative
+                                city_reached_time = event.start + self._minutes_for_miles(miles_into_segment)
+
+                                if event.start <= city_reached_time <= event.end:
+                                    cities_with_times.append({
+                                        "name": city["name"],
+                                        "distance_miles": city_distance_from_start,
+                                        "reached_minute": city_reached_time,
+                                        "type": city.get("type", "intermediate")
+                                    })
+                                    found = True
+                                    break
+
+                            temp_cumulative += driving_miles
+
+                    if not found and distance_from_pickup <= total_driving_miles and first_driving_event and last_driving_end_time is not None:
+                        distance_ratio = distance_from_pickup / total_driving_miles if total_driving_miles > 0 else 0
+                        timeline_start = first_driving_event.start
+                        city_reached_time = timeline_start + distance_ratio * (last_driving_end_time - timeline_start)
+
+                        closest_segment = None
+                        min_time_diff = float('inf')
+                        for event in timeline:
+                            if event.status == "driving":
+                                if event.start <= city_reached_time <= event.end:
+                                    closest_segment = event
+                                    break
+                                if event.start <= city_reached_time:
+                                    time_diff = city_reached_time - event.start
+                                    if time_diff < min_time_diff:
+                                        min_time_diff = time_diff
+                                        closest_segment = event
+
+                        if closest_segment:
+                            if city_reached_time < closest_segment.start:
+                                city_reached_time = closest_segment.start
+                            elif city_reached_time > closest_segment.end:
+                                city_reached_time = closest_segment.end
+
+                            cities_with_times.append({
+                                "name": city["name"],
+                                "distance_miles": city_distance_from_start,
+                                "reached_minute": city_reached_time,
+                                "type": city.get("type", "intermediate")
+                            })
+                            found = True
+                        else:
+                            cities_with_times.append({
+                                "name": city["name"],
+                                "distance_miles": city_distance_from_start,
+                                "reached_minute": last_driving_end_time,
+                                "type": city.get("type", "intermediate")
+                            })
+                            found = True
+
+            city_index += 1
+
+        return cities_with_times
@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from trips.models import GeocodeCacheEntry, RouteLegCacheEntry
+from trips.services.cache import GeocodeCache
+from trips.services.route_service import RouteService
+
+from .providers import ProviderTestCase, request_payload
+
+DALLAS = (32.7767, -96.797)
+
+
+class GeocodeCacheTests(TestCase):
+    def test_equivalent_spellings_share_an_entry(self):
+        cache = GeocodeCache()
+        cache.set("Dallas,  TX", DALLAS)
+        self.assertEqual(cache.get("dallas, tx."), (True, DALLAS))
+        self.assertEqual(GeocodeCacheEntry.objects.count(), 1)
+
+    def test_negative_entries_use_their_own_ttl(self):
+        cache = GeocodeCache(ttl=3600, negative_ttl=60)
+        cache.set("Nowhere Land", None)
+        cache.set("Dallas, TX", DALLAS)
+        self.assertEqual(cache.get("Nowhere Land"), (True, None))
+
+        GeocodeCacheEntry.objects.update(created_at=timezone.now() - timedelta(seconds=120))
+        self.assertEqual(cache.get("Nowhere Land"), (False, None))
+        self.assertEqual(cache.get("Dallas, TX"), (True, DALLAS))
+
+    def test_least_recently_used_entries_are_evicted(self):
+        cache = GeocodeCache(max_entries=2)
+        cache.set("Dallas, TX", DALLAS)
+        GeocodeCacheEntry.objects.update(last_used_at=timezone.now() - timedelta(hours=1))
+        cache.set("Waco, TX", (31.5493, -97.1467))
+        cache.set("Denver, CO", (39.7392, -104.9903))
+        self.assertEqual(cache.get("Dallas, TX"), (False, None))
+        self.assertEqual(GeocodeCacheEntry.objects.count(), 2)
+
+
+class GeocodeNegativeCachingTests(ProviderTestCase):
+    def test_no_match_is_cached(self):
+        self.assertIsNone(RouteService()._geocode("Nowhere Land", 2, []))
+        self.assertIsNone(RouteService()._geocode("Nowhere Land", 2, []))
+        self.assertEqual(self.upstream.count("/search"), 1)
+
+    def test_failures_are_not_cached(self):
+        def respond(request):
+            if request.path.endswith("/search"):
+                return 503, {}
+            return self.stand_in(request)
+        self.respond = respond
+
+        self.assertIsNone(RouteService()._geocode("Dallas, TX", 2, []))
+        self.assertFalse(GeocodeCacheEntry.objects.exists())
+
+        self.respond = self.stand_in
+        self.assertEqual(RouteService()._geocode("Dallas, TX", 2, []), DALLAS)
+
+
+@override_settings(PLAN_CACHE_ENABLED=False)
+class RouteLegCacheTests(ProviderTestCase):
+    def plan(self, scenario: str) -> dict:
+        response = self.client.post(reverse("calculate-trip"), request_payload(scenario), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        return dict(response.json(), plan_id=None)
+
+    def test_warm_response_matches_cold(self):
+        cold = self.plan("regional")
+        self.assertTrue(RouteLegCacheEntry.objects.exists())
+        routes = self.upstream.count("/driving-car")
+
+        warm = self.plan("regional")
+        self.assertEqual(self.upstream.count("/driving-car"), routes)
+        self.assertEqual(warm, cold)
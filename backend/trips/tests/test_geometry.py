@@ -0,0 +1,94 @@
+import numpy as np
+from django.test import SimpleTestCase
+from geopy.distance import geodesic
+
+from trips.services.distance import cumulative_miles, to_unit_vectors, vincenty_miles
+from trips.services.offline_geocoder import KDTree, get_offline_geocoder
+from trips.services.route_service import RouteService
+from trips.services.simplify import simplify
+
+from .fixtures import PLACES, synthesize_route
+
+
+def meridian(lat_from: float, lat_to: float, steps: int, lon: float = -97.0):
+    return [[lon, lat_from + (lat_to - lat_from) * k / steps] for k in range(steps + 1)]
+
+
+class SimplifyTests(SimpleTestCase):
+    def test_straight_line_keeps_its_ends(self):
+        line = meridian(32.0, 34.0, 200)
+        self.assertEqual(simplify(line, 200.0), [line[0], line[-1]])
+
+    def test_route_that_doubles_back_keeps_the_turnaround(self):
+        # ~140 miles north, then ~100 back down the same road: every vertex lies on
+        # the great circle through the ends, but the turnaround is far off the arc
+        route = meridian(32.0, 34.0, 200) + meridian(34.0, 32.5, 150)[1:]
+        simplified = simplify(route, 200.0)
+        self.assertEqual(simplified, [route[0], [-97.0, 34.0], route[-1]])
+
+    def test_zero_tolerance_is_a_no_op(self):
+        line = meridian(32.0, 34.0, 10)
+        self.assertIs(simplify(line, 0.0), line)
+
+
+class VincentyTests(SimpleTestCase):
+    def test_matches_geopy_geodesic(self):
+        rng = np.random.default_rng(3)
+        lat1, lon1 = rng.uniform(25, 49, 300), rng.uniform(-124, -67, 300)
+        for spread in (0.005, 0.5, 20.0):
+            with self.subTest(spread=spread):
+                lat2 = lat1 + rng.uniform(-spread, spread, 300)
+                lon2 = lon1 + rng.uniform(-spread, spread, 300)
+                expected = [geodesic(a, b).miles for a, b in zip(zip(lat1, lon1), zip(lat2, lon2))]
+                np.testing.assert_allclose(vincenty_miles(lat1, lon1, lat2, lon2), expected, rtol=0, atol=1e-6)
+
+    def test_route_odometer_matches_geopy_loop(self):
+        route = meridian(32.0, 40.0, 2000, lon=-100.0)
+        for k in range(len(route)):
+            route[k][0] += 0.01 * np.sin(k / 9.0)
+        expected = sum(geodesic((a[1], a[0]), (b[1], b[0])).miles for a, b in zip(route, route[1:]))
+        self.assertAlmostEqual(cumulative_miles(route)[-1], expected, delta=0.001)
+
+
+class KDTreeTests(SimpleTestCase):
+    def assertMatchesBruteForce(self, points: np.ndarray, queries: np.ndarray):
+        tree = KDTree(points)
+        for query in queries:
+            chord, index = tree.query(query)
+            distances = np.sqrt(((points - query) ** 2).sum(axis=1))
+            self.assertAlmostEqual(chord, distances.min(), places=12)
+            self.assertAlmostEqual(distances[index], distances.min(), places=12)
+
+    def test_random_points_match_brute_force(self):
+        rng = np.random.default_rng(6)
+        points = to_unit_vectors(rng.uniform(-80, 80, 2000), rng.uniform(-180, 180, 2000))
+        queries = to_unit_vectors(rng.uniform(-90, 90, 300), rng.uniform(-180, 180, 300))
+        self.assertMatchesBruteForce(points, queries)
+
+    def test_gazetteer_matches_brute_force(self):
+        rng = np.random.default_rng(6)
+        points = get_offline_geocoder().tree.points
+        queries = to_unit_vectors(rng.uniform(24.5, 49.5, 200), rng.uniform(-125, -66.5, 200))
+        self.assertMatchesBruteForce(points, queries)
+
+
+class RouteResultTests(SimpleTestCase):
+    def test_pickup_split_matches_nearest_vertex(self):
+        stops = [PLACES[name] for name in ("Dallas, TX", "Oklahoma City, OK", "Denver, CO")]
+        route = synthesize_route([[lon, lat] for lat, lon in stops])["features"][0]
+        service = RouteService()
+
+        result = service.get_route_result(route)
+        way_points = route["properties"]["way_points"]
+        self.assertEqual([(leg.start_index, leg.end_index) for leg in result.legs], list(zip(way_points, way_points[1:])))
+        self.assertEqual(result.legs[0].start_mile, 0.0)
+        self.assertEqual(result.legs[0].end_mile, result.legs[1].start_mile)
+        self.assertAlmostEqual(result.legs[1].end_mile, cumulative_miles(route["geometry"]["coordinates"])[-1], places=6)
+        self.assertAlmostEqual(result.distance_miles, route["properties"]["summary"]["distance"] / 1609.34, places=6)
+
+        route_index = service.get_route_index(route)
+        self.assertAlmostEqual(result.legs[0].end_mile, route_index.mile_of_nearest_vertex(*stops[1]), places=6)
+
+    def test_fallback_route_has_no_legs(self):
+        route = RouteService()._calculate_simple_route(PLACES["Dallas, TX"], [PLACES["Waco, TX"]], PLACES["Denver, CO"])
+        self.assertIsNone(RouteService().get_route_result(route))
@@ -0,0 +1,159 @@
+import hashlib
+import json
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Dict, List
+from zoneinfo import ZoneInfo
+
+from django.test import SimpleTestCase
+
+from trips.services.hos_calculator import HOSCalculator
+from trips.services.log_generator import LogGenerator
+
+from .reference import ReferenceLogGenerator
+
+# sha256 of each case's normalized timeline, compliance and log sheets, recorded
+# from the original dict/timedelta implementation (before user-015)
+DIGESTS = Path(__file__).parent / "data" / "log_sheet_digests.json"
+
+CARRIER = {"name": "C", "from": "Start, TX", "to": "Drop, CA", "current_cycle_used": 12.5}
+VEHICLE = {"truck_tractor": "1", "trailer": "2", "total_mileage": ""}
+
+
+def route_cities(total: float, pickup: float, step: float) -> List[Dict]:
+    cities = [{"name": "Start", "distance_miles": 0.0, "type": "start"}]
+    miles, k = step, 0
+    while miles < total:
+        if abs(miles - pickup) > 1e-9:
+            name = f"Town{k} County" if k % 3 == 0 else f"Town{k}"
+            cities.append({"name": name, "distance_miles": round(miles, 1), "type": "intermediate"})
+        k += 1
+        miles += step
+    cities.append({"name": "Pick", "distance_miles": round(pickup, 1), "type": "pickup"})
+    cities.append({"name": "Drop", "distance_miles": round(total, 1), "type": "dropoff"})
+    cities.sort(key=lambda city: city["distance_miles"])
+    return cities
+
+
+def cases():
+    """(timezone, total miles, pickup mile, city spacing, naive start): DST switches, midnights, long trips.
+
+    Totals are whole miles and starts whole minutes. The integer-minute
+    timeline deliberately rounds fractional driving minutes, so only such
+    trips can be compared with the original implementation.
+    """
+    for tz in ["UTC", "America/Chicago"]:
+        for total, pickup, step in [(12.0, 5.0, 50), (251.0, 80.2, 50), (987.0, 120.0, 50),
+                                    (2810.0, 400.3, 30), (7423.0, 33.0, 50), (0.0, 0.0, 50)]:
+            for start in [datetime(2026, 3, 7, 21, 47), datetime(2026, 10, 18, 6, 5), datetime(2026, 11, 1, 0, 0)]:
+                yield tz, total, pickup, step, start
+    for tz in ["America/New_York", "America/Los_Angeles"]:
+        for total, pickup, step in [(33.0, 10.7, 7.3), (480.0, 0.0, 37.3), (1312.0, 222.2, 11.0),
+                                    (3650.0, 75.0, 45.5), (15000.0, 500.0, 50)]:
+            for start in [datetime(2026, 3, 8, 1, 59), datetime(2026, 3, 7, 23, 30), datetime(2026, 11, 1, 0, 10),
+                          datetime(2026, 6, 30, 23, 59), datetime(2026, 2, 27, 12, 0)]:
+                yield tz, total, pickup, step, start
+
+
+def plan_case(tz_name: str, total: float, pickup: float, step: float, start: datetime) -> Dict:
+    tz = ZoneInfo(tz_name)
+    start_time = start.replace(tzinfo=tz)
+    trip = HOSCalculator(current_cycle_used=12.5, start_time=start_time).calculate_trip_timeline(total_distance_miles=total)
+    sheets = LogGenerator().generate_log_sheets(
+        timeline=trip["timeline"], start_time=start_time, total_miles=total, carrier_info=dict(CARRIER),
+        vehicle_info=dict(VEHICLE), intermediate_cities=route_cities(total, pickup, step) if total else []
+    )
+    timeline = [
+        {name: value for name, value in event.to_dict(tz).items() if name != "location"}
+        for event in trip["timeline"]
+    ]
+    return {"timeline": timeline, "compliance": trip["compliance"], "sheets": sheets}
+
+
+def normalized(value):
+    """JSON-shaped copy with floats rounded to 9 places, hiding float drift the
+    float-hour arithmetic had (2.8333333333333357 h vs 2.8333333333333335 h)
+    """
+    if isinstance(value, float):
+        return round(value, 9)
+    if isinstance(value, dict):
+        return {name: normalized(item) for name, item in value.items()}
+    if isinstance(value, list):
+        return [normalized(item) for item in value]
+    return value
+
+
+def digest(result: Dict) -> str:
+    body = normalized(json.loads(json.dumps(result, default=str)))
+    return hashlib.sha256(json.dumps(body, sort_keys=True).encode()).hexdigest()
+
+
+class LogSheetRegressionTests(SimpleTestCase):
+    def test_output_matches_original_implementation(self):
+        expected = json.loads(DIGESTS.read_text())
+        seen = 0
+        for case in cases():
+            label = "|".join(str(part) for part in case[:4]) + "|" + case[4].isoformat()
+            with self.subTest(case=label):
+                self.assertEqual(digest(plan_case(*case)), expected[label])
+            seen += 1
+        self.assertEqual(seen, len(expected))
+
+    def test_fractional_minute_slack_does_not_loop(self):
+        # The original float-hour scheduler never finished this trip (OverflowError
+        # once its clock ran past year 9999); rounding to whole minutes fixed it
+        for tz in ["America/New_York", "America/Los_Angeles"]:
+            with self.subTest(tz=tz):
+                result = plan_case(tz, 480.2, 0.0, 37.3, datetime(2026, 2, 27, 12, 0))
+                self.assertEqual([sheet["total_miles_driving"] for sheet in result["sheets"]], [480.0])
+
+
+def random_cities(rnd: random.Random, miles: float) -> List[Dict]:
+    """Shuffled cities with duplicates, zero and past-the-end distances, missing types and an optional pickup/dropoff"""
+    pickup = rnd.choice([0, 0.0, rnd.uniform(0, miles + 1)])
+    cities = [{"name": "S", "distance_miles": rnd.choice([0, 0.0]), "type": "start"}]
+    if rnd.random() < 0.9:
+        cities.append({"name": "P", "distance_miles": pickup, "type": "pickup"})
+    for i in range(rnd.randrange(0, 40)):
+        city = {
+            "name": f"c{i}",
+            "distance_miles": rnd.choice([rnd.uniform(0, miles * 1.2 + 5), pickup, 0, round(rnd.uniform(0, miles + 5))])
+        }
+        if rnd.random() < 0.7:
+            city["type"] = "intermediate"
+        cities.append(city)
+    if rnd.random() < 0.8:
+        cities.append({"name": "D", "distance_miles": rnd.choice([miles, miles + pickup]), "type": "dropoff"})
+    rnd.shuffle(cities)
+    return cities
+
+
+class CityTimesEquivalenceTests(SimpleTestCase):
+    """The single-pass city-time merge against the scan it replaced, on randomized trips"""
+
+    def random_trip(self, rnd: random.Random):
+        miles = rnd.choice([0, 0.5, rnd.uniform(1, 200), rnd.uniform(200, 3000), rnd.uniform(3000, 12000)])
+        start = datetime(2024, 3, 1, tzinfo=ZoneInfo("America/Chicago")) + timedelta(minutes=rnd.randrange(0, 3000))
+        trip = HOSCalculator(rnd.uniform(0, 60), start).calculate_trip_timeline(miles)
+        return miles, start, trip["timeline"], random_cities(rnd, miles)
+
+    def test_city_times_match_reference(self):
+        rnd = random.Random(7)
+        for trial in range(2000):
+            _, _, timeline, cities = self.random_trip(rnd)
+            expected = ReferenceLogGenerator()._calculate_city_times(timeline, cities)
+            self.assertEqual(repr(LogGenerator()._calculate_city_times(timeline, cities)), repr(expected), trial)
+
+    def test_log_sheets_match_reference(self):
+        rnd = random.Random(17)
+        for trial in range(300):
+            miles, start, timeline, cities = self.random_trip(rnd)
+            sheets = [
+                generator.generate_log_sheets(
+                    timeline=timeline, start_time=start, total_miles=miles, carrier_info=dict(CARRIER),
+                    vehicle_info=dict(VEHICLE), intermediate_cities=cities
+                )
+                for generator in (LogGenerator(), ReferenceLogGenerator())
+            ]
+            self.assertEqual(sheets[0], sheets[1], trial)
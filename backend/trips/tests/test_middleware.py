@@ -0,0 +1,83 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+
+from trips.middleware import ServerTimingMiddleware
+from trips.services.metrics import record_span
+
+from .providers import ProviderTestCase, ProviderTransactionTestCase, request_payload
+
+
+class CompressionMiddlewareTests(ProviderTestCase):
+    def test_streaming_response_is_not_compressed(self):
+        for accept in ("application/x-ndjson", "text/event-stream"):
+            with self.subTest(accept=accept):
+                response = self.client.post(
+                    reverse("calculate-trip-stream"), request_payload("short"), content_type="application/json",
+                    HTTP_ACCEPT=accept, HTTP_ACCEPT_ENCODING="gzip, deflate, br"
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertFalse(response.has_header("Content-Encoding"))
+                chunks = list(response.streaming_content)
+                self.assertGreater(len(chunks), 1)
+                self.assertIn(b"log_sheet", b"".join(chunks))
+
+    def test_plain_response_is_still_compressed(self):
+        response = self.client.post(
+            reverse("calculate-trip"), request_payload("short"), content_type="application/json",
+            HTTP_ACCEPT_ENCODING="gzip"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_refused_gzip_is_not_sent(self):
+        for accept in ("gzip;q=0", "gzip;q=0, br;q=0", "br, gzip;q=0", "identity, gzip;q=0.0"):
+            with self.subTest(accept=accept):
+                response = self.client.post(
+                    reverse("calculate-trip"), request_payload("short"), content_type="application/json",
+                    HTTP_ACCEPT_ENCODING=accept
+                )
+                self.assertEqual(response.status_code, 200)
+                self.assertNotEqual(response.get("Content-Encoding"), "gzip")
+                self.assertIn("Accept-Encoding", response["Vary"])
+
+    def test_refused_gzip_without_brotli_installed(self):
+        with mock.patch("trips.middleware.brotli", None):
+            response = self.client.post(
+                reverse("calculate-trip"), request_payload("short"), content_type="application/json",
+                HTTP_ACCEPT_ENCODING="br, gzip;q=0"
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header("Content-Encoding"))
+
+
+class ServerTimingMiddlewareTests(ProviderTestCase):
+    def test_async_stack_stays_async(self):
+        async def view(request):
+            record_span("geocode", 0.25)
+            return HttpResponse("ok")
+
+        middleware = ServerTimingMiddleware(view)
+        self.assertTrue(iscoroutinefunction(middleware))
+        request = RequestFactory().get("/")
+        request.resolver_match = None
+        response = async_to_sync(middleware)(request)
+        self.assertRegex(response["Server-Timing"], r"^geocode;dur=250\.0, total;dur=")
+
+    def test_sync_stack(self):
+        middleware = ServerTimingMiddleware(lambda request: HttpResponse("ok"))
+        self.assertFalse(iscoroutinefunction(middleware))
+        response = self.client.get(reverse("health-check"))
+        self.assertIn("total;dur=", response["Server-Timing"])
+
+
+class AsyncViewServerTimingTests(ProviderTransactionTestCase):
+    async def test_async_view_reports_stages(self):
+        response = await self.async_client.post(
+            reverse("calculate-trip-async"), request_payload("short"), content_type="application/json"
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("geocode;dur=", response["Server-Timing"])
@@ -0,0 +1,194 @@
+import threading
+from unittest import mock
+
+from django.test import SimpleTestCase, override_settings
+
+from trips.models import GeocodeCacheEntry
+from trips.services.providers import (
+    BREAKER_OPENED, PROVIDER_HEDGES, CircuitBreaker, ProviderChain, ProviderError, UpstreamCancelled,
+    get_provider
+)
+from trips.services.route_service import RouteService
+
+from .providers import ProviderTestCase
+
+DALLAS = (32.7767, -96.797)
+AMARILLO = (35.222, -101.8313)
+
+
+class CircuitBreakerTests(SimpleTestCase):
+    def setUp(self):
+        self.now = 1000.0
+        patcher = mock.patch("trips.services.providers.time.monotonic", side_effect=lambda: self.now)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30.0)
+
+    def test_opens_after_consecutive_failures(self):
+        self.assertFalse(self.breaker.record_failure())
+        self.breaker.record_success()
+        self.assertFalse(self.breaker.record_failure())
+        self.assertFalse(self.breaker.record_failure())
+        self.assertTrue(self.breaker.record_failure())
+        self.assertEqual(self.breaker.state, "open")
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_lets_one_trial_through(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.now += 30.0
+        self.assertEqual(self.breaker.state, "half_open")
+        self.assertTrue(self.breaker.allow())
+        self.assertFalse(self.breaker.allow())
+
+        self.assertTrue(self.breaker.record_failure())
+        self.assertEqual(self.breaker.state, "open")
+
+        self.now += 30.0
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, "closed")
+
+    def test_release_ends_a_trial_without_counting_it(self):
+        for _ in range(3):
+            self.breaker.record_failure()
+        self.now += 30.0
+        self.assertTrue(self.breaker.allow())
+        self.breaker.release()
+        self.assertTrue(self.breaker.allow())
+
+
+@override_settings(PROVIDER_BREAKER_FAILURES=3)
+class ProviderBreakerTests(ProviderTestCase):
+    def route_answering(self, status: int) -> None:
+        def respond(request):
+            if "/directions/" in request.path:
+                return status, {"error": {"code": 2010, "message": "Could not find routable point"}}
+            return self.stand_in(request)
+        self.respond = respond
+
+    def test_server_errors_open_the_breaker(self):
+        self.route_answering(503)
+        service = RouteService()
+        opened = BREAKER_OPENED.value(provider="openrouteservice")
+        for _ in range(5):
+            route = service._request_route(DALLAS, [], AMARILLO)
+            self.assertNotIn("way_points", route["properties"])
+
+        self.assertEqual(self.upstream.count("/driving-car"), 3)
+        self.assertEqual(get_provider("openrouteservice").breaker.state, "open")
+        self.assertEqual(BREAKER_OPENED.value(provider="openrouteservice"), opened + 1)
+
+    def test_client_errors_do_not_count(self):
+        self.route_answering(404)
+        service = RouteService()
+        for _ in range(5):
+            service._request_route(DALLAS, [], AMARILLO)
+
+        self.assertEqual(self.upstream.count("/driving-car"), 5)
+        self.assertEqual(get_provider("openrouteservice").breaker.state, "closed")
+
+        self.respond = self.stand_in
+        route = service._request_route(DALLAS, [], AMARILLO)
+        self.assertIn("way_points", route["properties"])
+
+
+@override_settings(PROVIDER_HEDGE_DEFAULT_DELAY=0.05)
+class ProviderChainHedgingTests(ProviderTestCase):
+    def test_backup_fires_on_its_own_pool_and_wins(self):
+        release = threading.Event()
+        threads = {}
+
+        def slow(address):
+            threads["slow"] = threading.current_thread().name
+            release.wait(5)
+            return 1.0, 1.0
+
+        def fast(address):
+            threads["fast"] = threading.current_thread().name
+            return 2.0, 2.0
+
+        hedges = PROVIDER_HEDGES.value(provider="fast")
+        result = ProviderChain([("slow", slow), ("fast", fast)]).call("Dallas, TX")
+        release.set()
+
+        self.assertEqual((result.value, result.provider), ((2.0, 2.0), "fast"))
+        self.assertEqual(PROVIDER_HEDGES.value(provider="fast"), hedges + 1)
+        self.assertTrue(threads["slow"].startswith("provider-primary"))
+        self.assertTrue(threads["fast"].startswith("provider-hedge"))
+
+    def test_quick_primary_is_not_hedged(self):
+        called = []
+
+        def backup(address):
+            called.append(address)
+            return 2.0, 2.0
+
+        result = ProviderChain([("quick", lambda address: (1.0, 1.0)), ("backup", backup)]).call("Dallas, TX")
+        self.assertEqual(result.provider, "quick")
+        self.assertEqual(called, [])
+
+    def test_failed_primary_moves_on_without_waiting(self):
+        def broken(address):
+            raise ProviderError("HTTP 502")
+
+        result = ProviderChain([("broken", broken), ("backup", lambda address: (2.0, 2.0))]).call("Dallas, TX")
+        self.assertEqual(result.provider, "backup")
+        self.assertEqual([name for name, _ in result.errors], ["broken"])
+        self.assertFalse(result.complete)
+
+
+class CancellationTests(ProviderTestCase):
+    def test_chain_stops_at_a_cancelled_attempt(self):
+        called = []
+
+        def cancelled(address):
+            raise UpstreamCancelled("https://example.invalid/search")
+
+        def backup(address):
+            called.append(address)
+            return 2.0, 2.0
+
+        with self.assertRaises(UpstreamCancelled):
+            ProviderChain([("cancelled", cancelled), ("backup", backup)]).call("Dallas, TX")
+        self.assertEqual(called, [])
+
+    def test_cancelled_route_does_not_fall_back(self):
+        cancel_event = threading.Event()
+        cancel_event.set()
+        service = RouteService(cancel_event=cancel_event)
+
+        with mock.patch.object(service, "_calculate_simple_route") as simple:
+            with self.assertRaises(UpstreamCancelled):
+                service._request_route(DALLAS, [], AMARILLO)
+        simple.assert_not_called()
+        self.assertEqual(self.upstream.calls, [])
+
+
+class LocationIQTests(ProviderTestCase):
+    def test_not_asked_without_a_key(self):
+        self.assertEqual(RouteService()._geocode("Dallas, TX", 2, []), DALLAS)
+        self.assertEqual(self.upstream.count("/search.php"), 0)
+        self.assertEqual(self.upstream.count("/search"), 1)
+
+    @override_settings(LOCATIONIQ_API_KEY="test-key")
+    def test_sends_the_key(self):
+        self.assertEqual(RouteService()._geocode("Dallas, TX", 2, []), DALLAS)
+        search = [call for call in self.upstream.calls if call.path.endswith("/search.php")]
+        self.assertEqual(len(search), 1)
+        self.assertEqual(search[0].query["key"], "test-key")
+
+    @override_settings(LOCATIONIQ_API_KEY="revoked-key")
+    def test_rejected_key_still_caches_no_match(self):
+        def respond(request):
+            if request.path.endswith("/search.php"):
+                return 401, {"error": "Invalid key"}
+            return self.stand_in(request)
+        self.respond = respond
+        service, errors = RouteService(), []
+
+        self.assertIsNone(service._geocode("Nowhere Land", 2, errors))
+        self.assertEqual(errors, [])
+        self.assertEqual(self.upstream.count("/search"), 1)
+        self.assertTrue(GeocodeCacheEntry.objects.get(query="nowhere land").is_negative)
+        self.assertEqual(get_provider("locationiq").breaker.state, "closed")
@@ -0,0 +1,117 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import OperationalError
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from trips.models import PlanResultCacheEntry, TripPlan
+
+from .providers import ProviderTestCase, request_payload
+
+
+class ReplanTests(ProviderTestCase):
+    def plan(self, scenario: str = "regional") -> dict:
+        response = self.client.post(reverse("calculate-trip"), request_payload(scenario), content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def replan(self, plan_id: str, **data):
+        return self.client.post(
+            reverse("replan-trip", args=[plan_id]), dict({"current_cycle_used": 25.0}, **data),
+            content_type="application/json"
+        )
+
+    def test_route_is_stored_once_as_a_polyline(self):
+        planned = self.plan()
+        trip_plan = TripPlan.objects.get(id=planned["plan_id"])
+        self.assertIsInstance(trip_plan.route_polyline, str)
+        self.assertIn("segments", trip_plan.route_properties)
+        self.assertNotIn("geometry", trip_plan.route_properties)
+
+    def test_replan_reuses_the_stored_route(self):
+        planned = self.plan()
+        calls = len(self.upstream.calls)
+
+        response = self.replan(planned["plan_id"], completed_miles=150.0)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(self.upstream.calls), calls)
+        replanned = response.json()
+        self.assertEqual(replanned["plan_id"], planned["plan_id"])
+        self.assertEqual(replanned["progress"]["completed_miles"], 150.0)
+        self.assertEqual(replanned["route"]["distance_miles"], planned["route"]["distance_miles"])
+        original, restored = planned["route"]["geometry"], replanned["route"]["geometry"]
+        self.assertEqual(len(restored), len(original))
+        for a, b in zip(original, restored):
+            self.assertAlmostEqual(a[0], b[0], places=5)
+            self.assertAlmostEqual(a[1], b[1], places=5)
+
+    def test_expired_plan_is_not_found(self):
+        planned = self.plan()
+        TripPlan.objects.filter(id=planned["plan_id"]).update(updated_at=timezone.now() - timedelta(days=2))
+
+        with override_settings(TRIP_PLAN_TTL=24 * 3600):
+            self.assertEqual(self.replan(planned["plan_id"], completed_miles=10.0).status_code, 404)
+            out = StringIO()
+            call_command("purge_trip_plans", stdout=out)
+
+        self.assertIn("Deleted 1 expired", out.getvalue())
+        self.assertFalse(TripPlan.objects.filter(id=planned["plan_id"]).exists())
+
+    def test_replan_extends_the_plan_lifetime(self):
+        planned = self.plan()
+        TripPlan.objects.filter(id=planned["plan_id"]).update(updated_at=timezone.now() - timedelta(hours=20))
+
+        with override_settings(TRIP_PLAN_TTL=24 * 3600):
+            self.assertEqual(self.replan(planned["plan_id"], completed_miles=10.0).status_code, 200)
+            self.assertFalse(TripPlan.objects.expired().exists())
+
+    def test_replan_drops_the_cached_response(self):
+        planned = self.plan()
+        self.assertTrue(PlanResultCacheEntry.objects.filter(response__plan_id=planned["plan_id"]).exists())
+
+        self.assertEqual(self.replan(planned["plan_id"], completed_miles=150.0).status_code, 200)
+
+        self.assertFalse(PlanResultCacheEntry.objects.filter(response__plan_id=planned["plan_id"]).exists())
+        again = self.plan()
+        self.assertNotEqual(again["plan_id"], planned["plan_id"])
+
+    def test_plans_without_a_usable_database(self):
+        with mock.patch.object(TripPlan, "save", side_effect=OperationalError("no such table: trips_tripplan")):
+            planned = self.plan()
+        self.assertIsNone(planned["plan_id"])
+        self.assertTrue(planned["log_sheets"])
+
+
+class BatchPlanTests(ProviderTestCase):
+    def test_results_keep_input_order_around_invalid_trips(self):
+        nowhere = dict(request_payload("short"), pickup_location="Nowhere Land")
+        payloads = [
+            request_payload("regional"),
+            {"current_location": "Dallas, TX"},
+            nowhere,
+            request_payload("short"),
+            dict(request_payload("short"), current_cycle_used=90.0)
+        ]
+        response = self.client.post(reverse("calculate-trip-batch"), payloads, content_type="application/json")
+        self.assertEqual(response.status_code, 200)
+        results = response.json()["results"]
+
+        self.assertEqual([result["index"] for result in results], [0, 1, 2, 3, 4])
+        self.assertEqual([sorted(set(result) - {"index"}) for result in results], [
+            ["result"], ["errors"], ["error"], ["result"], ["errors"]
+        ])
+        self.assertIn("pickup_location", results[1]["errors"])
+        self.assertIn("Nowhere Land", results[2]["error"])
+        self.assertIn("current_cycle_used", results[4]["errors"])
+
+        for index, scenario in ((0, "regional"), (3, "short")):
+            planned = results[index]["result"]
+            trip_plan = TripPlan.objects.get(id=planned["plan_id"])
+            self.assertEqual(trip_plan.request["dropoff_location"], request_payload(scenario)["dropoff_location"])
+            single = self.client.post(reverse("calculate-trip"), request_payload(scenario), content_type="application/json")
+            self.assertEqual(planned["route"]["distance_miles"], single.json()["route"]["distance_miles"])
@@ -1,8 +1,13 @@
 from django.urls import path
-from .views import CalculateTripView, HealthCheckView
+from .views import AsyncCalculateTripView, BatchCalculateTripView, CalculateTripView, HealthCheckView, MetricsView, ReplanTripView, StreamCalculateTripView
 
 urlpatterns = [
     path('health/', HealthCheckView.as_view(), name='health-check'),
     path('calculate-trip/', CalculateTripView.as_view(), name='calculate-trip'),
+    path('calculate-trip/async/', AsyncCalculateTripView.as_view(), name='calculate-trip-async'),
+    path('calculate-trip/stream/', StreamCalculateTripView.as_view(), name='calculate-trip-stream'),
+    path('calculate-trip/batch/', BatchCalculateTripView.as_view(), name='calculate-trip-batch'),
+    path('plans/<uuid:plan_id>/replan/', ReplanTripView.as_view(), name='replan-trip'),
+    path('metrics', MetricsView.as_view(), name='metrics'),
 ]
 
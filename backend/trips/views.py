@@ -1,14 +1,58 @@
-import time
+import asyncio
+import json
+import threading
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError
+from django.http import HttpResponse, JsonResponse, StreamingHttpResponse
+from django.utils.decorators import method_decorator
+from django.utils.http import parse_etags
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status
-from datetime import datetime, timedelta
-from zoneinfo import ZoneInfo
 
-from .serializers import TripRequestSerializer
+from .models import TripPlan
+from .renderers import TRIP_RENDERERS, ndjson_event, sse_event
+from .serializers import TripReplanSerializer, TripRequestSerializer
+from .services.batch_planner import BatchPlanner
+from .services.cache import PlanResultCache
+from .services.concurrency import closing_connections
+from .services.metrics import registry, span, timed_stage
 from .services.route_service import RouteService
-from .services.hos_calculator import HOSCalculator
-from .services.log_generator import LogGenerator
+from .services.trip_planner import TripPlanner, TripPlanningError
+
+
+def etag_matches(request, etag: str) -> bool:
+    """If-None-Match check using weak comparison"""
+    header = request.headers.get("If-None-Match")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or any(tag.removeprefix("W/") == f'"{etag}"' for tag in tags)
+
+
+@timed_stage("plan_cache")
+def cached_plan(planner: TripPlanner, start_time: datetime) -> Tuple[Optional[str], Optional[Dict], Optional[str]]:
+    """(cache key, cached response, etag) for a planner's request; all None when the cache is off"""
+    if not settings.PLAN_CACHE_ENABLED:
+        return None, None, None
+    key = PlanResultCache.key(planner.data, start_time)
+    cached = PlanResultCache().get(key)
+    return (key, *cached) if cached else (key, None, None)
+
+
+@timed_stage("plan_cache_store")
+def store_plan(key: Optional[str], response: Dict) -> str:
+    """Cache a fresh response under `key` (when caching) and return its etag"""
+    if key is None:
+        return PlanResultCache.etag(response)
+    return PlanResultCache().set(key, response)
 
 
 class HealthCheckView(APIView):
@@ -21,191 +65,202 @@ class HealthCheckView(APIView):
 
 
 class CalculateTripView(APIView):
+    renderer_classes = TRIP_RENDERERS
+    
     def post(self, request):
         serializer = TripRequestSerializer(data=request.data)
-        if not serializer.is_valid():
+        with span("validate"):
+            valid = serializer.is_valid()
+        if not valid:
             return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        data = serializer.validated_data
+        planner = TripPlanner(serializer.validated_data)
+        start_time = planner.requested_start_time()
+        key, response, etag = cached_plan(planner, start_time)
+        
+        if response is None:
+            try:
+                response = planner.plan(start_time)
+            except TripPlanningError as e:
+                return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            etag = store_plan(key, response)
         
-        route_service = RouteService()
-        
-        start_coords = route_service.geocode(data["current_location"])
-        time.sleep(0.3)
-        pickup_coords = route_service.geocode(data["pickup_location"])
-        time.sleep(0.3)
-        dropoff_coords = route_service.geocode(data["dropoff_location"])
-        
-        if start_coords and pickup_coords:
-            from geopy.distance import geodesic
-            distance = geodesic(start_coords, pickup_coords).miles
-            if distance < 0.1:  # Less than 0.1 miles apart
-                return Response(
-                    {"error": f"Pickup location is too close to current location (less than 0.1 miles). Please ensure pickup is a different location."},
-                    status=status.HTTP_400_BAD_REQUEST
-                )
-        
-        failed_locations = []
-        if not start_coords:
-            failed_locations.append(f"Current Location: '{data['current_location']}'")
-        if not pickup_coords:
-            failed_locations.append(f"Pickup Location: '{data['pickup_location']}'")
-        if not dropoff_coords:
-            failed_locations.append(f"Dropoff Location: '{data['dropoff_location']}'")
-        
-        if failed_locations:
-            error_msg = f"Could not geocode the following locations: {', '.join(failed_locations)}. "
-            error_msg += "Please try more specific addresses (e.g., 'City, State' or 'Street Address, City, State, ZIP')."
-            if route_service.geocode_errors:
-                error_msg += f" Errors: {'; '.join(route_service.geocode_errors[:3])}"
+        headers = {"ETag": f'"{etag}"'}
+        if etag_matches(request, etag):
+            return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(response, headers=headers)
+
+
+class BatchCalculateTripView(APIView):
+    """Plan a list of trips in one request.
+    
+    The body is a JSON list of calculate-trip payloads (or {"trips": [...]}).
+    Each trip succeeds or fails on its own; results come back in input order.
+    """
+    renderer_classes = TRIP_RENDERERS
+    
+    def post(self, request):
+        payloads = request.data.get("trips") if isinstance(request.data, dict) else request.data
+        if not isinstance(payloads, list) or not payloads:
+            return Response({"error": "Expected a non-empty list of trips"}, status=status.HTTP_400_BAD_REQUEST)
+        if len(payloads) > settings.TRIP_BATCH_MAX_SIZE:
             return Response(
-                {"error": error_msg},
+                {"error": f"A batch may contain at most {settings.TRIP_BATCH_MAX_SIZE} trips"},
                 status=status.HTTP_400_BAD_REQUEST
             )
         
-        route = route_service.get_route(start_coords, [pickup_coords], dropoff_coords)
+        return Response({"results": BatchPlanner(payloads).plan()})
+
+
+class ReplanTripView(APIView):
+    """Reschedule the rest of a saved plan after a delay.
+    
+    Takes the driver's position (or completed miles) and updated cycle hours;
+    the stored route and city labels are reused, so no upstream calls are made.
+    """
+    renderer_classes = TRIP_RENDERERS
+    
+    def post(self, request, plan_id):
+        serializer = TripReplanSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        data = serializer.validated_data
         
-        if not route:
-            return Response(
-                {"error": "Could not calculate route"},
-                status=status.HTTP_400_BAD_REQUEST
+        try:
+            trip_plan = TripPlan.objects.live().get(id=plan_id)
+        except (TripPlan.DoesNotExist, DatabaseError):
+            return Response({"error": "Plan not found"}, status=status.HTTP_404_NOT_FOUND)
+        
+        planner = TripPlanner.from_plan(trip_plan)
+        if "completed_miles" in data:
+            completed_miles = data["completed_miles"]
+        else:
+            completed_miles = planner.locate(data["current_latitude"], data["current_longitude"])
+        
+        planner.replan(completed_miles, data["current_cycle_used"])
+        planner.save_plan()
+        if settings.PLAN_CACHE_ENABLED:
+            # A cached calculate-trip response for this plan_id now describes the old schedule
+            PlanResultCache().invalidate_plan(planner.plan_id)
+        
+        response = planner.to_response()
+        response["progress"] = {
+            "completed_miles": round(planner.completed_miles, 2),
+            "remaining_miles": round(planner.total_distance - planner.completed_miles, 2)
+        }
+        return Response(response)
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class AsyncCalculateTripView(View):
+    """Async variant of CalculateTripView for ASGI deployments.
+
+    Upstream calls run in worker threads while the event loop stays free, the
+    independent labelling and HOS stages run concurrently, and if the client
+    disconnects (the ASGI handler cancels this task) no further upstream calls
+    are started.
+    """
+    
+    async def post(self, request):
+        try:
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"error": "Request body must be JSON"}, status=status.HTTP_400_BAD_REQUEST)
+        
+        serializer = TripRequestSerializer(data=payload)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        
+        cancel_event = threading.Event()
+        planner = TripPlanner(serializer.validated_data, RouteService(cancel_event=cancel_event))
+        
+        def stage(func, *args):
+            # Stages run concurrently on executor threads; each closes the connections it used
+            return sync_to_async(closing_connections(func), thread_sensitive=False)(*args)
+        
+        start_time = planner.requested_start_time()
+        key, response, etag = await stage(cached_plan, planner, start_time)
+        if response is None:
+            try:
+                response = await self.plan(planner, start_time, stage, cancel_event)
+            except TripPlanningError as e:
+                return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            etag = await stage(store_plan, key, response)
+        
+        headers = {"ETag": f'"{etag}"'}
+        if etag_matches(request, etag):
+            return HttpResponse(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return HttpResponse(orjson.dumps(response), content_type="application/json", headers=headers)
+    
+    async def plan(self, planner, start_time, stage, cancel_event) -> Dict:
+        try:
+            await stage(planner.geocode)
+            await stage(planner.plan_route)
+            await asyncio.gather(
+                stage(planner.label_route),
+                stage(planner.label_log_cities),
+                stage(planner.calculate_timeline, start_time)
             )
+            await stage(planner.generate_log_sheets)
+            await stage(planner.save_plan)
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
         
-        total_distance = route_service.calculate_distance(route)
-        route_geometry = route_service.get_route_geometry(route)
-        fuel_stops = route_service.find_fuel_stops(route)
-        
-        from geopy.distance import geodesic
-        route_coords = route_service.get_route_geometry(route)
-        
-        pickup_on_route_index = 0
-        min_distance_to_pickup = float('inf')
-        for i, coord in enumerate(route_coords):
-            dist = geodesic((coord[1], coord[0]), pickup_coords).miles
-            if dist < min_distance_to_pickup:
-                min_distance_to_pickup = dist
-                pickup_on_route_index = i
-        
-        start_to_pickup_distance = 0.0
-        for i in range(pickup_on_route_index):
-            if i + 1 < len(route_coords):
-                coord1 = route_coords[i]
-                coord2 = route_coords[i + 1]
-                start_to_pickup_distance += geodesic((coord1[1], coord1[0]), (coord2[1], coord2[0])).miles
-        
-        route_intermediate_cities = route_service.get_intermediate_cities_with_distance(route, interval_miles=100.0)
-        
-        for city in route_intermediate_cities:
-            if city["distance_miles"] < start_to_pickup_distance:
-                city["segment"] = "start_to_pickup"
-            else:
-                city["segment"] = "pickup_to_dropoff"
-        
-        intermediate_areas = route_service.get_intermediate_cities_with_distance(route, interval_miles=50.0)
-        
-        start_name = data["current_location"].split(',')[0]
-        pickup_name = data["pickup_location"].split(',')[0]
-        dropoff_name = data["dropoff_location"].split(',')[0]
-        
-        cities_before_pickup = [area for area in intermediate_areas if area["distance_miles"] < start_to_pickup_distance]
-        cities_after_pickup = [area for area in intermediate_areas if area["distance_miles"] >= start_to_pickup_distance]
-        
-        intermediate_cities = [
-            {"name": start_name, "distance_miles": 0.0, "type": "start"}
-        ] + [dict(area, type="intermediate") for area in cities_before_pickup] + [
-            {"name": pickup_name, "distance_miles": round(start_to_pickup_distance, 1), "type": "pickup"}
-        ] + [dict(area, type="intermediate") for area in cities_after_pickup] + [
-            {"name": dropoff_name, "distance_miles": round(total_distance, 1), "type": "dropoff"}
-        ]
-        
-        if len(intermediate_areas) < 10 and total_distance > 300:
-            intermediate_areas_dense = route_service.get_intermediate_cities_with_distance(route, interval_miles=30.0)
-            if len(intermediate_areas_dense) > len(intermediate_areas):
-                intermediate_areas = intermediate_areas_dense
-                cities_before_pickup = [area for area in intermediate_areas if area["distance_miles"] < start_to_pickup_distance]
-                cities_after_pickup = [area for area in intermediate_areas if area["distance_miles"] >= start_to_pickup_distance]
-                intermediate_cities = [
-                    {"name": start_name, "distance_miles": 0.0, "type": "start"}
-                ] + [dict(area, type="intermediate") for area in cities_before_pickup] + [
-                    {"name": pickup_name, "distance_miles": round(start_to_pickup_distance, 1), "type": "pickup"}
-                ] + [dict(area, type="intermediate") for area in cities_after_pickup] + [
-                    {"name": dropoff_name, "distance_miles": round(total_distance, 1), "type": "dropoff"}
-                ]
-        
-        timezone_str = data.get("timezone", "UTC")
+        return planner.to_response()
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class StreamCalculateTripView(View):
+    """Streaming variant of CalculateTripView.
+    
+    Each stage's output is sent as soon as it is ready (see TripPlanner.iter_plan):
+    newline-delimited JSON, one {"event": ..., "data": ...} object per line, or
+    server-sent events when the client accepts text/event-stream. Geocoding and
+    routing errors still return a 400 before the stream starts; a later failure
+    ends the stream with an "error" event.
+    """
+    
+    def post(self, request):
         try:
-            tz = ZoneInfo(timezone_str)
-        except:
-            tz = ZoneInfo("UTC")
-        
-        start_time = datetime.now(tz)
-        
-        hos_calculator = HOSCalculator(
-            current_cycle_used=data["current_cycle_used"],
-            start_time=start_time
-        )
-        
-        trip_result = hos_calculator.calculate_trip_timeline(
-            total_distance_miles=total_distance
-        )
-        
-        carrier_info = {
-            "name": data.get("carrier_name", ""),
-            "main_office_address": data.get("main_office_address", ""),
-            "home_terminal_address": data.get("home_terminal_address", ""),
-            "driver_name": data.get("driver_name", ""),
-            "co_driver_name": data.get("co_driver_name", ""),
-            "dvl_manifest_no": data.get("dvl_manifest_no", ""),
-            "shipper_commodity": data.get("shipper_commodity", ""),
-            "from": data["current_location"],
-            "to": data["dropoff_location"],
-            "current_cycle_used": data["current_cycle_used"]
-        }
+            payload = json.loads(request.body or b"{}")
+        except ValueError:
+            return JsonResponse({"error": "Request body must be JSON"}, status=status.HTTP_400_BAD_REQUEST)
         
-        vehicle_info = {
-            "truck_tractor": data.get("truck_tractor", ""),
-            "trailer": data.get("trailer", ""),
-            "total_mileage": ""
-        }
+        serializer = TripRequestSerializer(data=payload)
+        if not serializer.is_valid():
+            return JsonResponse(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
         
-        log_generator = LogGenerator()
-        log_sheets = log_generator.generate_log_sheets(
-            timeline=trip_result["timeline"],
-            start_time=start_time,
-            total_miles=total_distance,
-            carrier_info=carrier_info,
-            vehicle_info=vehicle_info,
-            intermediate_cities=intermediate_cities
-        )
+        planner = TripPlanner(serializer.validated_data)
+        events = planner.iter_plan(planner.requested_start_time())
+        try:
+            first_event = next(events)
+        except TripPlanningError as e:
+            return JsonResponse({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
         
-        return Response({
-            "route": {
-                "distance_miles": round(total_distance, 2),
-                "geometry": route_geometry,
-                "fuel_stops": fuel_stops,
-                "start_coords": start_coords,
-                "pickup_coords": pickup_coords,
-                "dropoff_coords": dropoff_coords,
-                "intermediate_cities": route_intermediate_cities
-            },
-            "timeline": [
-                {
-                    "time": event["time"].isoformat(),
-                    "status": event["status"],
-                    "description": event["description"],
-                    "duration": event["duration"],
-                    "location": event.get("location")
-                }
-                for event in trip_result["timeline"]
-            ],
-            "compliance": trip_result["compliance"],
-            "log_sheets": log_sheets,
-            "summary": {
-                "total_driving_hours": round(trip_result["total_driving_hours"], 2),
-                "total_on_duty_hours": round(trip_result["total_on_duty_hours"], 2),
-                "estimated_arrival": (
-                    trip_result["timeline"][-1]["time"] + 
-                    timedelta(hours=trip_result["timeline"][-1].get("duration", 0))
-                ).isoformat() if trip_result["timeline"] else None
-            }
-        })
+        if "text/event-stream" in request.headers.get("Accept", ""):
+            encode, content_type = sse_event, "text/event-stream"
+        else:
+            encode, content_type = ndjson_event, "application/x-ndjson"
+        
+        def stream():
+            yield encode(*first_event)
+            try:
+                for event, data in events:
+                    yield encode(event, data)
+            except TripPlanningError as e:
+                yield encode("error", {"error": str(e)})
+        
+        response = StreamingHttpResponse(stream(), content_type=content_type)
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+
+class MetricsView(View):
+    """Prometheus scrape endpoint for this process's metrics registry"""
+    
+    def get(self, request):
+        if not settings.METRICS_ENABLED:
+            return JsonResponse({"error": "Metrics are disabled"}, status=status.HTTP_404_NOT_FOUND)
+        return HttpResponse(registry.render(), content_type="text/plain; version=0.0.4; charset=utf-8")